@@ -4,12 +4,55 @@ from app import app
 import json
 from supervisor_service import (
     ask_supervisor as svc_ask_supervisor,
+    stream_supervisor as svc_stream_supervisor,
     generate_tasks as svc_generate_tasks,
     generate_feedback as svc_generate_feedback,
     suggest_resources as svc_suggest_resources,
     generate_certificate as svc_generate_certificate
 )
 
+def _prepare_question_context(user_profile, internship=None, task=None):
+    """
+    Convert the ORM objects into the plain dictionaries the supervisor service expects
+    
+    Returns:
+        tuple: (user_data, task_data, internship_data)
+    """
+    # Prepare user profile data
+    user_data = None
+    if user_profile:
+        user_data = {
+            "major": user_profile.major,
+            "university": user_profile.university,
+            "career_interests": user_profile.career_interests
+        }
+    
+    # Prepare internship data
+    internship_data = None
+    if internship:
+        internship_data = {
+            "industry": internship.industry.name if hasattr(internship, "industry") and internship.industry else "professional",
+            "title": internship.title,
+            "description": internship.description,
+            "current_week": (internship.progress // 25) + 1,  # Estimate week from progress
+            # Counters maintained on the internship row, no task or submission queries
+            "completed_tasks": internship.tasks_evaluated,
+            "avg_score": internship.average_score
+        }
+    
+    # Prepare task data
+    task_data = None
+    if task:
+        task_data = {
+            "title": task.title,
+            "description": task.description,
+            "instructions": task.instructions,
+            "difficulty": task.difficulty,
+            "status": task.status
+        }
+    
+    return user_data, task_data, internship_data
+
 def ask_question(question, user_profile, internship=None, task=None):
     """
     Generate a response to a user's question using the AI supervisor bot
@@ -24,42 +67,7 @@ def ask_question(question, user_profile, internship=None, task=None):
         str: The AI supervisor's response
     """
     try:
-        # Prepare user profile data
-        user_data = None
-        if user_profile:
-            user_data = {
-                "major": user_profile.major,
-                "university": user_profile.university,
-                "career_interests": user_profile.career_interests
-            }
-        
-        # Prepare internship data
-        internship_data = None
-        if internship:
-            internship_data = {
-                "industry": internship.industry.name if hasattr(internship, "industry") and internship.industry else "professional",
-                "title": internship.title,
-                "description": internship.description,
-                "current_week": (internship.progress // 25) + 1,  # Estimate week from progress
-                "completed_tasks": len([t for t in internship.tasks if t.status == "evaluated"]) if hasattr(internship, "tasks") else 0,
-                "avg_score": sum([s.score for s in [t.submissions[0] for t in internship.tasks if t.submissions and t.submissions[0].score is not None]]) / 
-                            len([t for t in internship.tasks if t.submissions and t.submissions[0].score is not None]) if hasattr(internship, "tasks") and 
-                            any(t.submissions and t.submissions[0].score is not None for t in internship.tasks) else 0
-            }
-        
-        # Prepare task data
-        task_data = None
-        if task:
-            task_data = {
-                "title": task.title,
-                "description": task.description,
-                "instructions": task.instructions,
-                "difficulty": task.difficulty,
-                "status": task.status
-            }
-        
-        # Get industry from internship or default
-        industry = internship.industry.name if internship and hasattr(internship, "industry") and internship.industry else "professional"
+        user_data, task_data, internship_data = _prepare_question_context(user_profile, internship, task)
         
         # Call the supervisor service
         response = svc_ask_supervisor(question, user_data, task_data, internship_data)
@@ -69,6 +77,24 @@ def ask_question(question, user_profile, internship=None, task=None):
         logging.error(f"Error in AI supervisor: {str(e)}")
         return "I apologize, but I'm having trouble processing your question right now. Please try again later or contact support if the issue persists."
 
+def stream_question(question, user_profile, internship=None, task=None):
+    """
+    Stream the AI supervisor's response to a user's question
+    
+    The ORM objects are read eagerly, before the first token is requested.
+    
+    Args:
+        question (str): The user's question
+        user_profile (UserProfile): The user's profile
+        internship (InternshipTrack, optional): The current internship
+        task (Task, optional): The current task
+        
+    Returns:
+        generator: Yields response text fragments
+    """
+    user_data, task_data, internship_data = _prepare_question_context(user_profile, internship, task)
+    return svc_stream_supervisor(question, user_data, task_data, internship_data)
+
 def generate_feedback(submission_content, task_title, task_description, task_difficulty, industry="professional"):
     """
     Generate feedback for a student's task submission
@@ -1,8 +1,13 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
 from api.app import db
 import models
 import azure_services
+from services.query_budget import query_budget
+from services.submissions import latest_submissions_by_task
+from services.tasks import create_tasks
 from datetime import datetime, timedelta
 
 bp = Blueprint('internships', __name__, url_prefix='/api/internships')
@@ -133,18 +138,7 @@ def start_internship():
     )
     
     # Create tasks in database
-    for task_data in tasks:
-        task = models.Task(
-            internship_id=internship.id,
-            title=task_data['title'],
-            description=task_data['description'],
-            instructions=task_data['instructions'],
-            difficulty=task_data['difficulty'],
-            points=task_data['points'],
-            status='pending',
-            deadline=datetime.utcnow() + timedelta(days=7)
-        )
-        db.session.add(task)
+    create_tasks(internship.id, tasks, week=1, deadline=datetime.utcnow() + timedelta(days=7))
     
     db.session.commit()
     
@@ -160,10 +154,15 @@ def start_internship():
 
 @bp.route('/', methods=['GET'])
 @login_required
+@query_budget(1)
 def get_internships():
     """
     Get all internships for the current user.
     
+    Industry and company are joined into the same query and the certificate id
+    comes from a correlated subquery, so the response takes one query however
+    many internships the user has.
+    
     Query Parameters:
         status: Optional - Filter internships by status (active, completed, abandoned)
     
@@ -172,20 +171,27 @@ def get_internships():
     """
     status = request.args.get('status')
     
-    query = models.InternshipTrack.query.filter_by(user_id=current_user.id)
+    # First certificate per internship, as Certificate.query.filter_by(...).first() did
+    certificate_id = select(func.min(models.Certificate.id)).where(
+        models.Certificate.internship_id == models.InternshipTrack.id
+    ).scalar_subquery()
+    
+    query = db.session.query(models.InternshipTrack, certificate_id).options(
+        joinedload(models.InternshipTrack.industry),
+        joinedload(models.InternshipTrack.company)
+    ).filter(
+        models.InternshipTrack.user_id == current_user.id,
+        models.InternshipTrack.deleted_at.is_(None)
+    )
     if status:
-        query = query.filter_by(status=status)
+        query = query.filter(models.InternshipTrack.status == status)
         
-    internships = query.order_by(models.InternshipTrack.started_at.desc()).all()
+    rows = query.order_by(models.InternshipTrack.started_at.desc()).all()
     
     result = []
-    for internship in internships:
-        # Get the associated industry and company
-        industry = models.Industry.query.get(internship.industry_id)
-        company = models.Company.query.get(internship.company_id) if internship.company_id else None
-        
-        # Get the completion certificate if available
-        certificate = models.Certificate.query.filter_by(internship_id=internship.id).first()
+    for internship, internship_certificate_id in rows:
+        industry = internship.industry
+        company = internship.company
         
         result.append({
             "id": internship.id,
@@ -200,13 +206,14 @@ def get_internships():
             "progress": internship.progress,
             "started_at": internship.started_at.isoformat(),
             "completed_at": internship.completed_at.isoformat() if internship.completed_at else None,
-            "certificate_id": certificate.id if certificate else None
+            "certificate_id": internship_certificate_id
         })
     
     return jsonify(result), 200
 
 @bp.route('/<int:internship_id>', methods=['GET'])
 @login_required
+@query_budget(6)
 def get_internship(internship_id):
     """
     Get details of a specific internship.
@@ -214,7 +221,7 @@ def get_internship(internship_id):
     Returns:
         JSON response with the internship details
     """
-    internship = models.InternshipTrack.query.get_or_404(internship_id)
+    internship = models.InternshipTrack.query.filter_by(id=internship_id, deleted_at=None).first_or_404()
     
     # Ensure the internship belongs to the current user
     if internship.user_id != current_user.id:
@@ -227,13 +234,12 @@ def get_internship(internship_id):
     # Get tasks for this internship
     tasks = models.Task.query.filter_by(internship_id=internship.id).order_by(models.Task.created_at).all()
     
+    # Latest submission per task, fetched in one query
+    latest_submissions = latest_submissions_by_task(internship.id, user_id=current_user.id)
+    
     task_list = []
     for task in tasks:
-        # Get the latest submission for this task
-        submission = models.Submission.query.filter_by(
-            task_id=task.id,
-            user_id=current_user.id
-        ).order_by(models.Submission.submitted_at.desc()).first()
+        submission = latest_submissions.get(task.id)
         
         task_list.append({
             "id": task.id,
@@ -282,7 +288,7 @@ def complete_internship(internship_id):
     Returns:
         JSON response with completion and certificate details
     """
-    internship = models.InternshipTrack.query.get_or_404(internship_id)
+    internship = models.InternshipTrack.query.filter_by(id=internship_id, deleted_at=None).first_or_404()
     
     # Ensure the internship belongs to the current user
     if internship.user_id != current_user.id:
@@ -303,18 +309,9 @@ def complete_internship(internship_id):
     # Get industry
     industry = models.Industry.query.get(internship.industry_id)
     
-    # Get completed tasks count and average score
-    tasks_count = models.Task.query.filter_by(internship_id=internship.id).count()
-    completed_submissions = models.Submission.query.join(
-        models.Task, models.Submission.task_id == models.Task.id
-    ).filter(
-        models.Task.internship_id == internship.id,
-        models.Submission.user_id == current_user.id,
-        models.Submission.score.isnot(None)
-    ).all()
-    
-    completed_count = len(completed_submissions)
-    avg_score = sum(s.score for s in completed_submissions) / completed_count if completed_count > 0 else 0
+    # Completed tasks and average score are kept on the internship row
+    completed_count = internship.tasks_evaluated
+    avg_score = internship.average_score
     
     # Generate certificate using Azure OpenAI
     certificate_data = azure_services.generate_certificate(
@@ -2,6 +2,9 @@ from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 import models
 import ai_supervisor
+from services.streaming import wants_event_stream, sse_response
+from services.rate_limiter import apply_retry_after
+from services.task_resources import get_task_resources, queue_resource_refresh
 
 bp = Blueprint('supervisor', __name__, url_prefix='/api/supervisor')
 
@@ -32,7 +35,7 @@ def ask_supervisor():
     task = None
     
     if internship_id:
-        internship = models.InternshipTrack.query.get(internship_id)
+        internship = models.InternshipTrack.query.filter_by(id=internship_id, deleted_at=None).first()
         
         # Ensure the internship belongs to the current user
         if internship and internship.user_id != current_user.id:
@@ -40,6 +43,8 @@ def ask_supervisor():
     
     if task_id:
         task = models.Task.query.get(task_id)
+        if task and task.internship.deleted_at is not None:
+            task = None
         
         # Ensure the task belongs to the current user
         if task and task.internship.user_id != current_user.id:
@@ -49,6 +54,15 @@ def ask_supervisor():
         if task and not internship:
             internship = task.internship
     
+    # Stream tokens as Server-Sent Events when requested
+    if wants_event_stream(data):
+        return sse_response(ai_supervisor.stream_question(
+            question,
+            current_user.profile,
+            internship,
+            task
+        ))
+    
     # Generate response using AI supervisor
     response = ai_supervisor.ask_question(
         question, 
@@ -57,7 +71,8 @@ def ask_supervisor():
         task
     )
     
-    return jsonify({"response": response}), 200
+    # A rate-limited call answered with canned text; tell the client to retry instead
+    return apply_retry_after(jsonify({"response": response}))
 
 @bp.route('/resources', methods=['POST'])
 @login_required
@@ -81,22 +96,21 @@ def get_resources():
     
     # Get task
     task = models.Task.query.get_or_404(task_id)
+    if task.internship.deleted_at is not None:
+        return jsonify({"error": "Task not found"}), 404
     
     # Ensure the task belongs to the current user
     if task.internship.user_id != current_user.id:
         return jsonify({"error": "You do not have access to this task"}), 403
     
-    # Get industry
-    industry = models.Industry.query.get(task.internship.industry_id)
+    # Optionally ask for a fresh set; the stored one is served until it is ready
+    if data.get('refresh'):
+        queue_resource_refresh(task.id)
     
-    # Generate resources using AI supervisor
-    resources = ai_supervisor.suggest_resources(
-        task.title,
-        task.description,
-        industry.name if industry else "general"
-    )
+    # Serve stored resources, generation happens in the background
+    resources, pending = get_task_resources(task)
     
-    return jsonify({"resources": resources}), 200
+    return jsonify({"resources": resources, "pending": pending}), 200
 
 @bp.route('/certificates/<int:certificate_id>', methods=['GET'])
 @login_required
@@ -113,7 +127,10 @@ def get_certificate(certificate_id):
     if certificate.user_id != current_user.id:
         return jsonify({"error": "You do not have access to this certificate"}), 403
     
-    internship = models.InternshipTrack.query.get(certificate.internship_id)
+    # Certificates of a deleted internship go with it
+    internship = models.InternshipTrack.query.filter_by(id=certificate.internship_id, deleted_at=None).first()
+    if internship is None:
+        return jsonify({"error": "Certificate not found"}), 404
     industry = models.Industry.query.get(internship.industry_id) if internship else None
     
     result = {
@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from api.app import db
 import models
-import azure_services
+from services.azure_services import queue_submission_evaluation
 from datetime import datetime
 
 bp = Blueprint('tasks', __name__, url_prefix='/api/tasks')
@@ -18,6 +18,8 @@ def get_task(task_id):
     """
     task = models.Task.query.get_or_404(task_id)
     internship = task.internship
+    if internship.deleted_at is not None:
+        return jsonify({"error": "Task not found"}), 404
     
     # Ensure the task belongs to the current user
     if internship.user_id != current_user.id:
@@ -74,6 +76,8 @@ def submit_task(task_id):
     """
     task = models.Task.query.get_or_404(task_id)
     internship = task.internship
+    if internship.deleted_at is not None:
+        return jsonify({"error": "Task not found"}), 404
     
     # Ensure the task belongs to the current user
     if internship.user_id != current_user.id:
@@ -106,8 +110,8 @@ def submit_task(task_id):
     db.session.add(submission)
     db.session.commit()
     
-    # Trigger asynchronous evaluation via Azure Function
-    azure_services.evaluate_submission(submission.id)
+    # Queue evaluation for the background workers
+    queue_submission_evaluation(submission.id)
     
     return jsonify({
         "message": "Submission received",
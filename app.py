@@ -25,6 +25,8 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
 }
+# Views over their @query_budget raise instead of logging a warning (benchmarks, development)
+app.config["QUERY_BUDGET_ENFORCE"] = os.environ.get("QUERY_BUDGET_ENFORCE", "false").lower() == "true"
 
 # Azure OpenAI configuration
 app.config["AZURE_OPENAI_ENDPOINT"] = os.environ.get("AZURE_OPENAI_ENDPOINT", "https://thepromptocrats-hackathon-stg-openai-uaen-01.openai.azure.com/")
@@ -32,6 +34,68 @@ app.config["AZURE_OPENAI_KEY"] = os.environ.get("AZURE_OPENAI_KEY")
 app.config["AZURE_OPENAI_DEPLOYMENT"] = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
 app.config["AZURE_OPENAI_API_VERSION"] = os.environ.get("AZURE_OPENAI_API_VERSION", "2023-12-01-preview")
 
+# LLM backend: "live" calls Azure/OpenAI, "fake" calls the local record/replay
+# server in benchmarks/fake_llm_server.py for offline load testing
+app.config["LLM_MODE"] = os.environ.get("LLM_MODE", "live").lower()
+app.config["FAKE_LLM_URL"] = os.environ.get("FAKE_LLM_URL", "http://127.0.0.1:8900/v1")
+
+# Shared LLM gateway connection pool and timeouts
+app.config["LLM_TIMEOUT"] = float(os.environ.get("LLM_TIMEOUT", 60))
+app.config["LLM_MAX_RETRIES"] = int(os.environ.get("LLM_MAX_RETRIES", 2))
+app.config["LLM_MAX_CONNECTIONS"] = int(os.environ.get("LLM_MAX_CONNECTIONS", 20))
+app.config["LLM_MAX_KEEPALIVE"] = int(os.environ.get("LLM_MAX_KEEPALIVE", 10))
+app.config["LLM_KEEPALIVE_EXPIRY"] = float(os.environ.get("LLM_KEEPALIVE_EXPIRY", 30))
+
+# LLM resilience: per-call-type deadlines, adaptive timeouts, hedging and circuit breaker
+app.config["LLM_DEADLINES"] = {
+    call_type: float(os.environ.get(f"LLM_DEADLINE_{call_type.upper()}", seconds))
+    for call_type, seconds in {
+        "chat": 30,
+        "feedback": 60,
+        "tasks": 45,
+        "internship": 30,
+        "resources": 30,
+        "certificate": 45,
+    }.items()
+}
+app.config["LLM_LATENCY_WINDOW"] = int(os.environ.get("LLM_LATENCY_WINDOW", 200))  # Latency samples kept per call type
+app.config["LLM_LATENCY_MIN_SAMPLES"] = int(os.environ.get("LLM_LATENCY_MIN_SAMPLES", 20))  # Before adaptive timeouts/hedging kick in
+app.config["LLM_ADAPTIVE_TIMEOUT_FACTOR"] = float(os.environ.get("LLM_ADAPTIVE_TIMEOUT_FACTOR", 3))  # Deadline = factor x p99, capped by LLM_DEADLINES
+app.config["LLM_ADAPTIVE_TIMEOUT_MIN"] = float(os.environ.get("LLM_ADAPTIVE_TIMEOUT_MIN", 10))
+app.config["LLM_HEDGE_ENABLED"] = os.environ.get("LLM_HEDGE_ENABLED", "false").lower() == "true"  # Second request after p95; costs extra tokens
+app.config["LLM_HEDGE_WORKERS"] = int(os.environ.get("LLM_HEDGE_WORKERS", 16))
+app.config["LLM_BREAKER_WINDOW"] = int(os.environ.get("LLM_BREAKER_WINDOW", 20))
+app.config["LLM_BREAKER_MIN_CALLS"] = int(os.environ.get("LLM_BREAKER_MIN_CALLS", 10))
+app.config["LLM_BREAKER_FAILURE_RATE"] = float(os.environ.get("LLM_BREAKER_FAILURE_RATE", 0.5))
+app.config["LLM_BREAKER_SLOW_RATIO"] = float(os.environ.get("LLM_BREAKER_SLOW_RATIO", 0.8))  # Slow = slower than this share of the deadline
+app.config["LLM_BREAKER_SLOW_RATE"] = float(os.environ.get("LLM_BREAKER_SLOW_RATE", 0.8))
+app.config["LLM_BREAKER_COOLDOWN"] = float(os.environ.get("LLM_BREAKER_COOLDOWN", 30))  # Seconds open before a half-open probe
+
+# LLM rate limits (token buckets shared by all workers; 0 disables a bucket)
+app.config["LLM_RATE_LIMIT_ENABLED"] = os.environ.get("LLM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+app.config["LLM_TPM"] = int(os.environ.get("LLM_TPM", 120000))  # Match the deployment's tokens-per-minute quota
+app.config["LLM_RPM"] = int(os.environ.get("LLM_RPM", 720))
+app.config["LLM_USER_TPM"] = int(os.environ.get("LLM_USER_TPM", 20000))
+app.config["LLM_USER_RPM"] = int(os.environ.get("LLM_USER_RPM", 20))
+app.config["LLM_RATE_LIMIT_MAX_WAIT"] = float(os.environ.get("LLM_RATE_LIMIT_MAX_WAIT", 30))  # Background jobs wait this long for budget
+
+# LLM priority scheduler: interactive > grading > generation > resources
+app.config["LLM_SCHEDULER_ENABLED"] = os.environ.get("LLM_SCHEDULER_ENABLED", "true").lower() == "true"
+app.config["LLM_MAX_CONCURRENCY"] = int(os.environ.get("LLM_MAX_CONCURRENCY", 16))  # Upstream calls in flight per worker
+app.config["LLM_CLASS_CONCURRENCY"] = {  # Background classes stay below the total so chat always finds a slot
+    "interactive": int(os.environ.get("LLM_CONCURRENCY_INTERACTIVE", 16)),
+    "grading": int(os.environ.get("LLM_CONCURRENCY_GRADING", 6)),
+    "generation": int(os.environ.get("LLM_CONCURRENCY_GENERATION", 4)),
+    "resources": int(os.environ.get("LLM_CONCURRENCY_RESOURCES", 2)),
+}
+app.config["LLM_CLASS_MAX_WAIT"] = {  # Seconds a call may queue for a slot before falling back
+    "interactive": float(os.environ.get("LLM_MAX_WAIT_INTERACTIVE", 10)),
+    "grading": float(os.environ.get("LLM_MAX_WAIT_GRADING", 120)),
+    "generation": float(os.environ.get("LLM_MAX_WAIT_GENERATION", 60)),
+    "resources": float(os.environ.get("LLM_MAX_WAIT_RESOURCES", 120)),
+}
+app.config["LLM_SCHEDULER_AGING"] = float(os.environ.get("LLM_SCHEDULER_AGING", 5))  # Seconds of waiting worth one priority level
+
 # Standard OpenAI configuration (fallback)
 # app.config["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY")
 # app.config["OPENAI_MODEL"] = os.environ.get("OPENAI_MODEL", "gpt-4o")
@@ -49,6 +113,39 @@ app.config["AZURE_SEARCH_INDEX"] = os.environ.get("AZURE_SEARCH_INDEX", "interns
 # Azure Function configuration
 app.config["AZURE_FUNCTION_ENDPOINT"] = os.environ.get("AZURE_FUNCTION_ENDPOINT")
 app.config["AZURE_FUNCTION_KEY"] = os.environ.get("AZURE_FUNCTION_KEY")
+app.config["AZURE_FUNCTION_TIMEOUT"] = float(os.environ.get("AZURE_FUNCTION_TIMEOUT", 60))  # Capped at half of JOB_QUEUE_VISIBILITY_TIMEOUT
+app.config["INTERNAL_API_KEY"] = os.environ.get("INTERNAL_API_KEY")  # Sent by the function to /api/internal endpoints
+
+# Background job queue configuration
+app.config["JOB_QUEUE_WORKERS"] = int(os.environ.get("JOB_QUEUE_WORKERS", 2))  # 0 disables in-process workers
+app.config["JOB_QUEUE_POLL_INTERVAL"] = float(os.environ.get("JOB_QUEUE_POLL_INTERVAL", 1.0))
+app.config["JOB_QUEUE_VISIBILITY_TIMEOUT"] = int(os.environ.get("JOB_QUEUE_VISIBILITY_TIMEOUT", 300))
+app.config["JOB_QUEUE_MAX_ATTEMPTS"] = int(os.environ.get("JOB_QUEUE_MAX_ATTEMPTS", 5))
+app.config["JOB_QUEUE_RETRY_DELAY"] = int(os.environ.get("JOB_QUEUE_RETRY_DELAY", 30))
+app.config["EVAL_BATCH_SIZE"] = int(os.environ.get("EVAL_BATCH_SIZE", 8))  # Submissions graded per batch completion
+
+# Generated task list cache
+app.config["TASK_CACHE_ENABLED"] = os.environ.get("TASK_CACHE_ENABLED", "true").lower() == "true"
+app.config["TASK_CACHE_TTL"] = int(os.environ.get("TASK_CACHE_TTL", 7 * 24 * 3600))
+app.config["TASK_CACHE_MAX_ENTRIES"] = int(os.environ.get("TASK_CACHE_MAX_ENTRIES", 5000))
+app.config["TASK_CACHE_VARIANTS"] = int(os.environ.get("TASK_CACHE_VARIANTS", 3))  # Variety pool size per key
+
+# Stored task resource suggestions
+app.config["TASK_RESOURCES_MAX_AGE"] = int(os.environ.get("TASK_RESOURCES_MAX_AGE", 30 * 24 * 3600))  # Refresh in the background after this
+app.config["TASK_RESOURCES_RETRY_AFTER"] = int(os.environ.get("TASK_RESOURCES_RETRY_AFTER", 600))  # Re-queue a refresh stuck this long
+
+# Cross-worker shared state (SQLite file in the instance folder)
+app.config["SHARED_STORE_PATH"] = os.environ.get("SHARED_STORE_PATH")  # Defaults to instance/shared_state.db
+
+# Single-flight coalescing of identical LLM calls
+app.config["LLM_COALESCE_ENABLED"] = os.environ.get("LLM_COALESCE_ENABLED", "true").lower() == "true"
+app.config["LLM_COALESCE_MARGIN"] = float(os.environ.get("LLM_COALESCE_MARGIN", 10))  # Followers wait the leader's slot wait and deadline plus this
+app.config["LLM_COALESCE_LEASE"] = int(os.environ.get("LLM_COALESCE_LEASE", 120))  # Claim expiry if a worker dies mid-call
+app.config["LLM_COALESCE_RESULT_TTL"] = int(os.environ.get("LLM_COALESCE_RESULT_TTL", 10))
+
+# Admin dashboard row totals
+app.config["STATS_REFRESH_INTERVAL"] = int(os.environ.get("STATS_REFRESH_INTERVAL", 3600))  # Recount stored totals older than this
+app.config["STATS_APPROXIMATE_COUNTS"] = os.environ.get("STATS_APPROXIMATE_COUNTS", "false").lower() == "true"  # Postgres only: use planner estimates
 
 # Initialize the app with extensions
 db.init_app(app)
@@ -70,11 +167,28 @@ with app.app_context():
     
     # Import models for database creation
     from models.user import User, UserProfile, AdminUser
-    from models.internship import Industry, InternshipTrack, Company, Task, Submission, Certificate
+    from models.internship import Industry, InternshipTrack, Company, Task, TaskResourceSet, Submission, Certificate
+    from models.job import BackgroundJob
+    from models.cache import GeneratedTaskSet
+    from models.stats import StatCounter
+    from models.analytics import AnalyticsBucket
     
     # Create tables
     db.create_all()
 
+    # Bring existing databases up to date (columns and indexes added since they were created)
+    from migrate_db import run_migrations
+    run_migrations()
+
     # Initialize data if needed
     from api.init_data import initialize_data
     initialize_data()
+
+    # Keep the admin dashboard totals recounted in the background
+    from services.stats import queue_refresh
+    queue_refresh()
+
+# Start background workers for queued jobs (submission evaluation)
+if app.config["JOB_QUEUE_WORKERS"] > 0:
+    from services.job_queue import start_workers
+    start_workers(app)
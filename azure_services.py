@@ -1,60 +1,15 @@
 import os
-import requests
 import json
 import logging
 from app import app
-from azure.cosmos import CosmosClient
-from azure.search.documents import SearchClient
-from azure.core.credentials import AzureKeyCredential
-import openai
-from openai import AsyncAzureOpenAI
-import asyncio
+from services.llm_gateway import chat_completion
+from services.tasks import upsert_task_documents
+from services.azure_clients import get_cosmos_container, get_search_client
 
-# Initialize clients as None
-cosmos_client = None
-db = None
-container = None
-search_client = None
-
-# Configure Azure OpenAI client if credentials are available
-if app.config.get("AZURE_OPENAI_ENDPOINT") and app.config.get("AZURE_OPENAI_KEY"):
-    openai.api_type = "azure"
-    openai.api_base = app.config["AZURE_OPENAI_ENDPOINT"]
-    openai.api_key = app.config["AZURE_OPENAI_KEY"]
-    openai.api_version = "2023-05-15"
-    logging.info("Azure OpenAI client configured")
-else:
+# Completions go through the shared LLM gateway
+if not (app.config.get("AZURE_OPENAI_ENDPOINT") and app.config.get("AZURE_OPENAI_KEY")):
     logging.warning("Azure OpenAI credentials not found. Some features will be limited.")
 
-# Configure Cosmos DB client if credentials are available
-if app.config.get("COSMOS_ENDPOINT") and app.config.get("COSMOS_KEY"):
-    try:
-        cosmos_client = CosmosClient(
-            app.config["COSMOS_ENDPOINT"],
-            app.config["COSMOS_KEY"]
-        )
-        db = cosmos_client.get_database_client(app.config["COSMOS_DATABASE"])
-        container = db.get_container_client("internships")
-        logging.info("Cosmos DB client configured")
-    except Exception as e:
-        logging.error(f"Failed to initialize Cosmos DB client: {str(e)}")
-else:
-    logging.warning("Cosmos DB credentials not found. Using fallback storage.")
-
-# Configure Azure AI Search if credentials are available
-if app.config.get("AZURE_SEARCH_ENDPOINT") and app.config.get("AZURE_SEARCH_KEY"):
-    try:
-        search_client = SearchClient(
-            endpoint=app.config["AZURE_SEARCH_ENDPOINT"],
-            index_name=app.config["AZURE_SEARCH_INDEX"],
-            credential=AzureKeyCredential(app.config["AZURE_SEARCH_KEY"])
-        )
-        logging.info("Azure Search client configured")
-    except Exception as e:
-        logging.error(f"Failed to initialize Azure Search client: {str(e)}")
-else:
-    logging.warning("Azure Search credentials not found. Search functionality will be limited.")
-
 def generate_internship(industry, major, interests):
     """
     Generate internship details using Azure OpenAI
@@ -90,8 +45,7 @@ def generate_internship(industry, major, interests):
         """
         
         try:
-            completion = openai.ChatCompletion.create(
-                deployment_id=app.config["AZURE_OPENAI_DEPLOYMENT"],
+            response_text = chat_completion(
                 messages=[
                     {"role": "system", "content": "You are an AI assistant that generates realistic virtual internship scenarios."},
                     {"role": "user", "content": prompt}
@@ -101,10 +55,9 @@ def generate_internship(industry, major, interests):
                 top_p=0.95,
                 frequency_penalty=0,
                 presence_penalty=0,
-                stop=None
-            )
-            
-            response_text = completion.choices[0].message.content.strip()
+                coalesce=True,
+                call_type="internship"
+            ).strip()
             
             # Parse JSON response
             internship_data = json.loads(response_text)
@@ -117,6 +70,7 @@ def generate_internship(industry, major, interests):
             }
         
         # Save to Cosmos DB if available
+        container = get_cosmos_container("internships")
         if container:
             try:
                 container.upsert_item({
@@ -216,8 +170,7 @@ Maintain a formal but friendly tone, encourage problem-solving, and give constru
 Adapt your tasks and examples to fit the field of {industry} and the environment of a professional organization.
 Format your response as a proper JSON array that can be parsed without errors."""
 
-            completion = openai.ChatCompletion.create(
-                deployment_id=app.config["AZURE_OPENAI_DEPLOYMENT"],
+            response_text = chat_completion(
                 messages=[
                     {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
@@ -227,10 +180,9 @@ Format your response as a proper JSON array that can be parsed without errors.""
                 top_p=0.95,
                 frequency_penalty=0,
                 presence_penalty=0,
-                stop=None
-            )
-            
-            response_text = completion.choices[0].message.content.strip()
+                coalesce=True,
+                call_type="tasks"
+            ).strip()
             
             # Parse JSON response
             tasks_data = json.loads(response_text)
@@ -266,21 +218,10 @@ Format your response as a proper JSON array that can be parsed without errors.""
             return default_tasks
         
         # Save tasks to Cosmos DB if available
+        container = get_cosmos_container("internships")
         if container:
             try:
-                for task in tasks_data:
-                    container.upsert_item({
-                        "id": f"{internship_title}-{task['title']}",
-                        "type": "task",
-                        "internship_title": internship_title,
-                        "industry": industry,
-                        "week": week,
-                        "title": task["title"],
-                        "description": task["description"],
-                        "instructions": task["instructions"],
-                        "difficulty": task["difficulty"],
-                        "points": task["points"]
-                    })
+                upsert_task_documents(container, internship_title, industry, week, tasks_data)
             except Exception as e:
                 logging.error(f"Error saving tasks to Cosmos DB: {str(e)}")
         
@@ -345,6 +286,7 @@ def evaluate_submission(submission_id):
         }
         
         # Make asynchronous call to Azure Function
+        import requests
         response = requests.post(function_url, headers=headers, json=data)
         
         if response.status_code != 202:
@@ -376,6 +318,7 @@ def search_resources(query, industry, task_type=None, limit=5):
         
         # Execute search if search client is available
         resources = []
+        search_client = get_search_client()
         if search_client:
             try:
                 results = search_client.search(
@@ -468,8 +411,7 @@ Maintain a formal but friendly tone, encourage problem-solving, and give constru
 Adapt your certificate to fit the field of {industry} and the environment of a professional organization.
 Format your response as a proper JSON object that can be parsed without errors."""
 
-            completion = openai.ChatCompletion.create(
-                deployment_id=app.config["AZURE_OPENAI_DEPLOYMENT"],
+            response_text = chat_completion(
                 messages=[
                     {"role": "system", "content": system_message},
                     {"role": "user", "content": prompt}
@@ -479,10 +421,8 @@ Format your response as a proper JSON object that can be parsed without errors."
                 top_p=0.95,
                 frequency_penalty=0,
                 presence_penalty=0,
-                stop=None
-            )
-            
-            response_text = completion.choices[0].message.content.strip()
+                call_type="certificate"
+            ).strip()
             
             # Parse JSON response
             certificate_data = json.loads(response_text)
@@ -495,6 +435,7 @@ Format your response as a proper JSON object that can be parsed without errors."
             }
         
         # Save to Cosmos DB if available
+        container = get_cosmos_container("internships")
         if container:
             try:
                 container.upsert_item({
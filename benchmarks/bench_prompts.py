@@ -0,0 +1,94 @@
+"""
+Micro-benchmark for supervisor prompt construction.
+
+Measures per-call CPU time and allocated bytes for each prompt builder in
+supervisor_prompts, both warm (memoized preamble, the steady state of a
+running worker) and cold (caches cleared before every call).
+
+Pass --baseline with another copy of supervisor_prompts.py to compare against
+it, e.g. the version before the templates were precompiled:
+
+    git show 96e3663:supervisor_prompts.py > /tmp/supervisor_prompts_old.py
+    python benchmarks/bench_prompts.py --baseline /tmp/supervisor_prompts_old.py
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import supervisor_prompts
+
+INDUSTRIES = ["Fintech", "Healthcare", "Marketing", "Technology & IT", "Education"]
+
+CASES = {
+    "task_generation": lambda m, ind: m.get_task_generation_prompt(ind, None, {"major": "Computer Science", "interests": "AI"}, 2),
+    "feedback": lambda m, ind: m.get_feedback_prompt(ind, "Market analysis", "Analyse the market", "My submission " * 50, "medium"),
+    "chat": lambda m, ind: m.get_chat_prompt(ind, "How should I start?", {"major": "Economics"}, {"title": "Market analysis"}),
+    "resources": lambda m, ind: m.get_resources_prompt(ind, "Market analysis", "Analyse the market"),
+    "certificate": lambda m, ind: m.get_certificate_prompt(ind, "Jordan Lee", "Analyst Internship", 12, 88.5),
+}
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location("supervisor_prompts_baseline", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def clear_caches(module):
+    for name in ("generate_base_supervisor_context", "_system_message", "_task_system_message"):
+        cache_clear = getattr(getattr(module, name, None), "cache_clear", None)
+        if cache_clear:
+            cache_clear()
+
+def measure(module, build, iterations, cold):
+    """Return (microseconds per call, bytes allocated per call)"""
+    clear_caches(module)
+    for industry in INDUSTRIES:
+        build(module, industry)
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        if cold:
+            clear_caches(module)
+        build(module, INDUSTRIES[i % len(INDUSTRIES)])
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sample = min(iterations, 1000)
+    results = []
+    for i in range(sample):
+        if cold:
+            clear_caches(module)
+        # Keep the results alive so their allocations are counted
+        results.append(build(module, INDUSTRIES[i % len(INDUSTRIES)]))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+
+    return elapsed / iterations * 1e6, allocated / sample
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--baseline", help="Path to another supervisor_prompts.py to compare against")
+    args = parser.parse_args()
+
+    variants = [("warm", supervisor_prompts, False), ("cold", supervisor_prompts, True)]
+    if args.baseline:
+        variants.append(("baseline", load_module(args.baseline), False))
+
+    print(f"{'prompt':<18}" + "".join(f"{name + ' us':>14}{name + ' B':>14}" for name, _, _ in variants))
+    for case, build in CASES.items():
+        row = f"{case:<18}"
+        for _, module, cold in variants:
+            micros, allocated = measure(module, build, args.iterations, cold)
+            row += f"{micros:>14.2f}{allocated:>14.0f}"
+        print(row)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+End-to-end benchmark for the hot routes.
+
+Runs the Flask app in-process against a seeded database (see seed_data.py)
+and the fake LLM server (see fake_llm_server.py), drives each route from a
+pool of signed-in clients, and reports per route:
+
+- latency p50/p95/p99 in milliseconds
+- SQL queries per request (mean and max)
+- non-200 responses
+- process RSS after the route, and the peak RSS of the run
+
+The seeded database is copied before every run, so writes made by the routes
+(queued resource refreshes, ...) never leak into the next run.
+
+Results are written to benchmarks/results/routes_<scale>.json. With
+--update-baseline they also become the baseline in benchmarks/baselines/,
+which later runs are compared against; a run exits with status 1 when a route
+issues more queries than its baseline or its p95 latency or the peak RSS grow
+by more than the tolerance.
+
+    python benchmarks/seed_data.py --scale 100k
+    python benchmarks/bench_routes.py --scale 100k --concurrency 8
+    python benchmarks/bench_routes.py --scale 100k --update-baseline
+
+The admin list routes render every row; at the 1M scale pass a smaller
+--requests or restrict the run with --routes.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_ROOT))
+
+from seed_data import SCALES, BENCH_PASSWORD, database_path, configure_environment
+
+RESULTS_DIR = os.path.join(BENCH_ROOT, "results")
+BASELINES_DIR = os.path.join(BENCH_ROOT, "baselines")
+
+ADMIN_EMAIL = "admin@internverse.com"
+ADMIN_PASSWORD = "admin123"  # Created by api.init_data.initialize_data
+
+# name: (method, path template, signed in as, run by default)
+ROUTES = {
+    "dashboard": ("GET", "/dashboard", "user", True),
+    "internship_detail": ("GET", "/internship/{internship_id}", "user", True),
+    "task_detail": ("GET", "/task/{task_id}", "user", True),
+    "admin_dashboard": ("GET", "/admin/dashboard", "admin", True),
+    "admin_analytics": ("GET", "/admin/analytics", "admin", True),
+    "admin_users": ("GET", "/admin/users", "admin", True),
+    "admin_internships": ("GET", "/admin/internships", "admin", True),
+    "admin_users_page": ("GET", "/admin/api/users", "admin", True),
+    "admin_internships_page": ("GET", "/admin/api/internships?status=active", "admin", True),
+    "admin_analytics_data": ("GET", "/admin/api/analytics", "admin", True),
+    # Goes through the LLM gateway; per-user rate limits apply
+    "ask_supervisor": ("POST", "/ask-supervisor", "user", False),
+}
+
+class QueryCounter:
+    """Counts SQL statements executed by the current thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.count = getattr(self._local, "count", 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    def value(self):
+        return getattr(self._local, "count", 0)
+
+class Session:
+    """A signed-in test client and the rows it may request"""
+
+    def __init__(self, client, internship_ids, task_ids):
+        self.client = client
+        self.internship_ids = internship_ids
+        self.task_ids = task_ids
+        self.lock = threading.Lock()
+
+def rss_mb():
+    """Current resident set size in MB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+def peak_rss_mb():
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return maxrss / (1024 * 1024) if platform.system() == "Darwin" else maxrss / 1024
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_fake_llm(latency_scale, seed):
+    """Start the fake LLM server in a subprocess; returns (process, base URL)"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_ROOT, "fake_llm_server.py"),
+         "--port", str(port), "--latency-scale", str(latency_scale), "--seed", str(seed)],
+        stdout=subprocess.DEVNULL
+    )
+    for _ in range(50):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+            return process, f"http://127.0.0.1:{port}/v1"
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Fake LLM server did not start")
+
+def sign_in(app, email, password):
+    """
+    Sign in with a new test client and check the session is authenticated
+
+    Must run outside an app context: Flask-Login caches the loaded user on
+    `g`, which a shared context would hand to every later login.
+    """
+    client = app.test_client()
+    response = client.post("/login", data={"email": email, "password": password})
+    if response.status_code != 302:
+        raise RuntimeError(f"Could not sign in as {email}")
+    response = client.get("/dashboard")
+    if response.status_code != 200:
+        raise RuntimeError(f"Signed in as {email} but /dashboard returned {response.status_code}")
+    return client
+
+def build_sessions(app, count, admin_count, rng):
+    """Sign in `count` seeded users picked at random, and the admin `admin_count` times"""
+    from models.user import User
+    from models.internship import InternshipTrack, Task
+
+    with app.app_context():
+        emails = [email for (email,) in User.query.with_entities(User.email).filter(User.email.like("bench%@example.com"))]
+        if not emails:
+            raise RuntimeError("No seeded users found, run benchmarks/seed_data.py first")
+        picked = rng.sample(emails, min(count, len(emails)))
+
+        owned = []
+        for email in picked:
+            user = User.query.filter_by(email=email).first()
+            internship_ids = [i for (i,) in InternshipTrack.query.with_entities(InternshipTrack.id).filter_by(user_id=user.id)]
+            task_ids = [t for (t,) in Task.query.with_entities(Task.id).filter(Task.internship_id.in_(internship_ids))]
+            owned.append((email, internship_ids, task_ids))
+
+    sessions = [
+        Session(sign_in(app, email, BENCH_PASSWORD), internship_ids, task_ids)
+        for email, internship_ids, task_ids in owned
+    ]
+    admins = [Session(sign_in(app, ADMIN_EMAIL, ADMIN_PASSWORD), [], []) for _ in range(admin_count)]
+    return sessions, admins
+
+def run_route(name, sessions, admins, counter, requests, concurrency, rng):
+    """Issue `requests` requests to one route; returns the route's measurements"""
+    method, template, role, _ = ROUTES[name]
+    latencies, queries, errors = [], [], 0
+    results_lock = threading.Lock()
+
+    plan = []
+    for i in range(requests):
+        pool = admins if role == "admin" else sessions
+        session = pool[i % len(pool)]
+        path = template.format(
+            internship_id=rng.choice(session.internship_ids) if session.internship_ids else 0,
+            task_id=rng.choice(session.task_ids) if session.task_ids else 0
+        )
+        plan.append((session, path))
+
+    def issue(item):
+        nonlocal errors
+        session, path = item
+        body = {"data": {"question": "How should I structure my report?"}} if method == "POST" else {}
+        # A test client keeps one cookie jar, so each session is used by one thread at a time
+        with session.lock:
+            counter.reset()
+            started = time.perf_counter()
+            response = session.client.open(path, method=method, **body)
+            elapsed = (time.perf_counter() - started) * 1000
+            executed = counter.value()
+        with results_lock:
+            latencies.append(elapsed)
+            queries.append(executed)
+            if response.status_code != 200:
+                errors += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(issue, plan))
+
+    return {
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries_mean": round(sum(queries) / len(queries), 2),
+        "queries_max": max(queries),
+        "errors": errors,
+        "rss_mb": round(rss_mb(), 1),
+    }
+
+def compare(result, baseline, tolerance):
+    """List regressions of result against baseline"""
+    regressions = []
+    for name, route in result["routes"].items():
+        base = baseline["routes"].get(name)
+        if not base:
+            continue
+        if route["errors"] > base["errors"]:
+            regressions.append(f"{name}: {route['errors']} failed requests, baseline {base['errors']}")
+        if route["queries_mean"] > base["queries_mean"]:
+            regressions.append(f"{name}: {route['queries_mean']} queries/request, baseline {base['queries_mean']}")
+        if route["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {route['p95_ms']}ms, baseline {base['p95_ms']}ms")
+    if result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(f"peak RSS {result['peak_rss_mb']}MB, baseline {baseline['peak_rss_mb']}MB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--routes", help=f"Comma-separated subset of: {', '.join(ROUTES)}")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per route")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per route first")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=32, help="Signed-in seeded users to spread requests over")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--llm-latency-scale", type=float, default=1.0, help="Passed to the fake LLM server")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 and RSS growth over the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    routes = args.routes.split(",") if args.routes else [name for name, route in ROUTES.items() if route[3]]
+    unknown = [name for name in routes if name not in ROUTES]
+    if unknown:
+        parser.error(f"Unknown routes: {', '.join(unknown)}")
+
+    seeded = database_path(args.scale)
+    if not os.path.exists(seeded):
+        parser.error(f"{seeded} not found, run: python benchmarks/seed_data.py --scale {args.scale}")
+
+    workdir = tempfile.mkdtemp(prefix="bench_routes_")
+    db_path = os.path.join(workdir, os.path.basename(seeded))
+    shutil.copyfile(seeded, db_path)
+    fake_llm, fake_llm_url = start_fake_llm(args.llm_latency_scale, args.seed)
+
+    try:
+        configure_environment(db_path, fake_llm_url)
+        from sqlalchemy import event
+        from app import app, db
+
+        counter = QueryCounter()
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", counter)
+
+        rng = random.Random(args.seed)
+        sessions, admins = build_sessions(app, args.users, args.concurrency, rng)
+        startup_rss = rss_mb()
+
+        result = {"scale": args.scale, "concurrency": args.concurrency, "routes": {}}
+        print(f"{'route':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'max q':>8}{'errors':>8}{'RSS MB':>9}")
+        for name in routes:
+            if args.warmup:
+                run_route(name, sessions, admins, counter, args.warmup, args.concurrency, rng)
+            route = run_route(name, sessions, admins, counter, args.requests, args.concurrency, rng)
+            result["routes"][name] = route
+            print(f"{name:<20}{route['p50_ms']:>10.1f}{route['p95_ms']:>10.1f}{route['p99_ms']:>10.1f}"
+                  f"{route['queries_mean']:>10.1f}{route['queries_max']:>8}{route['errors']:>8}{route['rss_mb']:>9.1f}")
+
+        result["startup_rss_mb"] = round(startup_rss, 1)
+        result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        print(f"RSS at startup {result['startup_rss_mb']}MB, peak {result['peak_rss_mb']}MB")
+    finally:
+        fake_llm.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(os.path.join(RESULTS_DIR, f"routes_{args.scale}.json"), "w") as f:
+        json.dump(result, f, indent=2)
+
+    baseline_path = os.path.join(BASELINES_DIR, f"routes_{args.scale}.json")
+    if args.update_baseline:
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline written to {baseline_path}")
+        return
+
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Measure worker cold start: the time to `import app` in a fresh interpreter.
+
+Each run starts `python -X importtime -c "import app"` against a database that
+already holds the schema and the seed catalog, as a new worker on an existing
+deployment would. The report gives the wall time per start, the modules with
+the largest cumulative import time, and any module from DEFERRED_MODULES that
+was imported at startup; those SDKs must load on first use only.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --update-baseline
+
+Exits with status 1 when a deferred module is imported at startup, when the
+median start time exceeds the baseline by more than --tolerance, or when there
+is no baseline to compare with.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_ROOT = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_ROOT)
+sys.path.insert(0, ROOT)
+
+from seed_data import configure_environment
+
+RESULTS_DIR = os.path.join(BENCH_ROOT, "results")
+BASELINES_DIR = os.path.join(BENCH_ROOT, "baselines")
+
+# Heavy SDKs that are imported on first use, never while a worker starts
+DEFERRED_MODULES = ["openai", "httpx", "requests", "azure.cosmos", "azure.search.documents"]
+
+# "import time: self [us] | cumulative | imported package", nested imports indented
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)$")
+
+def start_once():
+    """
+    Import the app in a new interpreter
+
+    Returns:
+        tuple: (wall time in ms, {module: (self us, cumulative us)})
+    """
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing the app failed:\n{process.stderr[-2000:]}")
+
+    modules = {}
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us))
+    return wall_ms, modules
+
+def compare(result, baseline, tolerance):
+    """List regressions of a result against a baseline"""
+    regressions = [f"{name} imported at startup" for name in result["deferred_loaded"]]
+    if result["median_ms"] > baseline["median_ms"] * (1 + tolerance):
+        regressions.append(f"median start {result['median_ms']}ms, baseline {baseline['median_ms']}ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Measured cold starts")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median growth over the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        configure_environment(os.path.join(workdir, "startup.db"))
+        # The first start creates the schema and applies the seed catalog
+        start_once()
+
+        runs = [start_once() for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    wall_ms = [wall for wall, _ in runs]
+    _, modules = runs[-1]
+    slowest = sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]
+    result = {
+        "runs": args.runs,
+        "median_ms": round(statistics.median(wall_ms), 1),
+        "max_ms": round(max(wall_ms), 1),
+        "import_app_ms": round(modules.get("app", (0, 0))[1] / 1000, 1),
+        "slowest_imports": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 1), "self_ms": round(self_us / 1000, 1)}
+            for name, (self_us, cumulative) in slowest
+        ],
+        "deferred_loaded": [name for name in DEFERRED_MODULES if name in modules],
+    }
+
+    print(f"Cold start over {args.runs} runs: median {result['median_ms']}ms, max {result['max_ms']}ms "
+          f"(import app {result['import_app_ms']}ms)")
+    print(f"{'module':<50}{'cumulative ms':>15}{'self ms':>10}")
+    for row in result["slowest_imports"]:
+        print(f"{row['module']:<50}{row['cumulative_ms']:>15.1f}{row['self_ms']:>10.1f}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(os.path.join(RESULTS_DIR, "startup.json"), "w") as f:
+        json.dump(result, f, indent=2)
+
+    baseline_path = os.path.join(BASELINES_DIR, "startup.json")
+    if args.update_baseline:
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline written to {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}, run with --update-baseline")
+        sys.exit(1)
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = compare(result, baseline, args.tolerance)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Check that every query issued by the hot routes is served by an index.
+
+Drives the user-facing hot routes once per signed-in user against a seeded
+database, captures each SELECT they send, and runs it again under EXPLAIN
+(EXPLAIN QUERY PLAN on SQLite). A plan that scans a whole table fails the
+check, except for the small catalog tables in ALLOWED_SCANS. On Postgres
+sequential scans are disabled for the EXPLAIN, so a seq scan in the plan means
+no usable index exists rather than that the planner preferred one.
+
+The admin list pages read every row by design and are not checked.
+
+    python benchmarks/explain_hot_routes.py --scale 1k
+    python benchmarks/explain_hot_routes.py --database-url postgresql://...
+
+Exits with status 1 when any query scans a table.
+"""
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+
+BENCH_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_ROOT))
+
+from seed_data import SCALES, database_path, configure_environment
+from bench_routes import ROUTES, build_sessions
+
+HOT_ROUTES = ["dashboard", "internship_detail", "task_detail"]
+
+# Catalog tables with a handful of rows, where a scan is cheaper than an index
+ALLOWED_SCANS = {"industry", "company", "role"}
+
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+class StatementRecorder:
+    """Collects distinct SELECT statements and one set of their parameters"""
+
+    def __init__(self):
+        self.statements = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            with self._lock:
+                self.statements.setdefault(statement, parameters)
+
+def scanned_tables(conn, statement, parameters, tables):
+    """Run EXPLAIN for a statement; returns the real tables its plan scans in full"""
+    if conn.dialect.name == "sqlite":
+        plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        found = [match.group(1) for match in map(SQLITE_SCAN.match, plan) if match]
+    else:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        plan = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+        found = [match.group(1) for line in plan for match in [POSTGRES_SCAN.search(line)] if match]
+    # Scans of subqueries and CTEs are fine, only base tables count
+    return sorted({table for table in found if table in tables and table not in ALLOWED_SCANS}), plan
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k", help="Seeded SQLite database to check against")
+    parser.add_argument("--database-url", help="Check against this database instead, e.g. a seeded Postgres")
+    parser.add_argument("--users", type=int, default=5, help="Signed-in users to drive the routes as")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="explain_hot_routes_")
+    try:
+        if args.database_url:
+            configure_environment(os.path.join(workdir, "unused.db"))
+            os.environ["DATABASE_URL"] = args.database_url
+        else:
+            seeded = database_path(args.scale)
+            if not os.path.exists(seeded):
+                parser.error(f"{seeded} not found, run: python benchmarks/seed_data.py --scale {args.scale}")
+            db_path = os.path.join(workdir, os.path.basename(seeded))
+            shutil.copyfile(seeded, db_path)
+            configure_environment(db_path)
+
+        from sqlalchemy import event
+        from app import app, db
+
+        # Signing in runs setup queries of its own, so recording starts afterwards
+        sessions, _ = build_sessions(app, args.users, 0, random.Random(1))
+        recorder = StatementRecorder()
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", recorder)
+
+        for session in sessions:
+            for name in HOT_ROUTES:
+                _, template, _, _ = ROUTES[name]
+                path = template.format(internship_id=session.internship_ids[0], task_id=session.task_ids[0])
+                response = session.client.get(path)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+
+        with app.app_context():
+            event.remove(db.engine, "before_cursor_execute", recorder)
+            tables = set(db.metadata.tables)
+            failures = 0
+            with db.engine.connect() as conn:
+                for statement, parameters in recorder.statements.items():
+                    scans, plan = scanned_tables(conn, statement, parameters, tables)
+                    if scans:
+                        failures += 1
+                        print(f"FULL SCAN of {', '.join(scans)}:\n  {' '.join(statement.split())}")
+                        for line in plan:
+                            print(f"    {line}")
+
+        print(f"Checked {len(recorder.statements)} distinct queries from {', '.join(HOT_ROUTES)}: "
+              f"{failures} scan a table")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
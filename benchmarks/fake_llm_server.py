@@ -0,0 +1,405 @@
+"""
+OpenAI-compatible fake LLM server for offline load testing.
+
+Replays recorded chat completions per prompt type (tasks, feedback,
+batch_feedback, chat, resources, certificate, internship, companies) with
+latency drawn from a configurable distribution, and injects upstream errors
+(500) and quota rejections (429 with Retry-After) at configurable rates, so the
+whole Flask app can be benchmarked without spending Azure OpenAI quota.
+
+Point the app at it with:
+
+    LLM_MODE=fake FAKE_LLM_URL=http://127.0.0.1:8900/v1 python main.py
+    python benchmarks/fake_llm_server.py --port 8900
+
+In fake mode the gateway sends an X-LLM-Call-Type header that selects the
+prompt type; requests without it (e.g. the Azure Function, pointed here through
+AZURE_OPENAI_ENDPOINT) are classified from the prompt text. Both the OpenAI
+path (/v1/chat/completions) and the Azure deployment path
+(/openai/deployments/<name>/chat/completions) are served, streaming included.
+
+Latency, error and 429 rates per prompt type come from --profile (see
+fake_llm/profile.json). Each type draws a lognormal latency from its median
+and p95; streams send the first chunk after `ttft` seconds and spread the
+remaining time over the other chunks.
+
+Record mode proxies every request to a real upstream and appends the responses
+(and observed latencies) to the recordings file, to refresh the fixtures.
+Upstream is always called without streaming; streamed requests get the
+recorded answer re-chunked. No faults are injected while recording. E.g.:
+
+    UPSTREAM_API_KEY=... python benchmarks/fake_llm_server.py --record \\
+        --upstream https://<resource>.openai.azure.com --azure-deployment gpt-4o
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RECORDINGS = os.path.join(HERE, "fake_llm", "recordings.json")
+DEFAULT_PROFILE = os.path.join(HERE, "fake_llm", "profile.json")
+
+KINDS = ("tasks", "feedback", "batch_feedback", "chat", "resources", "certificate", "internship", "companies")
+
+# Fallback classification from the prompt text, first match wins. Phrases are
+# taken from the prompts in supervisor_prompts, services/ and azure_services.
+PROMPT_RULES = [
+    ("batch_feedback", re.compile(r'"evaluations"')),
+    ("companies", re.compile(r"realistic companies|'companies'")),
+    ("certificate", re.compile(r"certificate")),
+    ("resources", re.compile(r"resource objects|resource advisor|suggest resources|type fields")),
+    ("feedback", re.compile(r"numerical score|score \(0-100\)")),
+    ("tasks", re.compile(r"task objects|weekly tasks|tasks for week")),
+    ("internship", re.compile(r"duration_weeks")),
+]
+
+SUBMISSION_ID = re.compile(r"=== SUBMISSION (\S+) \(task")
+
+def classify(call_type, messages):
+    """
+    Work out which prompt type a request is
+
+    Args:
+        call_type (str): X-LLM-Call-Type header, or None
+        messages (list): The request's chat messages
+
+    Returns:
+        str: One of KINDS
+    """
+    text = "\n".join(str(message.get("content") or "") for message in messages).lower()
+    # The gateway's call types are coarser than the recordings
+    if call_type == "feedback":
+        return "batch_feedback" if '"evaluations"' in text else "feedback"
+    if call_type == "internship":
+        return "companies" if "companies" in text else "internship"
+    if call_type in KINDS:
+        return call_type
+    for kind, pattern in PROMPT_RULES:
+        if pattern.search(text):
+            return kind
+    return "chat"
+
+def count_tokens(text):
+    # Same estimate as services.rate_limiter: about 4 characters per token
+    return max(1, len(text) // 4)
+
+class Recordings:
+    """Recorded responses per prompt type, replayed at random"""
+
+    def __init__(self, path, rng):
+        self.path = path
+        self.rng = rng
+        self._lock = threading.Lock()
+        with open(path) as f:
+            self.entries = json.load(f)
+
+    def pick(self, kind, messages):
+        with self._lock:
+            candidates = self.entries.get(kind) or self.entries.get("chat")
+            entry = self.rng.choice(candidates)
+        content = entry["content"] if "content" in entry else json.dumps(entry["json"])
+        if kind == "batch_feedback":
+            content = self._fit_batch(content, messages)
+        return content
+
+    def _fit_batch(self, content, messages):
+        """Answer for the submission ids actually in the prompt, using the recorded evaluation as a template"""
+        ids = SUBMISSION_ID.findall(messages[-1].get("content") or "")
+        try:
+            template = json.loads(content)["evaluations"][0]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return content
+        return json.dumps({"evaluations": [dict(template, id=item_id) for item_id in ids]})
+
+    def add(self, kind, content, latency):
+        with self._lock:
+            self.entries.setdefault(kind, []).append({"content": content, "latency": round(latency, 3)})
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+class Profile:
+    """Latency distribution and fault rates per prompt type"""
+
+    def __init__(self, path, rng, latency_scale=1.0, error_rate=None, rate_limit_rate=None):
+        with open(path) as f:
+            profiles = json.load(f)
+        self.default = profiles.get("default", {})
+        self.kinds = profiles
+        self.rng = rng
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._lock = threading.Lock()
+
+    def settings(self, kind):
+        settings = dict(self.default, **self.kinds.get(kind, {}))
+        if self.error_rate is not None:
+            settings["error_rate"] = self.error_rate
+        if self.rate_limit_rate is not None:
+            settings["rate_limit_rate"] = self.rate_limit_rate
+        return settings
+
+    def latency(self, settings):
+        """Draw a lognormal latency with the configured median and p95"""
+        median = settings.get("median", 1.0)
+        p95 = max(settings.get("p95", median), median)
+        sigma = math.log(p95 / median) / 1.645 if median > 0 else 0
+        with self._lock:
+            seconds = median * math.exp(self.rng.gauss(0, sigma)) if median > 0 else 0
+        return seconds * self.latency_scale
+
+    def roll(self, rate):
+        return self.fraction() < (rate or 0)
+
+    def fraction(self):
+        with self._lock:
+            return self.rng.random()
+
+class Stats:
+    """Request counters exposed on GET /stats"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def incr(self, name):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+def call_upstream(config, body):
+    """Forward a request to the real API without streaming; returns (content, latency)"""
+    body = dict(body, stream=False)
+    body.pop("stream_options", None)
+    if config.azure_deployment:
+        url = (
+            f"{config.upstream.rstrip('/')}/openai/deployments/{config.azure_deployment}"
+            f"/chat/completions?api-version={config.api_version}"
+        )
+        headers = {"api-key": config.upstream_key}
+    else:
+        url = f"{config.upstream.rstrip('/')}/chat/completions"
+        headers = {"Authorization": f"Bearer {config.upstream_key}"}
+    headers["Content-Type"] = "application/json"
+
+    started = time.monotonic()
+    request = Request(url, data=json.dumps(body).encode("utf-8"), headers=headers, method="POST")
+    with urlopen(request, timeout=config.upstream_timeout) as response:
+        payload = json.loads(response.read())
+    return payload["choices"][0]["message"]["content"] or "", time.monotonic() - started
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeLLM/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.config.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok", "mode": "record" if self.server.config.record else "replay"})
+        elif path == "/stats":
+            self._send_json(200, self.server.stats.snapshot())
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if not path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        messages = body.get("messages") or []
+        kind = classify(self.headers.get("X-LLM-Call-Type"), messages)
+        server = self.server
+        settings = server.profile.settings(kind)
+        server.stats.incr(f"requests.{kind}")
+
+        # Faults are only injected when replaying
+        injecting = not server.config.record
+        if injecting and server.profile.roll(settings.get("rate_limit_rate")):
+            server.stats.incr("injected.429")
+            retry_after = settings.get("retry_after", 1)
+            self._send_json(
+                429,
+                {"error": {"code": "429", "message": f"Rate limit reached. Retry after {retry_after} seconds.", "type": "rate_limit_error"}},
+                headers={"Retry-After": str(retry_after)}
+            )
+            return
+
+        latency = server.profile.latency(settings)
+        if injecting and server.profile.roll(settings.get("error_rate")):
+            server.stats.incr("injected.500")
+            # Failures are not instant either
+            time.sleep(latency * server.profile.fraction())
+            self._send_json(500, {"error": {"message": "The server had an error while processing your request.", "type": "server_error"}})
+            return
+
+        if server.config.record:
+            try:
+                content, latency = call_upstream(server.config, body)
+            except HTTPError as e:
+                server.stats.incr(f"upstream.{e.code}")
+                self._send_raw(e.code, e.read(), headers={"Retry-After": e.headers.get("Retry-After")})
+                return
+            except Exception as e:
+                server.stats.incr("upstream.error")
+                self._send_json(502, {"error": {"message": f"Upstream request failed: {e}", "type": "server_error"}})
+                return
+            server.recordings.add(kind, content, latency)
+            # The upstream call already took the real time
+            latency = 0
+        else:
+            content = server.recordings.pick(kind, messages)
+
+        model = body.get("model") or "gpt-4o"
+        usage = {
+            "prompt_tokens": sum(count_tokens(str(m.get("content") or "")) + 4 for m in messages),
+            "completion_tokens": count_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if body.get("stream"):
+            self._stream(model, content, latency, settings.get("ttft", 0.3) * server.profile.latency_scale)
+        else:
+            time.sleep(latency)
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+
+    def _stream(self, model, content, latency, ttft):
+        """Send content as server-sent chunks, first after ttft, the rest spread over the remaining latency"""
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        pieces = re.findall(r"\S+\s*|\s+", content) or [""]
+        ttft = min(ttft, latency)
+        gap = (latency - ttft) / max(1, len(pieces) - 1)
+
+        def chunk(delta, finish_reason=None):
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            time.sleep(ttft)
+            self._event(chunk({"role": "assistant", "content": ""}))
+            for index, piece in enumerate(pieces):
+                if index:
+                    time.sleep(gap)
+                self._event(chunk({"content": piece}))
+            self._event(chunk({}, "stop"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away mid-stream, as the app does on disconnect
+            self.server.stats.incr("streams.aborted")
+
+    def _event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send_json(self, status, payload, headers=None):
+        self._send_raw(status, json.dumps(payload).encode("utf-8"), headers)
+
+    def _send_raw(self, status, data, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            if value is not None:
+                self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, FakeLLMHandler)
+        self.config = config
+        rng = random.Random(config.seed)
+        self.recordings = Recordings(config.recordings, rng)
+        self.profile = Profile(config.profile, rng, config.latency_scale, config.error_rate, config.rate_limit_rate)
+        self.stats = Stats()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS, help="Recorded responses per prompt type")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, help="Latency and fault rates per prompt type")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply every latency, 0 for none")
+    parser.add_argument("--error-rate", type=float, help="Override the 500 rate for every prompt type")
+    parser.add_argument("--rate-limit-rate", type=float, help="Override the 429 rate for every prompt type")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible latencies and faults")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--record", action="store_true", help="Proxy to --upstream and append responses to --recordings")
+    parser.add_argument("--upstream", help="Upstream base URL, e.g. https://api.openai.com/v1 or the Azure endpoint")
+    parser.add_argument("--azure-deployment", help="Treat --upstream as an Azure OpenAI endpoint with this deployment")
+    parser.add_argument("--api-version", default="2023-12-01-preview", help="Azure OpenAI API version")
+    parser.add_argument("--upstream-timeout", type=float, default=120)
+    config = parser.parse_args(argv)
+
+    config.upstream_key = os.environ.get("UPSTREAM_API_KEY")
+    if config.record and not (config.upstream and config.upstream_key):
+        parser.error("--record needs --upstream and the UPSTREAM_API_KEY environment variable")
+    return config
+
+def main():
+    config = parse_args()
+    server = FakeLLMServer((config.host, config.port), config)
+    mode = f"recording from {config.upstream}" if config.record else "replaying"
+    print(f"Fake LLM server on http://{config.host}:{config.port}/v1, {mode}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Seed a benchmark database at a given scale.
+
+Creates the catalog with api.init_data.initialize_data (admin user,
+industries, companies) and then bulk-inserts synthetic users, internships,
+tasks, submissions and certificates. The scale names the approximate number
+of submissions; every other table grows with it:
+
+    scale   users   internships   tasks     submissions
+    1k      50      100           500       ~1,000
+    100k    5,000   10,000        50,000    ~100,000
+    1M      50,000  100,000       500,000   ~1,000,000
+
+Seeding is deterministic for a given --seed, so the same scale always produces
+the same database. Every synthetic user signs in with BENCH_PASSWORD.
+
+    python benchmarks/seed_data.py --scale 100k
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+BENCH_DIR = os.path.join(ROOT, "instance", "bench")
+BENCH_PASSWORD = "bench-password"
+BENCH_EMAIL = "bench{}@example.com"
+
+INTERNSHIPS_PER_USER = 2
+TASKS_PER_INTERNSHIP = 5
+SUBMITTED_TASK_SHARE = 0.8  # Tasks with at least one submission
+MAX_SUBMISSIONS_PER_TASK = 4  # Resubmissions, 1 to this many (2.5 on average)
+CHUNK_SIZE = 10_000
+
+LOREM = (
+    "The intern reviewed the brief, gathered sources from industry reports and interviews, and summarised the "
+    "findings in a structured document. Key risks and assumptions are listed with supporting evidence, followed "
+    "by recommendations ranked by expected impact and cost. Open questions for the supervisor close the report. "
+)
+
+MAJORS = ["Computer Science", "Business Administration", "Economics", "Biology", "Marketing", "Mechanical Engineering"]
+DIFFICULTIES = [("easy", 60), ("medium", 100), ("hard", 150)]
+
+def database_path(scale):
+    """
+    Get the seeded database file for a scale
+
+    Args:
+        scale (str): One of SCALES
+
+    Returns:
+        str: Absolute path under instance/bench
+    """
+    return os.path.join(BENCH_DIR, f"bench_{scale}.db")
+
+def configure_environment(db_path, fake_llm_url=None):
+    """
+    Point the app at a benchmark database; must run before `app` is imported
+
+    Args:
+        db_path (str): SQLite file to use
+        fake_llm_url (str, optional): Fake LLM server base URL, enables LLM_MODE=fake
+    """
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    # Queued jobs stay queued, so runs only measure request handling
+    os.environ["JOB_QUEUE_WORKERS"] = "0"
+    os.environ["SHARED_STORE_PATH"] = os.path.abspath(db_path) + ".shared"
+    # Views that exceed their query budget fail the request, showing up as errors
+    os.environ["QUERY_BUDGET_ENFORCE"] = "true"
+    if fake_llm_url:
+        os.environ["LLM_MODE"] = "fake"
+        os.environ["FAKE_LLM_URL"] = fake_llm_url
+
+def _text(rng, length):
+    start = rng.randrange(len(LOREM))
+    return (LOREM[start:] + LOREM * (length // len(LOREM) + 1))[:length]
+
+def _next_id(db, model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+def _insert(db, model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(model.__table__.insert(), rows[start:start + CHUNK_SIZE])
+
+def seed_database(scale, seed=42):
+    """
+    Insert synthetic rows for a scale into the current app's database
+
+    Args:
+        scale (str): One of SCALES
+        seed (int): Random seed
+
+    Returns:
+        dict: Rows inserted per table
+    """
+    from werkzeug.security import generate_password_hash
+    from app import db
+    from api.init_data import initialize_data
+    from models.user import User, UserProfile
+    from models.internship import Industry, Company, InternshipTrack, Task, Submission, Certificate
+
+    initialize_data()
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    tasks_per_user = INTERNSHIPS_PER_USER * TASKS_PER_INTERNSHIP
+    submissions_per_task = SUBMITTED_TASK_SHARE * (1 + MAX_SUBMISSIONS_PER_TASK) / 2
+    user_count = max(1, round(SCALES[scale] / (tasks_per_user * submissions_per_task)))
+
+    companies_by_industry = {}
+    for company in Company.query.all():
+        companies_by_industry.setdefault(company.industry_id, []).append(company.id)
+    industry_ids = [industry.id for industry in Industry.query.all()]
+
+    # Hashing is slow on purpose; every bench user shares one hash
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    user_id = _next_id(db, User)
+    internship_id = _next_id(db, InternshipTrack)
+    task_id = _next_id(db, Task)
+    counts = {"user": 0, "internship_track": 0, "task": 0, "submission": 0, "certificate": 0}
+
+    # Users are written in batches so memory stays flat at the largest scale
+    batch_users = max(1, CHUNK_SIZE // (tasks_per_user * 3))
+    for batch_start in range(0, user_count, batch_users):
+        users, profiles, internships, tasks, submissions, certificates = [], [], [], [], [], []
+
+        for n in range(batch_start, min(user_count, batch_start + batch_users)):
+            created_at = now - timedelta(days=rng.randint(30, 720))
+            users.append({
+                "id": user_id, "username": f"bench{n}", "email": BENCH_EMAIL.format(n),
+                "password_hash": password_hash, "is_admin": False, "created_at": created_at
+            })
+            profiles.append({
+                "user_id": user_id, "full_name": f"Bench User {n}", "major": rng.choice(MAJORS),
+                "university": "Benchmark University", "career_interests": "Analytics, Strategy",
+                "graduation_year": rng.randint(2024, 2028), "profile_completed": True, "updated_at": created_at
+            })
+
+            for _ in range(INTERNSHIPS_PER_USER):
+                industry_id = rng.choice(industry_ids)
+                companies = companies_by_industry.get(industry_id)
+                status = rng.choices(["active", "completed", "abandoned"], weights=[70, 25, 5])[0]
+                started_at = created_at + timedelta(days=rng.randint(0, 25))
+                completed_at = started_at + timedelta(weeks=8) if status == "completed" else None
+                evaluated_tasks = 0
+                scores = []
+
+                for week in range(TASKS_PER_INTERNSHIP):
+                    difficulty, points = rng.choice(DIFFICULTIES)
+                    submitted = status == "completed" or rng.random() < SUBMITTED_TASK_SHARE
+                    task_status = "pending"
+                    if submitted:
+                        submitted_at = started_at + timedelta(days=7 * week + rng.randint(1, 6))
+                        for attempt in range(rng.randint(1, MAX_SUBMISSIONS_PER_TASK)):
+                            evaluated = status == "completed" or rng.random() < 0.85
+                            score = round(rng.uniform(55, 98), 1) if evaluated else None
+                            submissions.append({
+                                "task_id": task_id, "user_id": user_id,
+                                "content": _text(rng, rng.randint(150, 300)), "file_urls": "",
+                                "score": score,
+                                "feedback": _text(rng, rng.randint(150, 300)) if evaluated else None,
+                                "submitted_at": submitted_at + timedelta(hours=attempt),
+                                "evaluated_at": submitted_at + timedelta(hours=attempt, minutes=5) if evaluated else None
+                            })
+                        task_status = "evaluated" if score is not None else "submitted"
+                        if score is not None:
+                            evaluated_tasks += 1
+                            scores.append(score)
+                    elif rng.random() < 0.3:
+                        task_status = "in_progress"
+
+                    tasks.append({
+                        "id": task_id, "internship_id": internship_id, "title": f"Week {week + 1} Assignment",
+                        "description": _text(rng, 200), "instructions": _text(rng, 400),
+                        "difficulty": difficulty, "points": points, "status": task_status,
+                        "deadline": started_at + timedelta(days=7 * (week + 1)),
+                        "created_at": started_at, "updated_at": started_at
+                    })
+                    task_id += 1
+
+                internships.append({
+                    "id": internship_id, "industry_id": industry_id, "user_id": user_id,
+                    "company_id": rng.choice(companies) if companies else None, "role_id": None,
+                    "title": f"Virtual Internship {internship_id}", "description": _text(rng, 250),
+                    "duration_weeks": 8, "status": status,
+                    "progress": 100.0 if status == "completed" else evaluated_tasks / TASKS_PER_INTERNSHIP * 100,
+                    "started_at": started_at, "completed_at": completed_at
+                })
+                if status == "completed":
+                    certificates.append({
+                        "internship_id": internship_id, "user_id": user_id,
+                        "title": "Certificate of Completion", "description": _text(rng, 300),
+                        "score": round(sum(scores) / len(scores), 1) if scores else 0,
+                        "skills_acquired": "Research, Analysis, Professional communication",
+                        "issued_at": completed_at
+                    })
+                internship_id += 1
+            user_id += 1
+
+        _insert(db, User, users)
+        _insert(db, UserProfile, profiles)
+        _insert(db, InternshipTrack, internships)
+        _insert(db, Task, tasks)
+        _insert(db, Submission, submissions)
+        _insert(db, Certificate, certificates)
+        db.session.commit()
+
+        counts["user"] += len(users)
+        counts["internship_track"] += len(internships)
+        counts["task"] += len(tasks)
+        counts["submission"] += len(submissions)
+        counts["certificate"] += len(certificates)
+
+    # Bulk inserts bypass the counter updates, so fill them in from the rows
+    from services.internship_progress import recompute_internship_counters
+    from services.stats import refresh_counters
+    recompute_internship_counters()
+    db.session.commit()
+    refresh_counters()
+
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--db", help="SQLite file to create (default instance/bench/bench_<scale>.db)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="Replace an existing database")
+    args = parser.parse_args()
+
+    db_path = args.db or database_path(args.scale)
+    if os.path.exists(db_path):
+        if not args.force:
+            parser.error(f"{db_path} already exists, pass --force to replace it")
+        os.remove(db_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    configure_environment(db_path)
+    from app import app
+
+    started = time.monotonic()
+    with app.app_context():
+        counts = seed_database(args.scale, args.seed)
+    print(f"Seeded {db_path} in {time.monotonic() - started:.1f}s: " + ", ".join(f"{n:,} {table}" for table, n in counts.items()))
+
+if __name__ == "__main__":
+    main()
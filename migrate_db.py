@@ -1,45 +1,223 @@
 """
 Database migration script for the Virtual Internship Simulator
+
+Migrations are numbered and recorded in the schema_migration table, so each
+one runs once per database. They inspect the schema through SQLAlchemy rather
+than SQLite pragmas and only use DDL that SQLite and Postgres share, so the
+same list upgrades both. New tables and indexes declared on the models are
+created by db.create_all() on a fresh database; migrations bring existing
+databases to the same state and are no-ops where it already holds.
+
+Run on startup by app.py, or by hand with `python migrate_db.py`.
 """
 import logging
+from datetime import datetime
 from app import app, db
-from sqlalchemy import text
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Postgres advisory lock key held while a migration runs
+MIGRATION_LOCK_KEY = 7250315
+
+schema_migration = Table(
+    "schema_migration",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def _add_internship_company_and_role(conn):
+    """Add company_id and role_id to internship_track"""
+    columns = [column["name"] for column in inspect(conn).get_columns("internship_track")]
+
+    # Add company_id column if it doesn't exist
+    if 'company_id' not in columns:
+        conn.execute(text("ALTER TABLE internship_track ADD COLUMN company_id INTEGER REFERENCES company(id)"))
+        logger.info("Successfully added company_id column to internship_track table")
+
+    # Add role_id column if it doesn't exist
+    if 'role_id' not in columns:
+        conn.execute(text("ALTER TABLE internship_track ADD COLUMN role_id INTEGER REFERENCES role(id)"))
+        logger.info("Successfully added role_id column to internship_track table")
+
+# (index name, table, columns); must match the index=True columns and
+# __table_args__ declared on the models
+HOT_LOOKUP_INDEXES = [
+    ("ix_company_industry_id", "company", ["industry_id"]),
+    ("ix_role_industry_id", "role", ["industry_id"]),
+    ("ix_role_company_id", "role", ["company_id"]),
+    ("ix_internship_track_industry_id", "internship_track", ["industry_id"]),
+    ("ix_internship_track_company_id", "internship_track", ["company_id"]),
+    ("ix_internship_track_role_id", "internship_track", ["role_id"]),
+    ("ix_internship_track_user_status", "internship_track", ["user_id", "status"]),
+    ("ix_task_internship_status", "task", ["internship_id", "status"]),
+    ("ix_submission_task_user_submitted", "submission", ["task_id", "user_id", "submitted_at"]),
+    ("ix_submission_user_id", "submission", ["user_id"]),
+    ("ix_certificate_internship_id", "certificate", ["internship_id"]),
+    ("ix_certificate_user_id", "certificate", ["user_id"]),
+    ("ix_user_profile_user_id", "user_profile", ["user_id"]),
+    ("ix_admin_user_user_id", "admin_user", ["user_id"]),
+]
+
+def _create_indexes(conn, indexes):
+    """Create (name, table, columns) indexes that do not exist yet"""
+    quote = conn.dialect.identifier_preparer.quote
+    for name, table, columns in indexes:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {quote(name)} ON {quote(table)} ({', '.join(quote(c) for c in columns)})"
+        ))
+        logger.info(f"Ensured index {name} on {table}")
+
+def _index_hot_lookups(conn):
+    """Index every foreign key and the composite lookups used by the hot routes"""
+    _create_indexes(conn, HOT_LOOKUP_INDEXES)
+
+INTERNSHIP_COUNTER_COLUMNS = [
+    ("tasks_total", "INTEGER NOT NULL DEFAULT 0"),
+    ("tasks_evaluated", "INTEGER NOT NULL DEFAULT 0"),
+    ("score_sum", "FLOAT NOT NULL DEFAULT 0"),
+    ("score_count", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+def _add_internship_counters(conn):
+    """Add the progress and score counters to internship_track and fill them in"""
+    from services.internship_progress import recompute_internship_counters
+
+    columns = [column["name"] for column in inspect(conn).get_columns("internship_track")]
+    for name, definition in INTERNSHIP_COUNTER_COLUMNS:
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE internship_track ADD COLUMN {name} {definition}"))
+            logger.info(f"Successfully added {name} column to internship_track table")
+
+    recompute_internship_counters(connection=conn)
+    logger.info("Recomputed internship progress counters")
+
+# Sort orders of the keyset-paginated admin lists, see services/admin_lists.py
+ADMIN_LIST_INDEXES = [
+    ("ix_user_created", "user", ["created_at", "id"]),
+    ("ix_internship_track_started", "internship_track", ["started_at", "id"]),
+    ("ix_internship_track_status_started", "internship_track", ["status", "started_at", "id"]),
+    ("ix_internship_track_industry_started", "internship_track", ["industry_id", "started_at", "id"]),
+]
+
+def _index_admin_lists(conn):
+    """Index the sort orders of the admin users and internships lists"""
+    _create_indexes(conn, ADMIN_LIST_INDEXES)
+
+def _add_internship_soft_delete(conn):
+    """Add deleted_at to internship_track"""
+    columns = [column["name"] for column in inspect(conn).get_columns("internship_track")]
+    if 'deleted_at' not in columns:
+        conn.execute(text("ALTER TABLE internship_track ADD COLUMN deleted_at TIMESTAMP"))
+        logger.info("Successfully added deleted_at column to internship_track table")
+    _create_indexes(conn, [("ix_internship_track_deleted", "internship_track", ["deleted_at"])])
+
+def _seed_stat_counters(conn):
+    """Create the admin dashboard's row counters, so reading them never counts"""
+    from services.stats import seed_counters
+
+    created = seed_counters(conn)
+    if created:
+        logger.info(f"Created stat counters: {', '.join(created)}")
+
+def _partial_deleted_index(conn):
+    """Limit the purge backlog index to deleted internships"""
+    # Indexing every live row made the planner use it for deleted_at IS NULL instead of the sort indexes
+    conn.execute(text("DROP INDEX IF EXISTS ix_internship_track_deleted"))
+    conn.execute(text(
+        "CREATE INDEX ix_internship_track_deleted ON internship_track (deleted_at) WHERE deleted_at IS NOT NULL"
+    ))
+    logger.info("Recreated index ix_internship_track_deleted as a partial index")
+
+def _shard_stat_counters(conn):
+    """Split each stat counter over shard rows, so inserts do not all update one row"""
+    from models.stats import StatCounter
+    from services.stats import seed_counters
+
+    columns = [column["name"] for column in inspect(conn).get_columns("stat_counter")]
+    if 'shard' in columns:
+        return
+    # The counters only cache row totals, so rebuild the table and recount
+    StatCounter.__table__.drop(conn)
+    StatCounter.__table__.create(conn)
+    seed_counters(conn)
+    logger.info("Recreated stat_counter with sharded counters")
+
+def _index_industry_names(conn):
+    """Index industry names for the admin internships list's industry sorts"""
+    # Unique, so the planner knows walking the names in order walks the industries in order
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_industry_name ON industry (name)"))
+    logger.info("Ensured unique index ix_industry_name on industry")
+
+# (version, name, function taking a connection); append only, never renumber
+MIGRATIONS = [
+    (1, "Add company and role to internship_track", _add_internship_company_and_role),
+    (2, "Index foreign keys and hot lookup columns", _index_hot_lookups),
+    (3, "Add progress and score counters to internship_track", _add_internship_counters),
+    (4, "Index admin list sort orders", _index_admin_lists),
+    (5, "Add soft delete to internship_track", _add_internship_soft_delete),
+    (6, "Seed admin dashboard stat counters", _seed_stat_counters),
+    (7, "Make the internship_track deleted_at index partial", _partial_deleted_index),
+    (8, "Shard admin dashboard stat counters", _shard_stat_counters),
+    (9, "Index industry names", _index_industry_names),
+]
+
+def _lock_migrations(conn):
+    """Make the rest of the transaction the only one applying migrations"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    elif conn.dialect.name == "sqlite":
+        # SQLite has one writer at a time; the first write holds its lock until commit
+        conn.execute(schema_migration.delete().where(schema_migration.c.version == -1))
+
 def run_migrations():
     """
-    Run all database migrations
+    Apply every migration not yet recorded in schema_migration
+
+    Each migration runs in its own transaction together with its version
+    record, behind a lock that serializes migrating workers. When several
+    workers start at once, the ones that wait find the version recorded once
+    they hold the lock and move on instead of repeating the DDL.
+
+    Returns:
+        list: Versions applied by this call
     """
+    applied_now = []
     try:
         with app.app_context():
-            # Check existing columns
-            inspect_query = text("PRAGMA table_info(internship_track)")
-            result = db.session.execute(inspect_query)
-            columns = [row[1] for row in result.fetchall()]
-            
-            # Add company_id column if it doesn't exist
-            if 'company_id' not in columns:
-                alter_query = text("ALTER TABLE internship_track ADD COLUMN company_id INTEGER REFERENCES company(id)")
-                db.session.execute(alter_query)
-                db.session.commit()
-                logger.info("Successfully added company_id column to internship_track table")
-            else:
-                logger.info("company_id column already exists in internship_track table")
-            
-            # Add role_id column if it doesn't exist
-            if 'role_id' not in columns:
-                alter_query = text("ALTER TABLE internship_track ADD COLUMN role_id INTEGER REFERENCES role(id)")
-                db.session.execute(alter_query)
-                db.session.commit()
-                logger.info("Successfully added role_id column to internship_track table")
-            else:
-                logger.info("role_id column already exists in internship_track table")
+            schema_migration.create(db.engine, checkfirst=True)
+
+            with db.engine.connect() as conn:
+                applied = set(conn.execute(select(schema_migration.c.version)).scalars())
+
+            for version, name, migrate in MIGRATIONS:
+                if version in applied:
+                    continue
+
+                with db.engine.begin() as conn:
+                    _lock_migrations(conn)
+                    recorded = conn.execute(
+                        select(schema_migration.c.version).where(schema_migration.c.version == version)
+                    ).first()
+                    if recorded:
+                        logger.info(f"Migration {version} was applied by another process")
+                        continue
+                    migrate(conn)
+                    conn.execute(schema_migration.insert().values(
+                        version=version, name=name, applied_at=datetime.utcnow()
+                    ))
+
+                applied_now.append(version)
+                logger.info(f"Applied migration {version}: {name}")
     except Exception as e:
         logger.error(f"Error during migration: {str(e)}")
         raise
 
+    return applied_now
+
 if __name__ == "__main__":
     run_migrations()
-    logger.info("All migrations completed successfully")
\ No newline at end of file
+    logger.info("All migrations completed successfully")
@@ -0,0 +1,3 @@
+# Expose the models as package attributes for code that does `import models`
+from models.user import User, UserProfile, AdminUser
+from models.internship import Industry, Company, Role, InternshipTrack, Task, TaskResourceSet, Submission, Certificate
@@ -0,0 +1,22 @@
+from app import db
+
+class AnalyticsBucket(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)  # hour, day
+    bucket_start = db.Column(db.DateTime, nullable=False)  # UTC start of the hour or day
+    metric = db.Column(db.String(50), nullable=False)  # e.g. submission, evaluation, score_band
+    # Dimensions; 0, '' and -1 mean the metric is not split that way
+    industry_id = db.Column(db.Integer, nullable=False, default=0)
+    difficulty = db.Column(db.String(20), nullable=False, default='')
+    band = db.Column(db.Integer, nullable=False, default=-1)  # Lower bound of a 10-point score band
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)  # Sum of the metric's value, e.g. seconds or score
+
+    __table_args__ = (
+        # Upsert key; its prefix serves time range reads
+        db.UniqueConstraint('granularity', 'bucket_start', 'metric', 'industry_id', 'difficulty', 'band',
+                            name='uq_analytics_bucket_key'),
+    )
+
+    def __repr__(self):
+        return f'<AnalyticsBucket {self.granularity} {self.bucket_start} {self.metric}>'
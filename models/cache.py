@@ -0,0 +1,14 @@
+from datetime import datetime
+from app import db
+
+class GeneratedTaskSet(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), nullable=False, index=True)  # sha256 of the normalized generator inputs
+    namespace = db.Column(db.String(50), nullable=False)  # Which generator produced the payload
+    payload = db.Column(db.Text, nullable=False)  # JSON-encoded task list
+    hit_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<GeneratedTaskSet {self.namespace} {self.cache_key[:8]}>'
@@ -3,7 +3,7 @@ from app import db
 
 class Industry(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, unique=True, index=True)  # Admin internships list sorts by it
     description = db.Column(db.Text, nullable=False)
     icon = db.Column(db.String(100), nullable=True)
     tracks = db.relationship('InternshipTrack', backref='industry', lazy=True)
@@ -17,7 +17,7 @@ class Industry(db.Model):
 class Company(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    industry_id = db.Column(db.Integer, db.ForeignKey('industry.id'), nullable=False)
+    industry_id = db.Column(db.Integer, db.ForeignKey('industry.id'), nullable=False, index=True)
     description = db.Column(db.Text, nullable=False)
     logo = db.Column(db.String(100), nullable=True)
     website = db.Column(db.String(200), nullable=True)
@@ -33,8 +33,8 @@ class Company(db.Model):
 class Role(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    industry_id = db.Column(db.Integer, db.ForeignKey('industry.id'), nullable=False)
-    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=True)
+    industry_id = db.Column(db.Integer, db.ForeignKey('industry.id'), nullable=False, index=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=True, index=True)
     description = db.Column(db.Text, nullable=False)
     requirements = db.Column(db.Text, nullable=True)
     skills_required = db.Column(db.String(255), nullable=True)  # Comma-separated list of skills
@@ -48,20 +48,47 @@ class Role(db.Model):
 
 class InternshipTrack(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    industry_id = db.Column(db.Integer, db.ForeignKey('industry.id'), nullable=False)
+    industry_id = db.Column(db.Integer, db.ForeignKey('industry.id'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=True)
-    role_id = db.Column(db.Integer, db.ForeignKey('role.id'), nullable=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=True, index=True)
+    role_id = db.Column(db.Integer, db.ForeignKey('role.id'), nullable=True, index=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     duration_weeks = db.Column(db.Integer, default=4)
     status = db.Column(db.String(20), default='active')  # active, completed, abandoned
     progress = db.Column(db.Float, default=0.0)  # 0-100%
+    # Counters kept up to date by services.internship_progress
+    tasks_total = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    tasks_evaluated = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Tasks with a scored submission
+    score_sum = db.Column(db.Float, nullable=False, default=0.0, server_default='0')  # Over every scored submission
+    score_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
+    deleted_at = db.Column(db.DateTime, nullable=True)  # Hidden once set; services.internship_purge removes the rows
     tasks = db.relationship('Task', backref='internship', lazy=True)
     certificate = db.relationship('Certificate', backref='internship', uselist=False)
     
+    __table_args__ = (
+        db.Index('ix_internship_track_user_status', 'user_id', 'status'),  # Also serves user_id lookups
+        # Keyset pagination of the admin internships list, unfiltered and per filter
+        db.Index('ix_internship_track_started', 'started_at', 'id'),
+        db.Index('ix_internship_track_status_started', 'status', 'started_at', 'id'),
+        db.Index('ix_internship_track_industry_started', 'industry_id', 'started_at', 'id'),
+        # Purge backlog; partial, so the planner never picks it for deleted_at IS NULL over the sort indexes
+        db.Index('ix_internship_track_deleted', 'deleted_at',
+                 sqlite_where=db.text('deleted_at IS NOT NULL'), postgresql_where=db.text('deleted_at IS NOT NULL')),
+    )
+    
+    @property
+    def average_score(self):
+        """Average of every scored submission, 0 when nothing is scored yet"""
+        return self.score_sum / self.score_count if self.score_count else 0
+    
+    @property
+    def all_tasks_evaluated(self):
+        """True once every task has a scored submission"""
+        return self.tasks_total > 0 and self.tasks_evaluated >= self.tasks_total
+    
     def __repr__(self):
         return f'<InternshipTrack {self.title}>'
 
@@ -79,15 +106,32 @@ class Task(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     submissions = db.relationship('Submission', backref='task', lazy=True)
+    resource_set = db.relationship('TaskResourceSet', backref='task', uselist=False)
+    
+    __table_args__ = (
+        db.Index('ix_task_internship_status', 'internship_id', 'status'),  # Also serves internship_id lookups
+    )
     
     def __repr__(self):
         return f'<Task {self.title}>'
 
 
+class TaskResourceSet(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False, unique=True)
+    payload = db.Column(db.Text, nullable=True)  # JSON-encoded resource list, empty until first generation
+    status = db.Column(db.String(20), default='pending')  # pending, ready
+    requested_at = db.Column(db.DateTime, default=datetime.utcnow)  # Last time a refresh was queued
+    generated_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<TaskResourceSet {self.task_id}>'
+
+
 class Submission(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     task_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     content = db.Column(db.Text, nullable=False)
     file_urls = db.Column(db.Text, nullable=True)  # Comma-separated URLs
     score = db.Column(db.Float, nullable=True)  # 0-100
@@ -95,14 +139,19 @@ class Submission(db.Model):
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
     evaluated_at = db.Column(db.DateTime, nullable=True)
     
+    __table_args__ = (
+        # Latest submission per task and user; also serves task_id lookups
+        db.Index('ix_submission_task_user_submitted', 'task_id', 'user_id', 'submitted_at'),
+    )
+    
     def __repr__(self):
         return f'<Submission {self.id}>'
 
 
 class Certificate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    internship_id = db.Column(db.Integer, db.ForeignKey('internship_track.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    internship_id = db.Column(db.Integer, db.ForeignKey('internship_track.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     score = db.Column(db.Float, nullable=False)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from app import db
+
+class BackgroundJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # e.g. evaluate_submission
+    ref_id = db.Column(db.Integer, nullable=True)  # ID of the row the job works on
+    payload = db.Column(db.Text, nullable=True)  # JSON-encoded extra arguments
+    status = db.Column(db.String(20), default='queued')  # queued, running, done, dead
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=5)
+    available_at = db.Column(db.DateTime, default=datetime.utcnow)  # Not claimable before this time
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)  # Visibility timeout for running jobs
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_background_job_claim', 'status', 'available_at'),
+    )
+
+    def __repr__(self):
+        return f'<BackgroundJob {self.kind} {self.id}>'
@@ -0,0 +1,13 @@
+from datetime import datetime
+from app import db
+
+class StatCounter(db.Model):
+    # A counter is split over shard rows so concurrent writers rarely update the same row; its total is their sum
+    name = db.Column(db.String(50), primary_key=True)  # Table the counter totals, e.g. submission
+    shard = db.Column(db.Integer, primary_key=True, default=0)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)  # Last recount from the table itself
+    refresh_requested_at = db.Column(db.DateTime, nullable=True)  # Last time a recount was queued; kept on shard 0
+
+    def __repr__(self):
+        return f'<StatCounter {self.name}[{self.shard}]={self.value}>'
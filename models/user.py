@@ -15,6 +15,10 @@ class User(UserMixin, db.Model):
     submissions = db.relationship('Submission', backref='user', lazy=True)
     certificates = db.relationship('Certificate', backref='user', lazy=True)
     
+    __table_args__ = (
+        db.Index('ix_user_created', 'created_at', 'id'),  # Keyset pagination of the admin users list
+    )
+    
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
     
@@ -27,7 +31,7 @@ class User(UserMixin, db.Model):
 
 class UserProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     full_name = db.Column(db.String(100), nullable=True)
     major = db.Column(db.String(100), nullable=True)
     university = db.Column(db.String(100), nullable=True)
@@ -43,7 +47,7 @@ class UserProfile(db.Model):
 
 class AdminUser(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     organization = db.Column(db.String(100), nullable=False)
     role = db.Column(db.String(50), nullable=False)
     access_level = db.Column(db.String(20), default='standard')  # standard, advanced, super
@@ -1,12 +1,24 @@
+import hmac
 import logging
-from flask import render_template, redirect, url_for, flash, request, jsonify, session
+from flask import render_template, redirect, url_for, flash, request, jsonify, session, abort
 from flask_login import login_user, logout_user, current_user, login_required
+from sqlalchemy import and_
 from werkzeug.security import check_password_hash
 from app import app, db
 from models.user import User, UserProfile, AdminUser
 from models.internship import Industry, InternshipTrack, Company, Role, Task, Submission, Certificate
-from services.supervisor_service import ask_question, generate_feedback, suggest_resources
-from services.azure_services import generate_internship, generate_tasks, evaluate_submission, generate_certificate
+from services.supervisor_service import ask_question, stream_question, generate_feedback
+from services.task_resources import get_task_resources, queue_resource_refresh
+from services.internship_progress import recompute_internship_counters, queue_counter_repair
+from services.internship_purge import delete_internship
+from services.tasks import create_tasks
+from services.streaming import wants_event_stream, sse_response
+from services.rate_limiter import apply_retry_after
+from services.query_budget import query_budget
+from services.stats import get_counts
+from services.analytics import get_analytics, queue_analytics_rebuild
+from services.admin_lists import InvalidListQuery, list_users, list_internships
+from services.azure_services import generate_internship, generate_tasks, queue_submission_evaluation, queue_batch_evaluation, generate_certificate
 
 logger = logging.getLogger(__name__)
 
@@ -81,31 +93,40 @@ def logout():
 # User routes
 @app.route('/dashboard')
 @login_required
+@query_budget(2)
 def dashboard():
     """User dashboard"""
-    internships = InternshipTrack.query.filter_by(user_id=current_user.id).all()
-    
-    # Split internships into active and completed
-    active_internships = []
-    completed_internships = []
+    # One query for the internships and, joined in, the open tasks of the active ones
+    rows = db.session.query(InternshipTrack, Task).outerjoin(
+        Task,
+        and_(
+            Task.internship_id == InternshipTrack.id,
+            InternshipTrack.status == 'active',
+            Task.status.in_(['pending', 'in_progress'])
+        )
+    ).filter(
+        InternshipTrack.user_id == current_user.id,
+        InternshipTrack.deleted_at.is_(None)
+    ).order_by(InternshipTrack.id, Task.id).all()
     
-    for internship in internships:
-        if internship.status == 'active':
-            active_internships.append(internship)
-        elif internship.status == 'completed':
-            completed_internships.append(internship)
+    internships = []
+    pending_tasks = []
+    for internship, task in rows:
+        # Rows for the same internship are adjacent and share one identity-mapped object
+        if not internships or internships[-1] is not internship:
+            internships.append(internship)
+        if task is not None:
+            pending_tasks.append(task)
     
-    # Get certificates
-    certificates = Certificate.query.filter_by(user_id=current_user.id).all()
+    # Split internships into active and completed
+    active_internships = [internship for internship in internships if internship.status == 'active']
+    completed_internships = [internship for internship in internships if internship.status == 'completed']
     
-    # Get pending tasks from active internships
-    pending_tasks = []
-    for internship in active_internships:
-        tasks = Task.query.filter(
-            Task.internship_id == internship.id,
-            Task.status.in_(['pending', 'in_progress'])
-        ).all()
-        pending_tasks.extend(tasks)
+    # Get certificates, except those of deleted internships still waiting for the purge
+    certificates = Certificate.query.join(InternshipTrack, InternshipTrack.id == Certificate.internship_id).filter(
+        Certificate.user_id == current_user.id,
+        InternshipTrack.deleted_at.is_(None)
+    ).all()
     
     return render_template('dashboard.html', 
                           internships=internships,
@@ -247,20 +268,10 @@ def start_internship(industry_id):
                 }
             ]
             
-        for task_data in task_list:
-            task = Task(
-                internship_id=internship.id,
-                title=task_data.get('title', f"Week 1 Task for {industry.name}"),
-                description=task_data.get('description', "Complete this task as part of your virtual internship."),
-                instructions=task_data.get('instructions', "Follow the instructions carefully and submit your work."),
-                difficulty=task_data.get('difficulty', 'medium'),
-                points=task_data.get('points', 100)
-            )
-            db.session.add(task)
-            logger.info(f"Added task: {task.title}")
+        created = create_tasks(internship.id, task_list, week=1, default_title=f"Week 1 Task for {industry.name}")
         
         db.session.commit()
-        logger.info(f"Committed {len(task_list)} tasks to the database for internship {internship.id}")
+        logger.info(f"Committed {created} tasks to the database for internship {internship.id}")
         flash('Internship started successfully!', 'success')
         return redirect(url_for('internship_detail', internship_id=internship.id))
     
@@ -270,7 +281,7 @@ def start_internship(industry_id):
 @login_required
 def internship_detail(internship_id):
     """View internship details and tasks"""
-    internship = InternshipTrack.query.get_or_404(internship_id)
+    internship = InternshipTrack.query.filter_by(id=internship_id, deleted_at=None).first_or_404()
     
     # Ensure user owns this internship
     if internship.user_id != current_user.id:
@@ -280,22 +291,8 @@ def internship_detail(internship_id):
     # Handle delete internship request
     if request.method == 'POST' and 'action' in request.form and request.form['action'] == 'delete_internship':
         try:
-            # First delete all associated tasks and submissions
-            tasks = Task.query.filter_by(internship_id=internship_id).all()
-            for task in tasks:
-                submissions = Submission.query.filter_by(task_id=task.id).all()
-                for submission in submissions:
-                    db.session.delete(submission)
-                db.session.delete(task)
-                
-            # Delete any certificates
-            certificates = Certificate.query.filter_by(internship_id=internship_id).all()
-            for cert in certificates:
-                db.session.delete(cert)
-                
-            # Finally delete the internship
-            db.session.delete(internship)
-            db.session.commit()
+            # Hidden now; its tasks, submissions and certificate are removed in the background
+            delete_internship(internship)
             
             flash('Internship successfully deleted!', 'success')
             return redirect(url_for('dashboard'))
@@ -339,17 +336,7 @@ def internship_detail(internship_id):
             logger.info(f"Generated {len(task_list)} tasks for empty internship")
             
             # Create tasks in the database
-            for task_data in task_list:
-                task = Task(
-                    internship_id=internship_id,
-                    title=task_data.get('title', "Week 1 Task"),
-                    description=task_data.get('description', "Complete this task as part of your virtual internship."),
-                    instructions=task_data.get('instructions', "Follow the instructions carefully and submit your work."),
-                    difficulty=task_data.get('difficulty', 'medium'),
-                    points=task_data.get('points', 100)
-                )
-                db.session.add(task)
-                logger.info(f"Added new task: {task.title}")
+            create_tasks(internship_id, task_list, week=1)
             
             db.session.commit()
             
@@ -368,6 +355,8 @@ def task_detail(task_id):
     """View and submit a task"""
     task = Task.query.get_or_404(task_id)
     internship = task.internship
+    if internship.deleted_at is not None:
+        abort(404)
     
     # Ensure user owns this task
     if internship.user_id != current_user.id:
@@ -406,28 +395,50 @@ def task_detail(task_id):
         db.session.add(new_submission)
         db.session.commit()
         
-        # Trigger evaluation in background
+        # Queue evaluation for the background workers
         try:
-            evaluate_submission(new_submission.id)
+            queue_submission_evaluation(new_submission.id)
         except Exception as e:
-            logger.error(f"Failed to trigger submission evaluation: {e}")
+            logger.error(f"Failed to queue submission evaluation: {e}")
         
         flash('Task submitted successfully!', 'success')
         return redirect(url_for('task_detail', task_id=task_id))
     
-    # Get suggested resources
+    # Get suggested resources (generated in the background and stored per task)
     resources = []
+    resources_pending = False
     if not submission:
         try:
-            resources = suggest_resources(
-                task_title=task.title,
-                task_description=task.description,
-                industry=internship.industry.name
-            )
+            resources, resources_pending = get_task_resources(task)
         except Exception as e:
             logger.error(f"Failed to get resources: {e}")
     
-    return render_template('task_detail.html', task=task, internship=internship, submission=submission, resources=resources)
+    return render_template('task_detail.html', task=task, internship=internship, submission=submission,
+                           resources=resources, resources_pending=resources_pending)
+
+@app.route('/task/<int:task_id>/resources/refresh', methods=['POST'])
+@login_required
+def refresh_task_resources(task_id):
+    """Queue a regeneration of a task's suggested resources"""
+    task = Task.query.get_or_404(task_id)
+    if task.internship.deleted_at is not None:
+        abort(404)
+    
+    # Ensure user owns this task
+    if task.internship.user_id != current_user.id:
+        flash('Access denied', 'danger')
+        return redirect(url_for('dashboard'))
+    
+    try:
+        if queue_resource_refresh(task.id):
+            flash('New resources are being prepared. Check back in a moment.', 'info')
+        else:
+            flash('Resources for this task are already being prepared.', 'info')
+    except Exception as e:
+        logger.error(f"Failed to queue resource refresh: {e}")
+        flash('Could not refresh resources right now. Please try again later.', 'danger')
+    
+    return redirect(url_for('task_detail', task_id=task.id))
 
 @app.route('/ask-supervisor', methods=['POST'])
 @login_required
@@ -444,15 +455,26 @@ def ask_supervisor():
     task = None
     
     if internship_id:
-        internship = InternshipTrack.query.get(internship_id)
+        internship = InternshipTrack.query.filter_by(id=internship_id, deleted_at=None).first()
         logger.info(f"AI Supervisor: Internship found: {internship.title if internship else 'None'}")
     
     if task_id:
         task = Task.query.get(task_id)
+        if task and task.internship.deleted_at is not None:
+            task = None
         if task:
             internship = task.internship
             logger.info(f"AI Supervisor: Task found: {task.title if task else 'None'}")
     
+    if wants_event_stream(request.form):
+        logger.info("AI Supervisor: Streaming response")
+        return sse_response(stream_question(
+            question=question,
+            user_profile=current_user.profile,
+            internship=internship,
+            task=task
+        ))
+    
     try:
         logger.info("AI Supervisor: Calling ask_question service function")
         response = ask_question(
@@ -462,7 +484,7 @@ def ask_supervisor():
             task=task
         )
         logger.info(f"AI Supervisor: Response received (first 50 chars): '{response[:50]}...'")
-        return jsonify({'response': response})
+        return apply_retry_after(jsonify({'response': response}))
     except Exception as e:
         logger.error(f"Failed to get supervisor response: {e}")
         return jsonify({'error': 'Failed to get a response from the supervisor'}), 500
@@ -478,27 +500,33 @@ def view_certificate(certificate_id):
         flash('Access denied', 'danger')
         return redirect(url_for('dashboard'))
     
-    return render_template('certificate.html', certificate=certificate)
+    # Certificates of a deleted internship go with it
+    internship = certificate.internship
+    if internship.deleted_at is not None:
+        abort(404)
+    
+    return render_template('certificate.html', certificate=certificate, internship=internship)
 
 # Admin routes
 @app.route('/admin/dashboard')
 @login_required
+@query_budget(2)
 def admin_dashboard():
     """Admin dashboard"""
     if not current_user.is_admin:
         flash('Access denied', 'danger')
         return redirect(url_for('dashboard'))
     
-    user_count = User.query.count()
-    internship_count = InternshipTrack.query.count()
-    submission_count = Submission.query.count()
-    certificate_count = Certificate.query.count()
+    # Stored totals, kept current by the write paths and a periodic recount
+    counts = get_counts()
+    admin_profile = AdminUser.query.filter_by(user_id=current_user.id).first()
     
     return render_template('admin/dashboard.html', 
-                           user_count=user_count, 
-                           internship_count=internship_count,
-                           submission_count=submission_count,
-                           certificate_count=certificate_count)
+                           admin_profile=admin_profile,
+                           user_count=counts["user"], 
+                           internship_count=counts["internship_track"],
+                           submission_count=counts["submission"],
+                           certificate_count=counts["certificate"])
 
 @app.route('/admin/analytics')
 @login_required
@@ -508,8 +536,48 @@ def admin_analytics():
         flash('Access denied', 'danger')
         return redirect(url_for('dashboard'))
     
+    # Charts are filled from admin_analytics_data
     return render_template('admin/analytics.html')
 
+@app.route('/admin/api/analytics')
+@login_required
+@query_budget(2)
+def admin_analytics_data():
+    """
+    Hourly or daily rollups for the analytics charts as JSON
+    
+    Query parameters: granularity (hour, day) and periods (number of buckets
+    ending with the current one).
+    """
+    if not current_user.is_admin:
+        return jsonify({"error": "Access denied"}), 403
+    
+    granularity = request.args.get('granularity', 'day')
+    default_periods = 24 if granularity == 'hour' else 30
+    try:
+        data = get_analytics(granularity, request.args.get('periods', default_periods, type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(data), 200
+
+@app.route('/admin/rebuild-analytics', methods=['POST'])
+@login_required
+def admin_rebuild_analytics():
+    """Recompute every analytics bucket from the raw tables in the background"""
+    if not current_user.is_admin:
+        flash('Access denied', 'danger')
+        return redirect(url_for('dashboard'))
+    
+    try:
+        queue_analytics_rebuild()
+        flash('Queued a rebuild of the analytics rollups.', 'success')
+    except Exception as e:
+        logger.error(f"Failed to queue analytics rebuild: {e}")
+        flash('Failed to queue analytics rebuild.', 'danger')
+    
+    return redirect(url_for('admin_analytics'))
+
 @app.route('/admin/users')
 @login_required
 def admin_users():
@@ -518,8 +586,8 @@ def admin_users():
         flash('Access denied', 'danger')
         return redirect(url_for('dashboard'))
     
-    users = User.query.all()
-    return render_template('admin/users.html', users=users)
+    # Rows are fetched page by page from admin_users_page
+    return render_template('admin/users.html')
 
 @app.route('/admin/internships')
 @login_required
@@ -529,8 +597,144 @@ def admin_internships():
         flash('Access denied', 'danger')
         return redirect(url_for('dashboard'))
     
-    internships = InternshipTrack.query.all()
-    return render_template('admin/internships.html', internships=internships)
+    # Rows are fetched page by page from admin_internships_page
+    industries = Industry.query.order_by(Industry.name).all()
+    return render_template('admin/internships.html', industries=industries)
+
+@app.route('/admin/api/users')
+@login_required
+@query_budget(2)  # The last page also looks for rows with a NULL sort value
+def admin_users_page():
+    """
+    One page of the admin users list as JSON
+    
+    Query parameters: search (username or email prefix), status (active,
+    incomplete), sort (see USER_SORTS), cursor (next_cursor of the previous
+    page) and limit.
+    """
+    if not current_user.is_admin:
+        return jsonify({"error": "Access denied"}), 403
+    
+    try:
+        users, next_cursor = list_users(
+            search=request.args.get('search', '').strip() or None,
+            status=request.args.get('status') or None,
+            sort=request.args.get('sort', 'joined_desc'),
+            cursor=request.args.get('cursor') or None,
+            limit=request.args.get('limit', type=int)
+        )
+    except InvalidListQuery as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "items": [{
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "full_name": user.profile.full_name if user.profile else None,
+            "major": user.profile.major if user.profile else None,
+            "university": user.profile.university if user.profile else None,
+            "created_at": user.created_at.isoformat() if user.created_at else None,
+            "profile_completed": bool(user.profile and user.profile.profile_completed)
+        } for user in users],
+        "next_cursor": next_cursor
+    }), 200
+
+@app.route('/admin/api/internships')
+@login_required
+@query_budget(2)  # The last page also looks for rows with a NULL sort value
+def admin_internships_page():
+    """
+    One page of the admin internships list as JSON
+    
+    Query parameters: search (student username prefix), status, industry_id,
+    sort (see INTERNSHIP_SORTS), cursor (next_cursor of the previous page)
+    and limit.
+    """
+    if not current_user.is_admin:
+        return jsonify({"error": "Access denied"}), 403
+    
+    try:
+        internships, next_cursor = list_internships(
+            search=request.args.get('search', '').strip() or None,
+            status=request.args.get('status') or None,
+            industry_id=request.args.get('industry_id', type=int),
+            sort=request.args.get('sort', 'started_desc'),
+            cursor=request.args.get('cursor') or None,
+            limit=request.args.get('limit', type=int)
+        )
+    except InvalidListQuery as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "items": [{
+            "id": internship.id,
+            "title": internship.title,
+            "industry_name": internship.industry.name if internship.industry else None,
+            "username": internship.user.username,
+            "duration_weeks": internship.duration_weeks,
+            "progress": internship.progress,
+            "status": internship.status,
+            "started_at": internship.started_at.isoformat() if internship.started_at else None
+        } for internship in internships],
+        "next_cursor": next_cursor
+    }), 200
+
+@app.route('/admin/evaluate-pending', methods=['POST'])
+@login_required
+def admin_evaluate_pending():
+    """Grade every unevaluated submission in batches"""
+    if not current_user.is_admin:
+        flash('Access denied', 'danger')
+        return redirect(url_for('dashboard'))
+    
+    pending_ids = [row.id for row in db.session.query(Submission.id).filter(Submission.evaluated_at.is_(None))]
+    
+    try:
+        batches = queue_batch_evaluation(pending_ids)
+        flash(f'Queued {len(pending_ids)} submissions for grading in {batches} batches.', 'success')
+    except Exception as e:
+        logger.error(f"Failed to queue batch evaluation: {e}")
+        flash('Failed to queue batch evaluation.', 'danger')
+    
+    return redirect(url_for('admin_dashboard'))
+
+@app.route('/admin/repair-progress', methods=['POST'])
+@login_required
+def admin_repair_progress():
+    """Recompute every internship's progress and score counters in the background"""
+    if not current_user.is_admin:
+        flash('Access denied', 'danger')
+        return redirect(url_for('dashboard'))
+    
+    try:
+        queue_counter_repair()
+        flash('Queued a rebuild of internship progress counters.', 'success')
+    except Exception as e:
+        logger.error(f"Failed to queue counter repair: {e}")
+        flash('Failed to queue counter repair.', 'danger')
+    
+    return redirect(url_for('admin_dashboard'))
+
+@app.route('/api/internal/internship/<int:internship_id>/update-progress', methods=['POST'])
+def internal_update_progress(internship_id):
+    """Recompute an internship's counters after the Azure Function graded one of its submissions"""
+    api_key = app.config.get("INTERNAL_API_KEY")
+    if not api_key or not hmac.compare_digest(request.headers.get('x-api-key', ''), api_key):
+        return jsonify({"error": "Invalid API key"}), 403
+    
+    internship = InternshipTrack.query.get_or_404(internship_id)
+    recompute_internship_counters([internship.id])
+    db.session.commit()
+    
+    return jsonify({
+        "internship_id": internship.id,
+        "progress": internship.progress,
+        "tasks_total": internship.tasks_total,
+        "tasks_evaluated": internship.tasks_evaluated,
+        "average_score": internship.average_score,
+        "all_tasks_evaluated": internship.all_tasks_evaluated
+    }), 200
 
 # Data initialization route
 @app.route('/admin/initialize-data')
@@ -0,0 +1,174 @@
+"""
+Keyset-paginated, filtered listings for the admin users and internships pages.
+
+Pages are fetched by the browser as JSON. Each page continues after the last
+row of the previous one through an opaque cursor holding the sort name and
+that row's sort values and id, so fetching page N costs the same as page 1: an
+index range scan of one page, never an OFFSET over the rows before it. Every
+sort order is backed by an index on (sort columns, id) or a unique sort
+column; the industry sorts walk industries through their unique name index
+and each industry's internships through (industry_id, started_at, id). A
+cursor only continues the sort it was issued for.
+
+A row-value comparison against NULL matches nothing, so rows with a NULL sort
+value (started_at, created_at and status are nullable) are listed after all
+the others, by id. Their cursor holds no sort values.
+"""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import contains_eager, joinedload
+from models.user import User, UserProfile
+from models.internship import Industry, InternshipTrack
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# sort name: (columns, descending); rows are ordered by the columns, then id
+USER_SORTS = {
+    "username_asc": ((User.username,), False),
+    "username_desc": ((User.username,), True),
+    "email_asc": ((User.email,), False),
+    "email_desc": ((User.email,), True),
+    "joined_desc": ((User.created_at,), True),
+    "joined_asc": ((User.created_at,), False),
+}
+
+INTERNSHIP_SORTS = {
+    "started_desc": ((InternshipTrack.started_at,), True),
+    "started_asc": ((InternshipTrack.started_at,), False),
+    "status_asc": ((InternshipTrack.status, InternshipTrack.started_at), False),
+    "status_desc": ((InternshipTrack.status, InternshipTrack.started_at), True),
+    "industry_asc": ((Industry.name, InternshipTrack.started_at), False),
+    "industry_desc": ((Industry.name, InternshipTrack.started_at), True),
+}
+
+class InvalidListQuery(ValueError):
+    """Raised for an unknown sort or a cursor that cannot be decoded or belongs to another sort"""
+
+def _encode_cursor(sort, values, row_id):
+    if values is not None:
+        values = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps([sort, values, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor, sort, columns):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, values, row_id = json.loads(raw)
+        if values is not None:
+            values = [datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value for value in values]
+        row_id = int(row_id)
+    except (ValueError, TypeError, KeyError):
+        raise InvalidListQuery("Invalid cursor")
+    # Values from another sort would be compared against the wrong columns
+    if cursor_sort != sort or (values is not None and len(values) != len(columns)):
+        raise InvalidListQuery(f"Cursor does not belong to sort {sort}")
+    # A NULL would make the row-value comparison match nothing
+    if values is not None and None in values:
+        raise InvalidListQuery("Invalid cursor")
+    return values, row_id
+
+def _prefix_match(column, prefix):
+    """Prefix filter written as a range, so it can use an index on the column"""
+    return and_(column >= prefix, column < prefix + "\uffff")
+
+def _page(query, model, sorts, sort, cursor, limit):
+    """
+    Apply keyset ordering and the cursor to a query and fetch one page
+
+    Returns:
+        tuple: (rows, cursor for the next page or None)
+    """
+    if sort not in sorts:
+        raise InvalidListQuery(f"Unknown sort: {sort}")
+    columns, descending = sorts[sort]
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    nullable = [column for column in columns if column.expression.nullable]
+
+    values, row_id = _decode_cursor(cursor, sort, columns) if cursor else ((), None)
+    # One extra row tells whether another page exists; the sort values come
+    # along so the cursor can hold columns of joined tables
+    rows = []
+    if values is not None:
+        keyed = query.add_columns(*columns).filter(*(column.isnot(None) for column in nullable))
+        if cursor:
+            key = tuple_(*columns, model.id)
+            after = (*values, row_id)
+            keyed = keyed.filter(key < after if descending else key > after)
+        if descending:
+            keyed = keyed.order_by(*(column.desc() for column in columns), model.id.desc())
+        else:
+            keyed = keyed.order_by(*(column.asc() for column in columns), model.id.asc())
+        rows = keyed.limit(limit + 1).all()
+        row_id = None
+
+    # Rows with a NULL sort value follow once the keyed rows run out
+    if len(rows) <= limit and nullable:
+        unkeyed = query.add_columns(*columns).filter(or_(*(column.is_(None) for column in nullable)))
+        if row_id is not None:
+            unkeyed = unkeyed.filter(model.id < row_id if descending else model.id > row_id)
+        unkeyed = unkeyed.order_by(model.id.desc() if descending else model.id.asc())
+        rows += unkeyed.limit(limit + 1 - len(rows)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        sort_values = list(last[1:])
+        next_cursor = _encode_cursor(sort, None if None in sort_values else sort_values, last[0].id)
+    return [row[0] for row in rows], next_cursor
+
+def list_users(search=None, status=None, sort="joined_desc", cursor=None, limit=None):
+    """
+    Get one page of users for the admin users page
+
+    Args:
+        search (str, optional): Prefix of the username or email
+        status (str, optional): "active" (profile completed) or "incomplete"
+        sort (str): One of USER_SORTS
+        cursor (str, optional): next_cursor of the previous page
+        limit (int, optional): Page size, capped at MAX_PAGE_SIZE
+
+    Returns:
+        tuple: (list of User with profiles loaded, next page cursor or None)
+    """
+    query = User.query.options(joinedload(User.profile))
+    if search:
+        query = query.filter(or_(_prefix_match(User.username, search), _prefix_match(User.email, search.lower())))
+    if status == "active":
+        query = query.join(UserProfile, UserProfile.user_id == User.id).filter(UserProfile.profile_completed.is_(True))
+    elif status == "incomplete":
+        query = query.outerjoin(UserProfile, UserProfile.user_id == User.id).filter(
+            or_(UserProfile.id.is_(None), UserProfile.profile_completed.isnot(True))
+        )
+    return _page(query, User, USER_SORTS, sort, cursor, limit)
+
+def list_internships(search=None, status=None, industry_id=None, sort="started_desc", cursor=None, limit=None):
+    """
+    Get one page of internships for the admin internships page
+
+    Args:
+        search (str, optional): Prefix of the student's username
+        status (str, optional): Internship status
+        industry_id (int, optional): Only internships in this industry
+        sort (str): One of INTERNSHIP_SORTS
+        cursor (str, optional): next_cursor of the previous page
+        limit (int, optional): Page size, capped at MAX_PAGE_SIZE
+
+    Returns:
+        tuple: (list of InternshipTrack with users and industries loaded, next page cursor or None)
+    """
+    query = InternshipTrack.query.join(User, User.id == InternshipTrack.user_id).join(
+        Industry, Industry.id == InternshipTrack.industry_id
+    ).options(
+        contains_eager(InternshipTrack.user), contains_eager(InternshipTrack.industry)
+    ).filter(InternshipTrack.deleted_at.is_(None))
+    if search:
+        query = query.filter(_prefix_match(User.username, search))
+    if status:
+        query = query.filter(InternshipTrack.status == status)
+    if industry_id:
+        query = query.filter(InternshipTrack.industry_id == industry_id)
+    return _page(query, InternshipTrack, INTERNSHIP_SORTS, sort, cursor, limit)
@@ -0,0 +1,318 @@
+"""
+Hourly and daily rollups for the admin analytics page.
+
+Events are counted into analytics_bucket rows as they are written: an
+after_flush listener turns new users, started internships, new submissions and
+newly graded submissions into increments of their hour and day buckets, and
+upserts them in the flushing transaction. Charts read a range of buckets and
+never touch the raw tables.
+
+Metrics and the dimensions they are split by:
+
+    new_user            -
+    internship_started  industry
+    submission          industry, difficulty
+    evaluation          industry, difficulty; total is seconds from submission to grade
+    score               industry, difficulty; total is the sum of scores
+    score_band          industry, difficulty, band; count per 10-point band
+
+Grades are stored with a conditional UPDATE that the listener does not see, so
+services.internship_progress counts them with record_grade. Other writes that
+bypass the ORM are not seen; rebuild_analytics recomputes every bucket from the
+raw tables and runs as the rebuild_analytics job.
+"""
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app import db
+from models.user import User
+from models.internship import Industry, InternshipTrack, Task, Submission
+from models.analytics import AnalyticsBucket
+from services import job_queue
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+MAX_PERIODS = {"hour": 24 * 14, "day": 366}
+TIMELINE_METRICS = ["new_user", "internship_started", "submission", "evaluation"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+SCORE_BANDS = list(range(0, 100, 10))
+
+_KEY_COLUMNS = ["granularity", "bucket_start", "metric", "industry_id", "difficulty", "band"]
+_REBUILD_CHUNK_SIZE = 5000
+
+def _bucket_start(moment, granularity):
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _score_band(score):
+    return min(90, max(0, int(score // 10) * 10))
+
+def _add(increments, moment, metric, total=0.0, industry_id=0, difficulty='', band=-1):
+    """Count one event into the hour and day buckets of `moment`"""
+    for granularity in GRANULARITIES:
+        key = (granularity, _bucket_start(moment, granularity), metric, industry_id or 0, difficulty or '', band)
+        entry = increments.setdefault(key, [0, 0.0])
+        entry[0] += 1
+        entry[1] += total
+
+def _add_submission_events(increments, submission, task_info, include_submitted, include_graded):
+    industry_id, difficulty = task_info.get(submission.task_id, (0, ''))
+    if include_submitted:
+        _add(increments, submission.submitted_at or datetime.utcnow(), "submission",
+             industry_id=industry_id, difficulty=difficulty)
+    if include_graded and submission.evaluated_at is not None:
+        _add_grade_events(increments, submission.submitted_at, submission.evaluated_at, submission.score,
+                          industry_id, difficulty)
+
+def _add_grade_events(increments, submitted_at, evaluated_at, score, industry_id, difficulty):
+    latency = (evaluated_at - submitted_at).total_seconds() if submitted_at else 0.0
+    _add(increments, evaluated_at, "evaluation", total=max(0.0, latency),
+         industry_id=industry_id, difficulty=difficulty)
+    if score is not None:
+        _add(increments, evaluated_at, "score", total=score,
+             industry_id=industry_id, difficulty=difficulty)
+        _add(increments, evaluated_at, "score_band", industry_id=industry_id,
+             difficulty=difficulty, band=_score_band(score))
+
+def _upsert(connection, increments):
+    """Add increments to their buckets, creating missing ones"""
+    if not increments:
+        return
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = AnalyticsBucket.__table__
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=_KEY_COLUMNS,
+        set_={"count": table.c.count + statement.excluded.count, "total": table.c.total + statement.excluded.total}
+    )
+    # Sorted so concurrent transactions lock shared buckets in the same order
+    rows = [
+        dict(zip(_KEY_COLUMNS, key), count=count, total=total)
+        for key, (count, total) in sorted(increments.items())
+    ]
+    connection.execute(statement, rows)
+
+def _task_info(connection, task_ids):
+    """{task_id: (industry_id, difficulty)} for the given tasks"""
+    if not task_ids:
+        return {}
+    rows = connection.execute(
+        select(Task.id, InternshipTrack.industry_id, Task.difficulty)
+        .join(InternshipTrack, InternshipTrack.id == Task.internship_id)
+        .where(Task.id.in_(task_ids))
+    )
+    return {task_id: (industry_id, difficulty) for task_id, industry_id, difficulty in rows}
+
+def _newly_graded(submission):
+    """True when this flush sets evaluated_at on a submission that had none"""
+    history = inspect(submission).attrs.evaluated_at.history
+    return bool(history.added) and history.added[0] is not None and not any(
+        value is not None for value in history.deleted
+    )
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_events(session, flush_context):
+    """Count the users, internships and submissions written by a flush into their buckets"""
+    increments = {}
+    new_submissions = []
+    for instance in session.new:
+        if isinstance(instance, User):
+            _add(increments, instance.created_at or datetime.utcnow(), "new_user")
+        elif isinstance(instance, InternshipTrack):
+            _add(increments, instance.started_at or datetime.utcnow(), "internship_started",
+                 industry_id=instance.industry_id)
+        elif isinstance(instance, Submission):
+            new_submissions.append(instance)
+    graded = [
+        instance for instance in session.dirty
+        if isinstance(instance, Submission) and _newly_graded(instance)
+    ]
+
+    if new_submissions or graded:
+        connection = session.connection()
+        task_info = _task_info(connection, {submission.task_id for submission in new_submissions + graded})
+        for submission in new_submissions:
+            _add_submission_events(increments, submission, task_info, include_submitted=True, include_graded=True)
+        for submission in graded:
+            _add_submission_events(increments, submission, task_info, include_submitted=False, include_graded=True)
+
+    if increments:
+        _upsert(session.connection(), increments)
+
+def record_grade(connection, submission, score, evaluated_at):
+    """
+    Count a submission's first grade into its evaluation, score and score_band buckets
+
+    For grades stored with a Core UPDATE, which the flush listener never sees.
+    Runs in the caller's transaction.
+
+    Args:
+        connection (Connection): Connection of the transaction storing the grade
+        submission (Submission): The graded submission
+        score (float): The score it was given
+        evaluated_at (datetime): When it was graded
+    """
+    industry_id, difficulty = _task_info(connection, {submission.task_id}).get(submission.task_id, (0, ''))
+    increments = {}
+    _add_grade_events(increments, submission.submitted_at, evaluated_at, score, industry_id, difficulty)
+    _upsert(connection, increments)
+
+def rebuild_analytics():
+    """
+    Recompute every bucket from the users, internships and submissions tables
+
+    Runs in one transaction, so readers see the old buckets until it commits.
+    Rows are streamed and counted in memory per bucket.
+    """
+    increments = {}
+    for (created_at,) in db.session.execute(
+        select(User.created_at).where(User.created_at.isnot(None)).execution_options(yield_per=_REBUILD_CHUNK_SIZE)
+    ):
+        _add(increments, created_at, "new_user")
+
+    for started_at, industry_id in db.session.execute(
+        select(InternshipTrack.started_at, InternshipTrack.industry_id)
+        .where(InternshipTrack.started_at.isnot(None))
+        .execution_options(yield_per=_REBUILD_CHUNK_SIZE)
+    ):
+        _add(increments, started_at, "internship_started", industry_id=industry_id)
+
+    submissions = db.session.execute(
+        select(Submission.task_id, Submission.submitted_at, Submission.evaluated_at, Submission.score,
+               InternshipTrack.industry_id, Task.difficulty)
+        .join(Task, Task.id == Submission.task_id)
+        .join(InternshipTrack, InternshipTrack.id == Task.internship_id)
+        .execution_options(yield_per=_REBUILD_CHUNK_SIZE)
+    )
+    for row in submissions:
+        _add_submission_events(increments, row, {row.task_id: (row.industry_id, row.difficulty)},
+                               include_submitted=True, include_graded=True)
+
+    db.session.execute(AnalyticsBucket.__table__.delete())
+    items = sorted(increments.items())
+    for i in range(0, len(items), _REBUILD_CHUNK_SIZE):
+        _upsert(db.session.connection(), dict(items[i:i + _REBUILD_CHUNK_SIZE]))
+    db.session.commit()
+    logger.info(f"Rebuilt {len(items)} analytics buckets")
+
+def queue_analytics_rebuild():
+    """Queue a background rebuild of every analytics bucket"""
+    return job_queue.enqueue_job('rebuild_analytics')
+
+def _run_rebuild_job(job):
+    """Job handler for rebuild_analytics"""
+    rebuild_analytics()
+
+job_queue.register_handler('rebuild_analytics', _run_rebuild_job)
+
+def get_analytics(granularity="day", periods=30, now=None):
+    """
+    Read the rollups for the most recent `periods` hours or days
+
+    Args:
+        granularity (str): "hour" or "day"
+        periods (int): Number of buckets, the current one included
+        now (datetime, optional): End of the range, defaults to the current UTC time
+
+    Returns:
+        dict: Bucket labels, a series per timeline metric, range totals and
+        score and evaluation time breakdowns by industry and difficulty
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    periods = max(1, min(periods, MAX_PERIODS[granularity]))
+    step = GRANULARITIES[granularity]
+    last = _bucket_start(now or datetime.utcnow(), granularity)
+    starts = [last - step * (periods - 1 - i) for i in range(periods)]
+    position = {start: i for i, start in enumerate(starts)}
+
+    buckets = AnalyticsBucket.query.filter(
+        AnalyticsBucket.granularity == granularity,
+        AnalyticsBucket.bucket_start >= starts[0]
+    ).all()
+    industry_names = {industry.id: industry.name for industry in Industry.query.all()}
+
+    series = {metric: [0] * periods for metric in TIMELINE_METRICS}
+    evaluation_seconds = [0.0] * periods
+    scores = {"count": 0, "total": 0.0}
+    started_by_industry = {}
+    by_industry = {}
+    by_difficulty = {}
+    evaluation_by_industry = {}
+
+    def score_group(groups, key):
+        return groups.setdefault(key, {"count": 0, "total": 0.0, "bands": [0] * len(SCORE_BANDS)})
+
+    for bucket in buckets:
+        i = position.get(bucket.bucket_start)
+        if i is None:
+            continue
+        if bucket.metric in series:
+            series[bucket.metric][i] += bucket.count
+        if bucket.metric == "evaluation":
+            evaluation_seconds[i] += bucket.total
+            row = evaluation_by_industry.setdefault(bucket.industry_id, {})
+            for column in (bucket.difficulty, "overall"):
+                cell = row.setdefault(column, [0, 0.0])
+                cell[0] += bucket.count
+                cell[1] += bucket.total
+        elif bucket.metric == "internship_started":
+            started_by_industry[bucket.industry_id] = started_by_industry.get(bucket.industry_id, 0) + bucket.count
+        elif bucket.metric == "score":
+            scores["count"] += bucket.count
+            scores["total"] += bucket.total
+            for group in (score_group(by_industry, bucket.industry_id), score_group(by_difficulty, bucket.difficulty)):
+                group["count"] += bucket.count
+                group["total"] += bucket.total
+        elif bucket.metric == "score_band" and bucket.band in SCORE_BANDS:
+            band = SCORE_BANDS.index(bucket.band)
+            score_group(by_industry, bucket.industry_id)["bands"][band] += bucket.count
+            score_group(by_difficulty, bucket.difficulty)["bands"][band] += bucket.count
+
+    def average(total, count):
+        return round(total / count, 1) if count else None
+
+    evaluations = sum(series["evaluation"])
+    return {
+        "granularity": granularity,
+        "labels": [start.isoformat() for start in starts],
+        "series": series,
+        "avg_evaluation_seconds": [
+            average(evaluation_seconds[i], series["evaluation"][i]) for i in range(periods)
+        ],
+        "totals": {
+            **{metric: sum(values) for metric, values in series.items()},
+            "avg_score": average(scores["total"], scores["count"]),
+            "avg_evaluation_seconds": average(sum(evaluation_seconds), evaluations)
+        },
+        "internships_by_industry": [
+            {"industry": industry_names.get(industry_id, "Other"), "count": count}
+            for industry_id, count in sorted(started_by_industry.items(), key=lambda item: -item[1])
+        ],
+        "score_bands": SCORE_BANDS,
+        "scores_by_industry": [
+            {"industry": industry_names.get(industry_id, "Other"), "count": group["count"],
+             "average": average(group["total"], group["count"]), "bands": group["bands"]}
+            for industry_id, group in sorted(by_industry.items())
+        ],
+        "scores_by_difficulty": [
+            {"difficulty": difficulty or "unknown", "count": group["count"],
+             "average": average(group["total"], group["count"]), "bands": group["bands"]}
+            for difficulty, group in sorted(by_difficulty.items())
+        ],
+        "evaluation_by_industry": [
+            {
+                "industry": industry_names.get(industry_id, "Other"),
+                **{column: average(row[column][1], row[column][0]) if column in row else None
+                   for column in DIFFICULTIES + ["overall"]}
+            }
+            for industry_id, row in sorted(evaluation_by_industry.items())
+        ]
+    }
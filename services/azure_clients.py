@@ -0,0 +1,93 @@
+"""
+Azure Cosmos DB and AI Search clients, built on first use.
+
+The Azure SDKs are slow to import, so neither the SDK nor a client is touched
+while a worker starts. Each client is created once per process under a lock
+the first time a caller asks for it. When credentials are missing or the
+client cannot be built, the accessor returns None and callers use their
+fallbacks, as they did when the clients were built at import time.
+"""
+import logging
+import threading
+from app import app
+
+logger = logging.getLogger(__name__)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _get_or_create(name, factory):
+    """Return the client cached under `name`, building it with `factory` on first use"""
+    if name in _clients:
+        return _clients[name]
+
+    with _clients_lock:
+        if name not in _clients:
+            try:
+                _clients[name] = factory()
+            except Exception as e:
+                logger.error(f"Failed to initialize {name} client: {e}")
+                _clients[name] = None
+    return _clients[name]
+
+def _create_cosmos_database():
+    endpoint = app.config.get("COSMOS_ENDPOINT")
+    key = app.config.get("COSMOS_KEY")
+    if not (endpoint and key):
+        logger.warning("Cosmos DB credentials not found. Using fallback storage.")
+        return None
+
+    from azure.cosmos import CosmosClient
+    client = CosmosClient(endpoint, credential=key)
+    logger.info("Cosmos DB client configured")
+    return client.get_database_client(app.config.get("COSMOS_DATABASE", "internship-simulator"))
+
+def _create_search_client():
+    endpoint = app.config.get("AZURE_SEARCH_ENDPOINT")
+    key = app.config.get("AZURE_SEARCH_KEY")
+    if not (endpoint and key):
+        logger.warning("Azure Search credentials not found. Search functionality will be limited.")
+        return None
+
+    from azure.search.documents import SearchClient
+    from azure.core.credentials import AzureKeyCredential
+    client = SearchClient(
+        endpoint=endpoint,
+        index_name=app.config.get("AZURE_SEARCH_INDEX", "internship-resources"),
+        credential=AzureKeyCredential(key)
+    )
+    logger.info("Azure Search client configured")
+    return client
+
+def get_cosmos_database():
+    """
+    Get the Cosmos DB database client
+
+    Returns:
+        DatabaseProxy: The database client, or None when Cosmos DB is not configured
+    """
+    return _get_or_create("Cosmos DB", _create_cosmos_database)
+
+def get_cosmos_container(container_name):
+    """
+    Get a Cosmos DB container client
+
+    Args:
+        container_name (str): Name of the container
+
+    Returns:
+        ContainerProxy: The container client, or None when Cosmos DB is not configured
+    """
+    database = get_cosmos_database()
+    if database is None:
+        return None
+    return _get_or_create(f"Cosmos DB container {container_name}", lambda: database.get_container_client(container_name))
+
+def get_search_client():
+    """
+    Get the Azure AI Search client
+
+    Returns:
+        SearchClient: The search client, or None when Azure Search is not configured
+    """
+    return _get_or_create("Azure Search", _create_search_client)
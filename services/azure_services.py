@@ -1,65 +1,14 @@
 import logging
 import json
-import requests
-from datetime import datetime
-from openai import OpenAI, AzureOpenAI
+from datetime import datetime, timedelta
 from app import app
+from services.llm_gateway import chat_completion
+from services import job_queue, task_cache
+from services.internship_progress import record_evaluation
+from services.azure_clients import get_search_client
 
 logger = logging.getLogger(__name__)
 
-# Configure OpenAI client
-if app.config.get("AZURE_OPENAI_KEY"):
-    logger.info("Azure OpenAI client configured")
-    client = AzureOpenAI(
-        api_key=app.config.get("AZURE_OPENAI_KEY"),
-        api_version=app.config.get("AZURE_OPENAI_API_VERSION", "2023-12-01-preview"),
-        azure_endpoint=app.config.get("AZURE_OPENAI_ENDPOINT"),
-    )
-    deployment_name = app.config.get("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
-else:
-    # Fallback to standard OpenAI if Azure credentials aren't available
-    client = OpenAI(api_key=app.config.get("OPENAI_API_KEY"))
-    deployment_name = "gpt-4o"  # The newest OpenAI model is "gpt-4o" which was released May 13, 2024
-
-# Configure Cosmos DB client
-cosmos_endpoint = app.config.get("COSMOS_ENDPOINT")
-cosmos_key = app.config.get("COSMOS_KEY")
-cosmos_database = app.config.get("COSMOS_DATABASE", "internship-simulator")
-
-if cosmos_endpoint and cosmos_key:
-    try:
-        from azure.cosmos import CosmosClient
-        # Placeholder for CosmosDB integration
-        cosmos_client = CosmosClient(cosmos_endpoint, credential=cosmos_key)
-        cosmos_db = cosmos_client.get_database_client(cosmos_database)
-        logger.info("Cosmos DB client configured")
-    except Exception as e:
-        logger.error(f"Failed to initialize Cosmos DB client: {e}")
-        cosmos_client = None
-else:
-    logger.warning("Cosmos DB credentials not found. Using fallback storage.")
-    cosmos_client = None
-
-# Configure Azure AI Search client
-search_endpoint = app.config.get("AZURE_SEARCH_ENDPOINT")
-search_key = app.config.get("AZURE_SEARCH_KEY")
-search_index = app.config.get("AZURE_SEARCH_INDEX", "internship-resources")
-
-if search_endpoint and search_key:
-    try:
-        from azure.search.documents import SearchClient
-        from azure.core.credentials import AzureKeyCredential
-        # Placeholder for Azure Search integration
-        search_credential = AzureKeyCredential(search_key)
-        search_client = SearchClient(search_endpoint, search_index, search_credential)
-        logger.info("Azure Search client configured")
-    except Exception as e:
-        logger.error(f"Failed to initialize Azure Search client: {e}")
-        search_client = None
-else:
-    logger.warning("Azure Search credentials not found. Search functionality will be limited.")
-    search_client = None
-
 def generate_companies_and_roles(industry):
     """
     Generate companies and roles for a specific industry using OpenAI
@@ -86,18 +35,16 @@ def generate_companies_and_roles(industry):
     )
     
     try:
-        response = client.chat.completions.create(
-            model=deployment_name,
+        result_text = chat_completion(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             max_tokens=1500,
             temperature=0.7,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            call_type="internship"
         )
-        
-        result_text = response.choices[0].message.content
         result = json.loads(result_text)
         
         # Ensure all expected fields are present
@@ -138,18 +85,17 @@ def generate_internship(industry, major, interests):
     )
     
     try:
-        response = client.chat.completions.create(
-            model=deployment_name,
+        internship_text = chat_completion(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             max_tokens=500,
             temperature=0.7,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            coalesce=True,
+            call_type="internship"
         )
-        
-        internship_text = response.choices[0].message.content
         internship = json.loads(internship_text)
         
         # Ensure all expected fields are present
@@ -179,6 +125,13 @@ def generate_tasks(internship_title, industry, major, week):
     Returns:
         list: List of task dictionaries with title, description, instructions, difficulty, and points
     """
+    # Cached on industry/major/week only: the generated title varies per student
+    # but barely changes the tasks, and including it would defeat the cache
+    cache_key = task_cache.make_key("services.generate_tasks", industry=industry, major=major, week=week)
+    cached_tasks = task_cache.get_cached_tasks(cache_key)
+    if cached_tasks:
+        return cached_tasks
+    
     system_prompt = (
         f"You are an internship coordinator for a program titled '{internship_title}' in the {industry} industry. "
         f"Create a list of 3-5 realistic weekly tasks for week {week} of the internship. "
@@ -188,18 +141,17 @@ def generate_tasks(internship_title, industry, major, week):
     )
     
     try:
-        response = client.chat.completions.create(
-            model=deployment_name,
+        tasks_text = chat_completion(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": f"Generate tasks for week {week}"}
             ],
             max_tokens=1000,
             temperature=0.7,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            coalesce=True,
+            call_type="tasks"
         )
-        
-        tasks_text = response.choices[0].message.content
         tasks = json.loads(tasks_text)
         
         # Ensure we have a list of tasks
@@ -222,6 +174,7 @@ def generate_tasks(internship_title, industry, major, week):
             task.setdefault("difficulty", "medium")
             task.setdefault("points", 100)
         
+        task_cache.store_tasks(cache_key, "services.generate_tasks", tasks)
         return tasks
     except Exception as e:
         logger.error(f"Error generating tasks: {str(e)}")
@@ -250,7 +203,12 @@ def evaluate_submission(submission_id):
     
     Args:
         submission_id (int): The ID of the submission to evaluate
+        
+    Raises:
+        requests.Timeout: The Azure Function did not answer in time; the
+            caller's job is retried instead of grading twice
     """
+    import requests
     from models.internship import Submission, Task
     from services.supervisor_service import generate_feedback
     
@@ -290,17 +248,15 @@ def evaluate_submission(submission_id):
                 "industry": industry
             }
             
-            response = requests.post(function_url, headers=headers, json=data)
+            # Stay well inside the job's visibility timeout so a slow call cannot outlive the claim
+            timeout = min(app.config.get("AZURE_FUNCTION_TIMEOUT", 60), app.config.get("JOB_QUEUE_VISIBILITY_TIMEOUT", 300) / 2)
+            response = requests.post(function_url, headers=headers, json=data, timeout=timeout)
             if response.status_code == 200:
                 result = response.json()
                 
-                # Update submission with feedback
-                submission.score = result.get("score", 70)
-                submission.feedback = json.dumps(result)
-                submission.evaluated_at = datetime.utcnow()
-                
-                # Update task status
+                # Store the grade and update the task status and the internship's counters
                 task.status = "evaluated"
+                record_evaluation(submission, result.get("score", 70), json.dumps(result))
                 
                 from app import db
                 db.session.commit()
@@ -309,6 +265,9 @@ def evaluate_submission(submission_id):
                 return
             else:
                 logger.error(f"Azure Function error: {response.status_code} - {response.text}")
+        except requests.Timeout:
+            logger.warning(f"Azure Function timed out evaluating submission {submission_id}")
+            raise
         except Exception as e:
             logger.error(f"Failed to call Azure Function: {e}")
     
@@ -322,14 +281,9 @@ def evaluate_submission(submission_id):
             industry=industry
         )
         
-        # Update submission with feedback
-        from datetime import datetime
-        submission.score = feedback.get("score", 70)
-        submission.feedback = json.dumps(feedback)
-        submission.evaluated_at = datetime.utcnow()
-        
-        # Update task status
+        # Store the grade and update the task status and the internship's counters
         task.status = "evaluated"
+        record_evaluation(submission, feedback.get("score", 70), json.dumps(feedback))
         
         from app import db
         db.session.commit()
@@ -338,6 +292,254 @@ def evaluate_submission(submission_id):
     except Exception as e:
         logger.error(f"Failed to evaluate submission: {e}")
 
+def queue_submission_evaluation(submission_id):
+    """
+    Queue a submission for background evaluation
+    
+    The request that created the submission returns immediately; a job worker
+    picks the submission up and grades it, batched with other pending
+    submissions from the same industry when there are any.
+    
+    Args:
+        submission_id (int): The ID of the submission to evaluate
+    """
+    return job_queue.enqueue_job('evaluate_submission', ref_id=submission_id)
+
+def queue_batch_evaluation(submission_ids):
+    """
+    Queue submissions for batched grading
+    
+    Submissions are grouped by industry, which determines the shared supervisor
+    preamble, and split into batches of EVAL_BATCH_SIZE. Each batch is graded
+    with one completion instead of one per submission.
+    
+    Args:
+        submission_ids (list): IDs of the submissions to evaluate
+        
+    Returns:
+        int: Number of batch jobs queued
+    """
+    from models.internship import Submission, Task, InternshipTrack, Industry
+    from app import db
+    
+    if not submission_ids:
+        return 0
+    
+    rows = (
+        db.session.query(Submission.id, Industry.name)
+        .join(Task, Submission.task_id == Task.id)
+        .join(InternshipTrack, Task.internship_id == InternshipTrack.id)
+        .outerjoin(Industry, InternshipTrack.industry_id == Industry.id)
+        .filter(Submission.id.in_(submission_ids), Submission.evaluated_at.is_(None))
+        .all()
+    )
+    
+    by_industry = {}
+    for submission_id, industry in rows:
+        by_industry.setdefault(industry or "general", []).append(submission_id)
+    
+    batch_size = max(1, app.config.get("EVAL_BATCH_SIZE", 8))
+    queued = 0
+    for industry, ids in by_industry.items():
+        for i in range(0, len(ids), batch_size):
+            job_queue.enqueue_job('evaluate_submission_batch', payload={"industry": industry, "submission_ids": ids[i:i + batch_size]})
+            queued += 1
+    
+    return queued
+
+def _grade_batch(industry, submissions):
+    """
+    Grade submissions from one industry with a batched completion
+    
+    Args:
+        industry (str): The industry shared by the submissions
+        submissions (list): Ungraded Submission rows
+        
+    Returns:
+        set: IDs of the submissions that were graded
+    """
+    from supervisor_service import generate_feedback_batch
+    from app import db
+    
+    items = [
+        {
+            "id": submission.id,
+            "task_title": submission.task.title,
+            "task_description": submission.task.description,
+            "task_difficulty": submission.task.difficulty,
+            "submission_content": submission.content
+        }
+        for submission in submissions
+    ]
+    results = generate_feedback_batch(industry, items)
+    
+    now = datetime.utcnow()
+    for submission in submissions:
+        feedback = results.get(submission.id)
+        if feedback is None:
+            continue
+        submission.task.status = "evaluated"
+        record_evaluation(submission, feedback["score"], json.dumps(feedback), now)
+    db.session.commit()
+    
+    return set(results)
+
+def _run_batch_evaluation_job(job):
+    """
+    Job handler for batched submission evaluations
+    
+    Submissions the batch could not grade are re-queued as individual
+    evaluate_submission jobs, so only the failed items are retried.
+    """
+    from models.internship import Submission
+    
+    payload = json.loads(job.payload)
+    submissions = Submission.query.filter(
+        Submission.id.in_(payload["submission_ids"]),
+        Submission.evaluated_at.is_(None)
+    ).all()
+    if not submissions:
+        return
+    
+    graded = _grade_batch(payload["industry"], submissions)
+    
+    failed = [submission.id for submission in submissions if submission.id not in graded]
+    for submission_id in failed:
+        # Marked single so the worker does not fold it into another batch
+        job_queue.enqueue_job('evaluate_submission', ref_id=submission_id, payload={"single": True})
+    
+    logger.info(f"Batch evaluated {len(graded)} submissions, re-queued {len(failed)} individually")
+
+def _claim_pending_evaluations(job, submission):
+    """
+    Claim other queued evaluate_submission jobs to grade alongside this one
+    
+    Only first attempts of jobs for the same industry are taken, up to
+    EVAL_BATCH_SIZE in total. Claimed jobs hold the same visibility timeout as
+    a normal claim, so they become claimable again if the worker dies.
+    
+    Args:
+        job (BackgroundJob): The running evaluate_submission job
+        submission (Submission): Its submission
+        
+    Returns:
+        list: (BackgroundJob, Submission) pairs that were claimed
+    """
+    from sqlalchemy import update
+    from models.internship import Submission, Task, InternshipTrack
+    from models.job import BackgroundJob
+    from app import db
+    
+    batch_size = app.config.get("EVAL_BATCH_SIZE", 8)
+    if batch_size <= 1:
+        return []
+    
+    now = datetime.utcnow()
+    candidates = (
+        db.session.query(BackgroundJob.id)
+        .join(Submission, Submission.id == BackgroundJob.ref_id)
+        .join(Task, Submission.task_id == Task.id)
+        .join(InternshipTrack, Task.internship_id == InternshipTrack.id)
+        .filter(
+            BackgroundJob.kind == 'evaluate_submission',
+            BackgroundJob.status == 'queued',
+            BackgroundJob.available_at <= now,
+            BackgroundJob.attempts == 0,
+            BackgroundJob.payload.is_(None),
+            Submission.evaluated_at.is_(None),
+            Submission.id != submission.id,
+            InternshipTrack.industry_id == submission.task.internship.industry_id
+        )
+        .order_by(BackgroundJob.available_at)
+        .limit(batch_size - 1)
+        .all()
+    )
+    
+    claimed_ids = []
+    locked_until = now + timedelta(seconds=app.config.get("JOB_QUEUE_VISIBILITY_TIMEOUT", 300))
+    for (job_id,) in candidates:
+        result = db.session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.status == 'queued', BackgroundJob.attempts == 0)
+            .values(status='running', locked_by=job.locked_by, locked_until=locked_until, attempts=BackgroundJob.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed_ids.append(job_id)
+    db.session.commit()
+    
+    if not claimed_ids:
+        return []
+    
+    jobs = BackgroundJob.query.filter(BackgroundJob.id.in_(claimed_ids)).all()
+    submissions = {s.id: s for s in Submission.query.filter(Submission.id.in_([j.ref_id for j in jobs]))}
+    return [(claimed, submissions[claimed.ref_id]) for claimed in jobs if claimed.ref_id in submissions]
+
+def _release_job(job):
+    """Put a claimed job back on the queue for an immediate single-submission retry"""
+    from app import db
+    
+    job.status = 'queued'
+    job.locked_by = None
+    job.locked_until = None
+    job.available_at = datetime.utcnow()
+    db.session.commit()
+
+def _run_evaluation_job(job):
+    """
+    Job handler for queued submission evaluations
+    
+    On a first attempt the worker folds other pending evaluations for the same
+    industry into one batched completion. Retries, submissions re-queued by a
+    batch and deployments grading through the Azure Function take the
+    single-submission path, which is also the fallback for any submission the
+    batch could not grade.
+    """
+    from models.internship import Submission
+    from app import db
+    
+    # A batch job may already have graded this submission
+    submission = Submission.query.get(job.ref_id)
+    if submission and submission.evaluated_at is not None:
+        return
+    
+    internship = submission.task.internship if submission and submission.task else None
+    batchable = (
+        internship is not None
+        and job.payload is None
+        and job.attempts == 1
+        and not (app.config.get("AZURE_FUNCTION_ENDPOINT") and app.config.get("AZURE_FUNCTION_KEY"))
+    )
+    claimed = _claim_pending_evaluations(job, submission) if batchable else []
+    if claimed:
+        industry = internship.industry.name if internship.industry else "general"
+        try:
+            graded = _grade_batch(industry, [submission] + [s for _, s in claimed])
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Batch evaluation failed, falling back to single evaluations: {e}")
+            graded = set()
+        
+        for claimed_job, claimed_submission in claimed:
+            if claimed_submission.id in graded:
+                job_queue.complete_job(claimed_job)
+            else:
+                _release_job(claimed_job)
+        logger.info(f"Batch evaluated {len(graded)} of {len(claimed) + 1} pending submissions")
+        
+        if submission.id in graded:
+            return
+    
+    evaluate_submission(job.ref_id)
+    
+    # evaluate_submission logs instead of raising, so check the outcome to drive retries
+    submission = Submission.query.get(job.ref_id)
+    if submission and submission.evaluated_at is None:
+        raise RuntimeError(f"Submission {job.ref_id} was not evaluated")
+
+job_queue.register_handler('evaluate_submission', _run_evaluation_job)
+job_queue.register_handler('evaluate_submission_batch', _run_batch_evaluation_job)
+
 def search_resources(query, industry, task_type=None, limit=5):
     """
     Search for relevant resources using Azure AI Search
@@ -351,6 +553,7 @@ def search_resources(query, industry, task_type=None, limit=5):
     Returns:
         list: List of resource dictionaries with title, description, and url
     """
+    search_client = get_search_client()
     if search_client:
         try:
             filter_condition = None
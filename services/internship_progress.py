@@ -0,0 +1,184 @@
+"""
+Denormalized progress and score counters on InternshipTrack.
+
+Each internship keeps tasks_total, tasks_evaluated, score_sum and score_count
+next to its progress, so progress, completion checks and average scores are
+read from the row instead of counted from its tasks and submissions. The
+counters are updated with relative UPDATEs in the same transaction as the
+change that moves them, which keeps concurrent writers from overwriting each
+other. recompute_internship_counters rebuilds them from the source rows and
+runs as the repair_internship_counters job.
+
+A task counts as evaluated once it has a scored submission; the score
+counters cover every scored submission, so resubmissions count towards the
+average.
+"""
+import json
+import logging
+from datetime import datetime
+from sqlalchemy import case, func, select, update
+from app import db
+from models.internship import InternshipTrack, Task, Submission
+from services import job_queue
+from services.analytics import record_grade
+
+logger = logging.getLogger(__name__)
+
+# Internships recomputed per transaction by the repair job
+REPAIR_CHUNK_SIZE = 1000
+
+def _progress(tasks_evaluated, tasks_total):
+    """SQL expression for progress (0-100) from counter expressions"""
+    return case(
+        (InternshipTrack.status == 'completed', 100.0),
+        (tasks_total > 0, 100.0 * tasks_evaluated / tasks_total),
+        else_=0.0
+    )
+
+def record_tasks_added(internship_id, count):
+    """
+    Count newly created tasks towards an internship's total
+
+    Call in the transaction that adds the tasks; the caller commits.
+
+    Args:
+        internship_id (int): The internship the tasks belong to
+        count (int): Number of tasks added
+    """
+    if not count:
+        return
+    db.session.execute(
+        update(InternshipTrack)
+        .where(InternshipTrack.id == internship_id)
+        .values(
+            tasks_total=InternshipTrack.tasks_total + count,
+            progress=_progress(InternshipTrack.tasks_evaluated, InternshipTrack.tasks_total + count)
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def record_evaluation(submission, score, feedback, evaluated_at=None):
+    """
+    Store a grade and count it towards the internship's counters
+
+    The first grade of a submission is claimed with a conditional UPDATE on
+    evaluated_at, so a submission graded twice at once (a retried or
+    duplicated job) is counted once. Grading it again replaces the score and
+    moves score_sum by the difference; the score count and evaluated tasks
+    stay as they are. The first scored submission of a task also marks the
+    task as evaluated. Call before the caller commits.
+
+    Args:
+        submission (Submission): The submission being graded
+        score (float): The new score
+        feedback (str): The feedback, JSON-encoded
+        evaluated_at (datetime, optional): Grading time, defaults to now
+
+    Returns:
+        bool: True for a first grade, False for a re-grade
+    """
+    values = {"score": score, "feedback": feedback, "evaluated_at": evaluated_at or datetime.utcnow()}
+    claimed = db.session.execute(
+        update(Submission)
+        .where(Submission.id == submission.id, Submission.evaluated_at.is_(None))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+
+    if claimed:
+        graded_before = db.session.query(Submission.id).filter(
+            Submission.task_id == submission.task_id,
+            Submission.id != submission.id,
+            Submission.score.isnot(None)
+        ).first() is not None
+        newly_evaluated = 0 if graded_before else 1
+        score_delta, newly_scored = score, 1
+        # The flush listener never sees this UPDATE, so the grade is counted here
+        record_grade(db.session.connection(), submission, score, values["evaluated_at"])
+    else:
+        # Replace the previous score only if nobody changed it in the meantime
+        previous = db.session.execute(select(Submission.score).where(Submission.id == submission.id)).scalar()
+        replaced = db.session.execute(
+            update(Submission)
+            .where(Submission.id == submission.id, Submission.score == previous)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+        if not replaced:
+            logger.warning(f"Submission {submission.id} was re-graded concurrently, keeping the other grade")
+        newly_evaluated, newly_scored = 0, 0
+        score_delta = score - previous if replaced else 0
+    db.session.expire(submission, list(values))
+
+    if score_delta or newly_scored:
+        db.session.execute(
+            update(InternshipTrack)
+            .where(InternshipTrack.id == submission.task.internship_id)
+            .values(
+                tasks_evaluated=InternshipTrack.tasks_evaluated + newly_evaluated,
+                score_sum=InternshipTrack.score_sum + score_delta,
+                score_count=InternshipTrack.score_count + newly_scored,
+                progress=_progress(InternshipTrack.tasks_evaluated + newly_evaluated, InternshipTrack.tasks_total)
+            )
+            .execution_options(synchronize_session=False)
+        )
+    return claimed
+
+def recompute_internship_counters(internship_ids=None, connection=None):
+    """
+    Rebuild the counters and progress of internships from their tasks and submissions
+
+    Args:
+        internship_ids (list, optional): Internships to repair; all when omitted
+        connection (Connection, optional): Run on this connection instead of the
+            session, e.g. inside a migration. The caller commits either way.
+    """
+    executor = connection if connection is not None else db.session
+
+    def scored(column):
+        # Correlated to the internship being updated
+        return select(column).join(Task, Task.id == Submission.task_id).where(
+            Task.internship_id == InternshipTrack.id, Submission.score.isnot(None)
+        ).scalar_subquery()
+
+    counters = update(InternshipTrack).values(
+        tasks_total=select(func.count(Task.id)).where(Task.internship_id == InternshipTrack.id).scalar_subquery(),
+        tasks_evaluated=scored(func.count(func.distinct(Submission.task_id))),
+        score_sum=scored(func.coalesce(func.sum(Submission.score), 0.0)),
+        score_count=scored(func.count(Submission.id))
+    )
+    progress = update(InternshipTrack).values(
+        progress=_progress(InternshipTrack.tasks_evaluated, InternshipTrack.tasks_total)
+    )
+    if internship_ids is not None:
+        counters = counters.where(InternshipTrack.id.in_(internship_ids))
+        progress = progress.where(InternshipTrack.id.in_(internship_ids))
+
+    # Progress reads the counters, so it is set once they are written
+    executor.execute(counters.execution_options(synchronize_session=False))
+    executor.execute(progress.execution_options(synchronize_session=False))
+
+def queue_counter_repair(internship_ids=None):
+    """
+    Queue a background rebuild of internship counters
+
+    Args:
+        internship_ids (list, optional): Internships to repair; all when omitted
+    """
+    payload = {"internship_ids": internship_ids} if internship_ids is not None else None
+    return job_queue.enqueue_job('repair_internship_counters', payload=payload)
+
+def _run_repair_job(job):
+    """Job handler: recompute counters in chunks, committing after each"""
+    payload = json.loads(job.payload) if job.payload else {}
+    internship_ids = payload.get("internship_ids")
+    if internship_ids is None:
+        internship_ids = [row.id for row in db.session.query(InternshipTrack.id).order_by(InternshipTrack.id)]
+
+    for i in range(0, len(internship_ids), REPAIR_CHUNK_SIZE):
+        recompute_internship_counters(internship_ids[i:i + REPAIR_CHUNK_SIZE])
+        db.session.commit()
+
+    logger.info(f"Recomputed progress counters for {len(internship_ids)} internships")
+
+job_queue.register_handler('repair_internship_counters', _run_repair_job)
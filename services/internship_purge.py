@@ -0,0 +1,109 @@
+"""
+Deleting internships.
+
+Deleting a track only stamps deleted_at, which hides it from every page at
+once, and queues a purge. The purge removes the track's submissions, task
+resources, tasks and certificates with set-based DELETEs of at most
+PURGE_BATCH_SIZE rows each and commits after every batch, so no transaction
+holds many row locks for long and large tracks never run inside a request.
+Every step deletes whatever is left, so a purge that dies part way is simply
+run again; each run also picks up tracks whose earlier purge never finished.
+The track row goes last.
+"""
+import logging
+from datetime import datetime
+from sqlalchemy import delete, select
+from app import db
+from models.internship import InternshipTrack, Task, TaskResourceSet, Submission, Certificate
+from services import job_queue
+from services.stats import adjust_counters
+
+logger = logging.getLogger(__name__)
+
+# Rows removed per DELETE statement and transaction
+PURGE_BATCH_SIZE = 1000
+
+def delete_internship(internship):
+    """
+    Hide an internship and queue the removal of its rows
+
+    Args:
+        internship (InternshipTrack): The internship to delete
+    """
+    internship.deleted_at = datetime.utcnow()
+    db.session.commit()
+    try:
+        queue_purge()
+    except Exception as e:
+        # The track stays hidden; the next purge job removes it
+        logger.error(f"Failed to queue purge of internship {internship.id}: {e}")
+        db.session.rollback()
+
+def queue_purge():
+    """Queue a background purge of every deleted internship"""
+    return job_queue.enqueue_job('purge_deleted_internships')
+
+def _delete_in_batches(model, ids, counter=None):
+    """
+    Delete the rows of `model` whose ids `ids` selects, one batch per transaction
+
+    Args:
+        model: Mapped class whose rows are deleted
+        ids (Select): Selects the ids of the rows to delete
+        counter (str, optional): Stat counter to decrement by the rows deleted
+
+    Returns:
+        int: Rows deleted
+    """
+    deleted = 0
+    while True:
+        result = db.session.execute(
+            delete(model)
+            .where(model.id.in_(ids.limit(PURGE_BATCH_SIZE)))
+            .execution_options(synchronize_session=False)
+        )
+        if counter:
+            adjust_counters(db.session.connection(), {counter: -result.rowcount})
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < PURGE_BATCH_SIZE:
+            return deleted
+
+def purge_internship(internship_id):
+    """
+    Remove a deleted internship and everything that belongs to it
+
+    Args:
+        internship_id (int): ID of an internship with deleted_at set
+    """
+    task_ids = select(Task.id).where(Task.internship_id == internship_id)
+    submissions = _delete_in_batches(
+        Submission, select(Submission.id).where(Submission.task_id.in_(task_ids)), counter="submission"
+    )
+    _delete_in_batches(TaskResourceSet, select(TaskResourceSet.id).where(TaskResourceSet.task_id.in_(task_ids)))
+    tasks = _delete_in_batches(Task, task_ids)
+    _delete_in_batches(
+        Certificate, select(Certificate.id).where(Certificate.internship_id == internship_id), counter="certificate"
+    )
+
+    # Only a track that is still marked deleted goes
+    result = db.session.execute(
+        delete(InternshipTrack)
+        .where(InternshipTrack.id == internship_id, InternshipTrack.deleted_at.isnot(None))
+        .execution_options(synchronize_session=False)
+    )
+    adjust_counters(db.session.connection(), {"internship_track": -result.rowcount})
+    db.session.commit()
+    logger.info(f"Purged internship {internship_id}: {tasks} tasks, {submissions} submissions")
+
+def _run_purge_job(job):
+    """Job handler: purge every internship marked deleted, oldest first"""
+    internship_ids = [
+        row.id for row in db.session.query(InternshipTrack.id)
+        .filter(InternshipTrack.deleted_at.isnot(None))
+        .order_by(InternshipTrack.deleted_at)
+    ]
+    for internship_id in internship_ids:
+        purge_internship(internship_id)
+
+job_queue.register_handler('purge_deleted_internships', _run_purge_job)
@@ -0,0 +1,246 @@
+"""
+Table-backed background job queue.
+
+Jobs are stored in the background_job table so they survive restarts and can be
+drained by any process that imports the app. Workers claim a job with a
+conditional UPDATE, which works the same on SQLite and Postgres: the first
+worker to flip the row wins. A running job holds a visibility timeout; if its
+worker dies the job becomes claimable again once the timeout expires.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, update
+from app import app, db
+from models.job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+_workers = []
+_workers_lock = threading.Lock()
+_wake_event = threading.Event()
+_stop_event = threading.Event()
+
+def register_handler(kind, handler):
+    """
+    Register the function that processes jobs of a given kind
+
+    Args:
+        kind (str): The job kind
+        handler (callable): Called with the claimed BackgroundJob; raising marks the attempt as failed
+    """
+    _handlers[kind] = handler
+
+def enqueue_job(kind, ref_id=None, payload=None, delay=0, max_attempts=None):
+    """
+    Add a job to the queue and wake up local workers
+
+    Args:
+        kind (str): The job kind, must have a registered handler
+        ref_id (int, optional): ID of the row the job works on
+        payload (dict, optional): Extra JSON-serializable arguments
+        delay (int, optional): Seconds to wait before the job becomes claimable
+        max_attempts (int, optional): Attempts before the job is dead-lettered
+
+    Returns:
+        BackgroundJob: The queued job
+    """
+    job = BackgroundJob(
+        kind=kind,
+        ref_id=ref_id,
+        payload=json.dumps(payload) if payload is not None else None,
+        status='queued',
+        attempts=0,
+        max_attempts=max_attempts or app.config.get("JOB_QUEUE_MAX_ATTEMPTS", 5),
+        available_at=datetime.utcnow() + timedelta(seconds=delay)
+    )
+    db.session.add(job)
+    db.session.commit()
+    _wake_event.set()
+    return job
+
+def _claimable(now):
+    return or_(
+        and_(BackgroundJob.status == 'queued', BackgroundJob.available_at <= now),
+        and_(BackgroundJob.status == 'running', BackgroundJob.locked_until < now)
+    )
+
+def claim_job(worker_id, kinds=None):
+    """
+    Claim the oldest available job
+
+    Args:
+        worker_id (str): Identifier stored on the claimed job
+        kinds (list, optional): Restrict the claim to these job kinds
+
+    Returns:
+        BackgroundJob: The claimed job, or None if the queue is empty
+    """
+    now = datetime.utcnow()
+    visibility_timeout = app.config.get("JOB_QUEUE_VISIBILITY_TIMEOUT", 300)
+
+    query = BackgroundJob.query.filter(_claimable(now))
+    if kinds:
+        query = query.filter(BackgroundJob.kind.in_(kinds))
+    candidates = [row.id for row in query.order_by(BackgroundJob.available_at).with_entities(BackgroundJob.id).limit(10)]
+
+    for job_id in candidates:
+        result = db.session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, _claimable(now))
+            .values(
+                status='running',
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=visibility_timeout),
+                attempts=BackgroundJob.attempts + 1
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if result.rowcount == 1:
+            return BackgroundJob.query.get(job_id)
+
+    return None
+
+def complete_job(job):
+    """
+    Mark a job as successfully processed
+
+    Args:
+        job (BackgroundJob): The claimed job
+    """
+    job.status = 'done'
+    job.locked_by = None
+    job.locked_until = None
+    job.last_error = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+def fail_job(job, error):
+    """
+    Record a failed attempt and either schedule a retry or dead-letter the job
+
+    Args:
+        job (BackgroundJob): The claimed job
+        error (Exception or str): The failure reason
+    """
+    job.last_error = str(error)[:2000]
+    job.locked_by = None
+    job.locked_until = None
+
+    if job.attempts >= job.max_attempts:
+        job.status = 'dead'
+        job.finished_at = datetime.utcnow()
+        logger.error(f"Job {job.id} ({job.kind}) moved to dead-letter after {job.attempts} attempts: {error}")
+    else:
+        base_delay = app.config.get("JOB_QUEUE_RETRY_DELAY", 30)
+        delay = min(base_delay * (2 ** (job.attempts - 1)), 3600)
+        job.status = 'queued'
+        job.available_at = datetime.utcnow() + timedelta(seconds=delay)
+        logger.warning(f"Job {job.id} ({job.kind}) failed attempt {job.attempts}, retrying in {delay}s: {error}")
+
+    db.session.commit()
+
+def run_job(job):
+    """
+    Process a claimed job with its registered handler
+
+    Args:
+        job (BackgroundJob): The claimed job
+
+    Returns:
+        bool: True if the job completed
+    """
+    handler = _handlers.get(job.kind)
+    if not handler:
+        fail_job(job, f"No handler registered for job kind '{job.kind}'")
+        return False
+
+    try:
+        handler(job)
+        complete_job(job)
+        return True
+    except Exception as e:
+        db.session.rollback()
+        fail_job(job, e)
+        return False
+
+def _worker_loop(flask_app, worker_id):
+    poll_interval = flask_app.config.get("JOB_QUEUE_POLL_INTERVAL", 1.0)
+
+    while not _stop_event.is_set():
+        job_ran = False
+        try:
+            with flask_app.app_context():
+                job = claim_job(worker_id)
+                if job:
+                    run_job(job)
+                    job_ran = True
+        except Exception as e:
+            logger.error(f"Job worker {worker_id} error: {e}")
+        finally:
+            with flask_app.app_context():
+                db.session.remove()
+
+        if not job_ran:
+            _wake_event.wait(poll_interval)
+            _wake_event.clear()
+
+def start_workers(flask_app, num_workers=None):
+    """
+    Start the background worker threads for this process
+
+    Args:
+        flask_app (Flask): The application whose context the workers run in
+        num_workers (int, optional): Number of threads, defaults to JOB_QUEUE_WORKERS
+
+    Returns:
+        int: Number of running workers
+    """
+    if num_workers is None:
+        num_workers = flask_app.config.get("JOB_QUEUE_WORKERS", 2)
+
+    with _workers_lock:
+        if _workers:
+            return len(_workers)
+
+        _stop_event.clear()
+        host = socket.gethostname()
+        for i in range(num_workers):
+            worker_id = f"{host}:{os.getpid()}:{i}"
+            thread = threading.Thread(target=_worker_loop, args=(flask_app, worker_id), name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            _workers.append(thread)
+
+        logger.info(f"Started {num_workers} background job workers")
+        return len(_workers)
+
+def stop_workers(timeout=5):
+    """
+    Signal the worker threads to stop and wait for them to exit
+
+    Args:
+        timeout (int, optional): Seconds to wait for each worker
+    """
+    with _workers_lock:
+        _stop_event.set()
+        _wake_event.set()
+        for thread in _workers:
+            thread.join(timeout)
+        _workers.clear()
+
+if __name__ == "__main__":
+    # Dedicated worker process: python -m services.job_queue
+    # Handlers register themselves on the imported module, not on __main__
+    from services import job_queue
+    job_queue.start_workers(app, max(1, app.config.get("JOB_QUEUE_WORKERS", 2)))
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        job_queue.stop_workers()
@@ -0,0 +1,254 @@
+"""
+Shared gateway for chat completion calls.
+
+Every module that talks to the language model goes through this gateway, so
+each worker process holds a single client backed by one pooled HTTP connection
+with keep-alive. Timeouts, retries and pool sizes are tuned here and nowhere else.
+The client and the OpenAI SDK are loaded on the first call, not at startup.
+"""
+import hashlib
+import json
+import logging
+import threading
+from app import app
+from services import rate_limiter, resilience, scheduler, single_flight
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+
+def _build_http_client():
+    import httpx
+    limits = httpx.Limits(
+        max_connections=app.config.get("LLM_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=app.config.get("LLM_MAX_KEEPALIVE", 10),
+        keepalive_expiry=app.config.get("LLM_KEEPALIVE_EXPIRY", 30)
+    )
+    return httpx.Client(limits=limits, timeout=app.config.get("LLM_TIMEOUT", 60))
+
+def is_fake_mode():
+    """
+    Check whether calls go to the local fake LLM server (LLM_MODE=fake)
+
+    Returns:
+        bool: True in fake mode
+    """
+    return app.config.get("LLM_MODE", "live") == "fake"
+
+def _extra_headers(call_type):
+    # Tells the fake server which recorded response type to replay
+    if is_fake_mode():
+        return {"X-LLM-Call-Type": call_type}
+    return None
+
+def get_client():
+    """
+    Get the process-wide OpenAI client, creating it on first use
+
+    Returns:
+        OpenAI or AzureOpenAI: The shared client; an OpenAI client pointed at
+            FAKE_LLM_URL when LLM_MODE is fake
+    """
+    global _client
+
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            # Imported here, off the worker startup path
+            from openai import OpenAI, AzureOpenAI
+            http_client = _build_http_client()
+            max_retries = app.config.get("LLM_MAX_RETRIES", 2)
+
+            if is_fake_mode():
+                # OpenAI-compatible stand-in server, no quota spent
+                _client = OpenAI(
+                    api_key="fake",
+                    base_url=app.config["FAKE_LLM_URL"],
+                    http_client=http_client,
+                    max_retries=max_retries
+                )
+                logger.info(f"LLM gateway: fake LLM server at {app.config['FAKE_LLM_URL']}")
+            elif app.config.get("AZURE_OPENAI_ENDPOINT") and app.config.get("AZURE_OPENAI_KEY"):
+                _client = AzureOpenAI(
+                    api_key=app.config["AZURE_OPENAI_KEY"],
+                    azure_endpoint=app.config["AZURE_OPENAI_ENDPOINT"],
+                    api_version=app.config.get("AZURE_OPENAI_API_VERSION", "2023-12-01-preview"),
+                    http_client=http_client,
+                    max_retries=max_retries
+                )
+                logger.info("LLM gateway: Azure OpenAI client configured")
+            else:
+                # Fallback to standard OpenAI if Azure credentials aren't available
+                _client = OpenAI(
+                    api_key=app.config.get("OPENAI_API_KEY"),
+                    http_client=http_client,
+                    max_retries=max_retries
+                )
+                logger.info("LLM gateway: Standard OpenAI client configured")
+
+    return _client
+
+def get_deployment():
+    """
+    Get the deployment (Azure) or model (OpenAI) name used for completions
+
+    Returns:
+        str: The deployment or model name
+    """
+    if app.config.get("AZURE_OPENAI_KEY"):
+        return app.config.get("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
+    return app.config.get("OPENAI_MODEL", "gpt-4o")
+
+def _coalesce_key(messages, max_tokens, temperature, params):
+    rendered = json.dumps(
+        {
+            "model": get_deployment(),
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "params": params
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(rendered.encode("utf-8")).hexdigest()
+
+def chat_completion(messages, max_tokens=800, temperature=0.7, response_format=None, timeout=None,
+                    coalesce=False, call_type="default", **params):
+    """
+    Run a chat completion through the shared client
+
+    Args:
+        messages (list): Chat messages as role/content dictionaries
+        max_tokens (int, optional): Maximum tokens to generate
+        temperature (float, optional): Sampling temperature
+        response_format (dict, optional): e.g. {"type": "json_object"}
+        timeout (float, optional): Overall deadline in seconds, defaults to the call type's deadline
+        coalesce (bool, optional): Share one upstream call between identical concurrent
+            requests (same rendered prompt and parameters), across threads and workers.
+            Waiting callers raise single_flight.CoalesceTimeout once the leader has had its
+            slot wait and deadline plus LLM_COALESCE_MARGIN.
+        call_type (str, optional): chat, feedback, tasks, internship, resources or certificate;
+            selects the deadline and latency statistics used by the resilience layer.
+            Raises resilience.CircuitOpenError without calling upstream while the breaker is open.
+        **params: Extra completion parameters (top_p, frequency_penalty, ...)
+
+    Raises rate_limiter.RateLimitExceeded when the call does not fit the global
+    or per-user TPM/RPM budget, and scheduler.SchedulerTimeout when no slot for
+    the call type's priority class frees up in time.
+
+    Returns:
+        str: The content of the first choice
+    """
+    if response_format is not None:
+        params["response_format"] = response_format
+
+    usage = {}
+
+    def attempt(remaining):
+        # Retries are handled by the resilience layer within the deadline
+        client = get_client().with_options(timeout=remaining, max_retries=0)
+
+        completion = client.chat.completions.create(
+            model=get_deployment(),
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            extra_headers=_extra_headers(call_type),
+            **params
+        )
+
+        # Without reported usage the reservation's estimate stands
+        usage["total_tokens"] = completion.usage.total_tokens if completion.usage is not None else None
+        return completion.choices[0].message.content or ""
+
+    def complete():
+        # Calls the breaker would reject are not charged
+        if resilience.get_breaker().is_open():
+            raise resilience.CircuitOpenError("LLM circuit breaker is open")
+        # Only the caller that actually goes upstream is charged
+        reservation = rate_limiter.acquire(messages, max_tokens)
+        try:
+            with scheduler.slot(call_type):
+                return resilience.call(call_type, attempt, timeout=timeout)
+        finally:
+            # A call that got no completion back returns its whole reservation
+            rate_limiter.settle(reservation, usage.get("total_tokens", 0))
+
+    if coalesce and app.config.get("LLM_COALESCE_ENABLED", True):
+        # Followers must outwait the leader, who may queue for a slot before its deadline starts
+        wait = scheduler.max_wait(call_type) + (timeout or resilience.configured_deadline(call_type))
+        return single_flight.run(_coalesce_key(messages, max_tokens, temperature, params), complete,
+                                 timeout=wait + app.config.get("LLM_COALESCE_MARGIN", 10))
+
+    return complete()
+
+def stream_chat_completion(messages, max_tokens=800, temperature=0.7, timeout=None, call_type="chat", **params):
+    """
+    Run a streaming chat completion through the shared client
+
+    Closing the returned generator (for example when the HTTP client disconnects)
+    closes the upstream response so no further tokens are generated or billed.
+
+    Args:
+        messages (list): Chat messages as role/content dictionaries
+        max_tokens (int, optional): Maximum tokens to generate
+        temperature (float, optional): Sampling temperature
+        timeout (float, optional): Timeout between chunks in seconds, defaults to the call type's deadline
+        call_type (str, optional): Selects the deadline and priority class; the circuit
+            breaker, rate limits and scheduler apply as for chat_completion
+        **params: Extra completion parameters (top_p, frequency_penalty, ...)
+
+    Yields:
+        str: Content deltas in the order they arrive
+    """
+    breaker = resilience.get_breaker()
+    if breaker.is_open():
+        raise resilience.CircuitOpenError("LLM circuit breaker is open")
+    reservation = rate_limiter.acquire(messages, max_tokens)
+
+    failed = False
+    stream = None
+    streamed_chars = 0
+    try:
+        # The slot is held until the stream ends or the client goes away
+        with scheduler.slot(call_type):
+            if not breaker.allow():
+                raise resilience.CircuitOpenError("LLM circuit breaker is open")
+
+            try:
+                client = get_client().with_options(
+                    timeout=timeout if timeout is not None else resilience.get_deadline(call_type)
+                )
+                stream = client.chat.completions.create(
+                    model=get_deployment(),
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    extra_headers=_extra_headers(call_type),
+                    **params
+                )
+
+                for chunk in stream:
+                    # Azure sends a leading chunk with prompt filter results and no choices
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        streamed_chars += len(delta)
+                        yield delta
+            except resilience.upstream_errors():
+                failed = True
+                raise
+            finally:
+                breaker.record(failed=failed)
+                if stream is not None:
+                    stream.close()
+    finally:
+        # Streams report no usage; charge the prompt and what was streamed, nothing if it never started
+        used = rate_limiter.estimate_tokens(messages, streamed_chars // 4) if stream is not None else 0
+        rate_limiter.settle(reservation, used)
@@ -0,0 +1,47 @@
+"""
+Per-view SQL query budgets.
+
+Views decorated with @query_budget(n) count the statements they execute,
+template rendering included, and flag any request that needs more than n. A
+budget that holds for new users and power users alike shows a page issues a
+constant number of queries instead of one per row.
+
+Over-budget requests are logged; with QUERY_BUDGET_ENFORCE set they raise
+AssertionError instead, so benchmarks and development catch regressions.
+"""
+import logging
+from functools import wraps
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app import app
+
+logger = logging.getLogger(__name__)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and "query_count" in g:
+        g.query_count += 1
+
+def query_budget(max_queries):
+    """
+    Decorate a view with the most SQL statements it may execute per request
+
+    Args:
+        max_queries (int): The budget, not counting the session user lookup done by login_required
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.query_count = 0
+            try:
+                return view(*args, **kwargs)
+            finally:
+                executed = g.pop("query_count", 0)
+                if executed > max_queries:
+                    message = f"{view.__name__} executed {executed} queries, budget is {max_queries}"
+                    if app.config.get("QUERY_BUDGET_ENFORCE"):
+                        raise AssertionError(message)
+                    logger.warning(message)
+        return wrapper
+    return decorator
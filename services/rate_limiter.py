@@ -0,0 +1,210 @@
+"""
+Token-bucket rate limiter for language model calls.
+
+Each completion is charged against requests-per-minute and tokens-per-minute
+buckets, globally (matching the deployment quota) and per signed-in user, so
+one chatty user cannot exhaust the quota for everybody. Buckets live in the
+shared store, so the limits hold across all worker processes on the host.
+
+The token cost is estimated before the call from the prompt size plus
+max_tokens, then corrected with the reported usage once the call returns.
+"""
+import logging
+import math
+import time
+from flask import g, has_request_context, jsonify
+from app import app
+from services import shared_store
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_MESSAGE = "The AI supervisor is handling too many requests right now. Please try again shortly."
+
+class RateLimitExceeded(Exception):
+    """Raised when a call does not fit in the budget within the allowed wait"""
+
+    def __init__(self, retry_after, scope):
+        super().__init__(f"LLM {scope} rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.scope = scope
+
+def estimate_tokens(messages, max_tokens):
+    """
+    Estimate the token cost of a completion
+
+    Args:
+        messages (list): Chat messages as role/content dictionaries
+        max_tokens (int): Maximum tokens to generate
+
+    Returns:
+        int: Estimated prompt tokens (about 4 characters each) plus max_tokens
+    """
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // 4 + 4 * len(messages) + (max_tokens or 0)
+
+def current_user_id():
+    """
+    Get the signed-in user for per-user budgets
+
+    Returns:
+        int: The user ID, or None outside requests and for anonymous users
+    """
+    if not has_request_context():
+        return None
+    try:
+        from flask_login import current_user
+        return current_user.id if current_user.is_authenticated else None
+    except Exception:
+        return None
+
+def _buckets(user_id):
+    """(store key, units per minute, counts tokens) for every bucket that applies"""
+    buckets = [
+        ("ratelimit:global:rpm", app.config.get("LLM_RPM", 0), False),
+        ("ratelimit:global:tpm", app.config.get("LLM_TPM", 0), True),
+    ]
+    if user_id is not None:
+        buckets += [
+            (f"ratelimit:user:{user_id}:rpm", app.config.get("LLM_USER_RPM", 0), False),
+            (f"ratelimit:user:{user_id}:tpm", app.config.get("LLM_USER_TPM", 0), True),
+        ]
+    # A limit of 0 disables that bucket
+    return [bucket for bucket in buckets if bucket[1] > 0]
+
+def _refill(state, capacity, now):
+    if state is None:
+        return float(capacity)
+    return min(float(capacity), state["tokens"] + (now - state["ts"]) * capacity / 60.0)
+
+def _try_consume(buckets, tokens):
+    """Take from every bucket or from none; returns (seconds to wait, limiting scope)"""
+    def consume(values):
+        now = time.time()
+        levels = {}
+        wait, scope = 0.0, None
+        for key, capacity, counts_tokens in buckets:
+            level = _refill(values[key], capacity, now)
+            cost = min(tokens, capacity) if counts_tokens else 1
+            levels[key] = (level, cost)
+            if level < cost:
+                needed = (cost - level) * 60.0 / capacity
+                if needed > wait:
+                    wait, scope = needed, key.split(":")[1]
+        if wait == 0:
+            levels = {key: (level - cost, cost) for key, (level, cost) in levels.items()}
+        return {key: {"tokens": level, "ts": now} for key, (level, _) in levels.items()}, (wait, scope)
+
+    # Idle buckets are full after a minute, so entries can expire after two
+    return shared_store.update_many([key for key, _, _ in buckets], consume, ttl=120)
+
+def acquire(messages, max_tokens, user_id=None, max_wait=None):
+    """
+    Reserve budget for a completion, waiting for it if allowed
+
+    Args:
+        messages (list): The prompt messages, used to estimate cost
+        max_tokens (int): Maximum tokens to generate
+        user_id (int, optional): User to charge, defaults to the signed-in user
+        max_wait (float, optional): Seconds to wait for budget; defaults to 0 on
+            request threads (fail fast) and LLM_RATE_LIMIT_MAX_WAIT in background jobs
+
+    Returns:
+        dict: Reservation to pass to settle(), or None when limiting is disabled
+    """
+    if not app.config.get("LLM_RATE_LIMIT_ENABLED", True):
+        return None
+
+    if user_id is None:
+        user_id = current_user_id()
+    if max_wait is None:
+        max_wait = 0 if has_request_context() else app.config.get("LLM_RATE_LIMIT_MAX_WAIT", 30)
+
+    buckets = _buckets(user_id)
+    if not buckets:
+        return None
+
+    tokens = estimate_tokens(messages, max_tokens)
+    deadline = time.monotonic() + max_wait
+
+    while True:
+        try:
+            wait, scope = _try_consume(buckets, tokens)
+        except Exception as e:
+            # The limiter must never take the feature down with it
+            logger.error(f"Rate limiter store unavailable, allowing call: {e}")
+            return None
+
+        if wait == 0:
+            return {"buckets": buckets, "tokens": tokens}
+
+        if time.monotonic() + wait > deadline:
+            if has_request_context():
+                g.llm_retry_after = max(g.get("llm_retry_after", 0), math.ceil(wait))
+            raise RateLimitExceeded(wait, scope)
+
+        time.sleep(wait)
+
+def settle(reservation, actual_tokens):
+    """
+    Return the unused part of a reservation once the real usage is known
+
+    Args:
+        reservation (dict): Value returned by acquire()
+        actual_tokens (int): Total tokens reported by the API
+    """
+    if not reservation or actual_tokens is None:
+        return
+
+    refund = reservation["tokens"] - actual_tokens
+    token_buckets = [bucket for bucket in reservation["buckets"] if bucket[2]]
+    if refund <= 0 or not token_buckets:
+        return
+
+    def give_back(values):
+        now = time.time()
+        return {
+            key: {"tokens": min(float(capacity), _refill(values[key], capacity, now) + refund), "ts": now}
+            for key, capacity, _ in token_buckets
+        }, None
+
+    try:
+        shared_store.update_many([key for key, _, _ in token_buckets], give_back, ttl=120)
+    except Exception as e:
+        logger.warning(f"Failed to settle rate limit reservation: {e}")
+
+def get_retry_after():
+    """
+    Get the retry delay recorded by a rejected call in the current request
+
+    Returns:
+        int: Seconds to wait, or None if no call was rate limited
+    """
+    if not has_request_context():
+        return None
+    return g.get("llm_retry_after")
+
+def apply_retry_after(response):
+    """
+    Turn a response into 429 if an LLM call was rate limited
+
+    Callers fall back to canned content when a call is rejected; for API
+    clients that content is replaced by an explicit error with Retry-After.
+    Only call this on responses whose body is the LLM answer and that wrote
+    nothing: a view that already committed fallback content must return it,
+    or a client retrying on 429 would write it twice. Streamed responses
+    report the limit in-band instead (see services.streaming).
+
+    Args:
+        response (Response): The response produced by the view
+
+    Returns:
+        Response: The original response, or a 429 response
+    """
+    retry_after = get_retry_after()
+    if not retry_after or response.mimetype == 'text/event-stream':
+        return response
+
+    limited = jsonify({"error": RATE_LIMIT_MESSAGE, "retry_after": retry_after})
+    limited.status_code = 429
+    limited.headers["Retry-After"] = str(retry_after)
+    return limited
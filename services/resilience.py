@@ -0,0 +1,349 @@
+"""
+Resilience layer for language model calls.
+
+Every completion issued by the LLM gateway runs through call(), which adds:
+
+- a deadline per call type (chat, feedback, tasks, ...), tightened adaptively
+  to a multiple of the observed p99 latency once enough samples exist;
+- retries of transient upstream errors, only while the deadline allows;
+- an optional hedged second request when the first has not answered by the
+  p95 latency for its call type;
+- a circuit breaker (closed/open/half-open) driven by the recent error and
+  slow-call rates. While it is open, calls fail immediately with
+  CircuitOpenError so callers drop straight to their fallback responses.
+
+State is kept per worker process.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from app import app
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call does not complete within its deadline"""
+
+def retryable_errors():
+    """Upstream errors worth retrying or hedging"""
+    # The SDK is slow to import; by the first call the gateway has loaded it anyway
+    import openai
+    return (
+        openai.APIConnectionError,  # Includes APITimeoutError
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+def upstream_errors():
+    """
+    Errors that say something about upstream health
+
+    Anything else (bad request, auth, JSON parsing in the caller) does not
+    move the breaker.
+    """
+    return retryable_errors() + (DeadlineExceeded,)
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one call type"""
+
+    def __init__(self, size):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct, min_samples):
+        """
+        Get a latency percentile
+
+        Args:
+            pct (float): Percentile between 0 and 100
+            min_samples (int): Samples required before reporting
+
+        Returns:
+            float: The percentile in seconds, or None without enough samples
+        """
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a rolling window of call outcomes
+
+    The breaker opens when, over the last `window` calls (and at least
+    `min_calls`), the share of failures reaches `failure_rate` or the share of
+    slow calls reaches `slow_rate`. After `cooldown` seconds it lets a single
+    probe through (half-open); the probe's outcome closes or reopens it.
+    """
+
+    def __init__(self, window, min_calls, failure_rate, slow_rate, cooldown):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_rate = slow_rate
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self._outcomes = deque(maxlen=window)  # (failed, slow) per call
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Check whether a call may proceed
+
+        Returns:
+            bool: False while the breaker is open
+        """
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self.state = 'half_open'
+                self._probe_in_flight = False
+            # Half-open: one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def is_open(self):
+        """
+        Check whether calls are being rejected, without admitting one
+
+        Returns:
+            bool: True while the breaker is open or its half-open probe is in flight
+        """
+        with self._lock:
+            if self.state == 'open':
+                return time.monotonic() - self._opened_at < self.cooldown
+            return self.state == 'half_open' and self._probe_in_flight
+
+    def record(self, failed, slow=False):
+        """
+        Record the outcome of an allowed call
+
+        Args:
+            failed (bool): The call failed because of upstream
+            slow (bool): The call succeeded but exceeded the slow-call threshold
+        """
+        with self._lock:
+            if self.state == 'half_open':
+                self._probe_in_flight = False
+                if failed or slow:
+                    self._open()
+                else:
+                    self.state = 'closed'
+                    self._outcomes.clear()
+                    logger.info("LLM circuit breaker closed")
+                return
+
+            self._outcomes.append((failed, slow))
+            if self.state == 'closed' and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for f, _ in self._outcomes if f) / len(self._outcomes)
+                slow_calls = sum(1 for _, s in self._outcomes if s) / len(self._outcomes)
+                if failures >= self.failure_rate or slow_calls >= self.slow_rate:
+                    self._open()
+
+    def _open(self):
+        self.state = 'open'
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        logger.warning(f"LLM circuit breaker opened for {self.cooldown}s")
+
+_breaker = None
+_trackers = {}
+_executor = None
+_state_lock = threading.Lock()
+
+def get_breaker():
+    """
+    Get the process-wide circuit breaker for the language model
+
+    Returns:
+        CircuitBreaker: The breaker
+    """
+    global _breaker
+    with _state_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                window=app.config.get("LLM_BREAKER_WINDOW", 20),
+                min_calls=app.config.get("LLM_BREAKER_MIN_CALLS", 10),
+                failure_rate=app.config.get("LLM_BREAKER_FAILURE_RATE", 0.5),
+                slow_rate=app.config.get("LLM_BREAKER_SLOW_RATE", 0.8),
+                cooldown=app.config.get("LLM_BREAKER_COOLDOWN", 30)
+            )
+        return _breaker
+
+def _tracker(call_type):
+    with _state_lock:
+        if call_type not in _trackers:
+            _trackers[call_type] = LatencyTracker(app.config.get("LLM_LATENCY_WINDOW", 200))
+        return _trackers[call_type]
+
+def _get_executor():
+    global _executor
+    with _state_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get("LLM_HEDGE_WORKERS", 16),
+                thread_name_prefix="llm-hedge"
+            )
+        return _executor
+
+def configured_deadline(call_type):
+    """
+    Get the configured deadline for a call type
+
+    Args:
+        call_type (str): e.g. chat, feedback, tasks, internship, resources, certificate
+
+    Returns:
+        float: Deadline in seconds
+    """
+    deadlines = app.config.get("LLM_DEADLINES", {})
+    return deadlines.get(call_type, app.config.get("LLM_TIMEOUT", 60))
+
+def get_deadline(call_type):
+    """
+    Get the effective deadline for a call type
+
+    Once enough latencies have been observed the configured deadline is
+    tightened to LLM_ADAPTIVE_TIMEOUT_FACTOR x p99, never below
+    LLM_ADAPTIVE_TIMEOUT_MIN, so a degraded upstream is given up on sooner.
+
+    Args:
+        call_type (str): The call type
+
+    Returns:
+        float: Deadline in seconds
+    """
+    deadline = configured_deadline(call_type)
+    p99 = _tracker(call_type).percentile(99, app.config.get("LLM_LATENCY_MIN_SAMPLES", 20))
+    if p99 is None:
+        return deadline
+    adaptive = max(app.config.get("LLM_ADAPTIVE_TIMEOUT_MIN", 10), p99 * app.config.get("LLM_ADAPTIVE_TIMEOUT_FACTOR", 3))
+    return min(deadline, adaptive)
+
+def _hedge_delay(call_type):
+    if not app.config.get("LLM_HEDGE_ENABLED", False):
+        return None
+    return _tracker(call_type).percentile(95, app.config.get("LLM_LATENCY_MIN_SAMPLES", 20))
+
+def _first_success(attempt, timeout, hedge_after):
+    """Run attempt, starting a second copy if the first has not finished after hedge_after seconds"""
+    executor = _get_executor()
+    started = time.monotonic()
+    pending = {executor.submit(attempt, timeout)}
+    hedged = False
+    first_error = None
+
+    while pending:
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            raise DeadlineExceeded(f"No response within {timeout:.1f}s")
+
+        wait_for = remaining if hedged else min(remaining, max(0.0, hedge_after - (time.monotonic() - started)))
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            error = future.exception()
+            if error is None:
+                # The slower copy is left to finish on its own; its result is discarded
+                return future.result()
+            first_error = first_error or error
+
+        if not hedged and (not done or first_error is not None):
+            remaining = timeout - (time.monotonic() - started)
+            if remaining > 0 and (first_error is None or isinstance(first_error, retryable_errors())):
+                logger.info(f"Hedging LLM call after {time.monotonic() - started:.2f}s")
+                pending.add(executor.submit(attempt, remaining))
+            hedged = True
+
+    raise first_error
+
+def call(call_type, attempt, timeout=None):
+    """
+    Run one logical LLM call under the deadline, retry, hedging and breaker policy
+
+    Args:
+        call_type (str): Which kind of call this is, selects deadline and latency stats
+        attempt (callable): Performs a single upstream request; receives the
+            remaining time budget in seconds and must not retry on its own
+        timeout (float, optional): Overrides the deadline for this call
+
+    Returns:
+        The value returned by attempt
+    """
+    breaker = get_breaker()
+    if not breaker.allow():
+        raise CircuitOpenError("LLM circuit breaker is open")
+
+    deadline = timeout if timeout is not None else get_deadline(call_type)
+    max_retries = app.config.get("LLM_MAX_RETRIES", 2)
+    hedge_after = _hedge_delay(call_type)
+    started = time.monotonic()
+
+    for attempt_number in range(max_retries + 1):
+        remaining = deadline - (time.monotonic() - started)
+        try:
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{call_type} call exceeded its {deadline:.1f}s deadline")
+            if hedge_after is not None and hedge_after < remaining:
+                result = _first_success(attempt, remaining, hedge_after)
+            else:
+                result = attempt(remaining)
+        except retryable_errors() as e:
+            backoff = min(0.5 * (2 ** attempt_number), 8)
+            if attempt_number < max_retries and deadline - (time.monotonic() - started) > backoff + 1:
+                logger.warning(f"Retrying {call_type} call after error: {e}")
+                time.sleep(backoff)
+                continue
+            breaker.record(failed=True)
+            raise
+        except upstream_errors():
+            breaker.record(failed=True)
+            raise
+        except Exception:
+            # Not an upstream health signal; release a half-open probe without judging it
+            breaker.record(failed=False)
+            raise
+
+        latency = time.monotonic() - started
+        _tracker(call_type).add(latency)
+        slow = latency > configured_deadline(call_type) * app.config.get("LLM_BREAKER_SLOW_RATIO", 0.8)
+        breaker.record(failed=False, slow=slow)
+        return result
+
+def get_status():
+    """
+    Get a snapshot of breaker state and latency percentiles
+
+    Returns:
+        dict: Breaker state and p50/p95/p99 per call type
+    """
+    with _state_lock:
+        call_types = list(_trackers)
+    return {
+        "breaker": get_breaker().state,
+        "latency": {
+            call_type: {
+                f"p{pct}": _tracker(call_type).percentile(pct, 1)
+                for pct in (50, 95, 99)
+            }
+            for call_type in call_types
+        }
+    }
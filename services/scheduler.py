@@ -0,0 +1,197 @@
+"""
+Priority scheduler for language model calls.
+
+Every upstream call takes a slot before it runs. Calls are grouped into
+priority classes, highest first:
+
+    interactive  supervisor chat
+    grading      submission feedback
+    generation   tasks, internships, certificates
+    resources    learning resource suggestions
+
+Each class has its own concurrency limit below the process-wide limit, so
+background classes can never take every slot and interactive chat always finds
+capacity. When slots are contended the waiting call with the best effective
+priority goes next; a call's priority improves by one level for every
+LLM_SCHEDULER_AGING seconds it waits, so lower classes are never starved.
+Limits apply per worker process.
+"""
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from app import app
+
+logger = logging.getLogger(__name__)
+
+class SchedulerTimeout(TimeoutError):
+    """Raised when a call waits longer than its class allows for a slot"""
+
+PRIORITIES = {"interactive": 0, "grading": 1, "generation": 2, "resources": 3}
+
+CALL_TYPE_CLASSES = {
+    "chat": "interactive",
+    "feedback": "grading",
+    "tasks": "generation",
+    "internship": "generation",
+    "certificate": "generation",
+    "resources": "resources",
+}
+
+class _Ticket:
+    __slots__ = ("priority_class", "priority", "enqueued_at", "seq")
+
+    def __init__(self, priority_class, seq):
+        self.priority_class = priority_class
+        self.priority = PRIORITIES[priority_class]
+        self.enqueued_at = time.monotonic()
+        self.seq = seq
+
+class PriorityScheduler:
+    """Grants call slots by class priority with per-class limits and aging"""
+
+    def __init__(self, max_concurrency, class_limits, aging):
+        self.max_concurrency = max_concurrency
+        self.class_limits = class_limits
+        self.aging = aging
+        self._cond = threading.Condition()
+        self._running = {priority_class: 0 for priority_class in PRIORITIES}
+        self._waiting = []
+        self._seq = itertools.count()
+
+    def _next_ticket(self):
+        if sum(self._running.values()) >= self.max_concurrency:
+            return None
+        now = time.monotonic()
+        eligible = [
+            ticket for ticket in self._waiting
+            if self._running[ticket.priority_class] < self.class_limits.get(ticket.priority_class, self.max_concurrency)
+        ]
+        if not eligible:
+            return None
+        return min(eligible, key=lambda t: (t.priority - (now - t.enqueued_at) / self.aging, t.seq))
+
+    def acquire(self, priority_class, timeout):
+        """
+        Wait for a slot
+
+        Args:
+            priority_class (str): One of PRIORITIES
+            timeout (float): Seconds to wait before giving up
+        """
+        ticket = _Ticket(priority_class, next(self._seq))
+        deadline = ticket.enqueued_at + timeout
+
+        with self._cond:
+            self._waiting.append(ticket)
+            while self._next_ticket() is not ticket:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    # Our ticket may have been blocking an eligible one
+                    self._cond.notify_all()
+                    raise SchedulerTimeout(f"No {priority_class} LLM slot free within {timeout:g}s")
+                self._cond.wait(remaining)
+
+            self._waiting.remove(ticket)
+            self._running[priority_class] += 1
+            # Capacity may remain for other waiters
+            self._cond.notify_all()
+
+        waited = time.monotonic() - ticket.enqueued_at
+        if waited > 1:
+            logger.info(f"{priority_class} LLM call waited {waited:.1f}s for a slot")
+
+    def release(self, priority_class):
+        """
+        Free a slot taken with acquire()
+
+        Args:
+            priority_class (str): The class the slot was acquired for
+        """
+        with self._cond:
+            self._running[priority_class] -= 1
+            self._cond.notify_all()
+
+    def status(self):
+        """
+        Get running and waiting counts per class
+
+        Returns:
+            dict: {class: {"running": n, "waiting": n}}
+        """
+        with self._cond:
+            return {
+                priority_class: {
+                    "running": self._running[priority_class],
+                    "waiting": sum(1 for t in self._waiting if t.priority_class == priority_class)
+                }
+                for priority_class in PRIORITIES
+            }
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """
+    Get the process-wide scheduler
+
+    Returns:
+        PriorityScheduler: The scheduler
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PriorityScheduler(
+                max_concurrency=app.config.get("LLM_MAX_CONCURRENCY", 16),
+                class_limits=app.config.get("LLM_CLASS_CONCURRENCY", {}),
+                aging=app.config.get("LLM_SCHEDULER_AGING", 5)
+            )
+        return _scheduler
+
+def priority_class_for(call_type):
+    """
+    Map a gateway call type to its priority class
+
+    Args:
+        call_type (str): e.g. chat, feedback, tasks
+
+    Returns:
+        str: The priority class, generation for unknown call types
+    """
+    return CALL_TYPE_CLASSES.get(call_type, "generation")
+
+def max_wait(call_type):
+    """
+    Get the longest a call may queue for a slot
+
+    Args:
+        call_type (str): The gateway call type
+
+    Returns:
+        float: Seconds, 0 when the scheduler is disabled
+    """
+    if not app.config.get("LLM_SCHEDULER_ENABLED", True):
+        return 0
+    return app.config.get("LLM_CLASS_MAX_WAIT", {}).get(priority_class_for(call_type), 60)
+
+@contextmanager
+def slot(call_type):
+    """
+    Hold a scheduler slot for the duration of a call
+
+    Args:
+        call_type (str): The gateway call type
+    """
+    if not app.config.get("LLM_SCHEDULER_ENABLED", True):
+        yield
+        return
+
+    priority_class = priority_class_for(call_type)
+    scheduler = get_scheduler()
+    scheduler.acquire(priority_class, max_wait(call_type))
+    try:
+        yield
+    finally:
+        scheduler.release(priority_class)
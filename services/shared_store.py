@@ -0,0 +1,168 @@
+"""
+Key/value store shared by all worker processes on this host.
+
+Backed by a SQLite file in the instance folder (WAL mode), so gunicorn workers
+can coordinate without an external service. Values are JSON-encoded and may
+carry an expiry. Expired entries read as missing; writes delete them from the
+file at most once every PURGE_INTERVAL seconds per process, so keys that are
+never touched again do not pile up. Each thread keeps its own connection.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from app import app
+
+# Seconds between purges of expired entries, per process
+PURGE_INTERVAL = 60
+
+_local = threading.local()
+_next_purge = 0.0
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        path = app.config.get("SHARED_STORE_PATH") or os.path.join(app.instance_path, "shared_state.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (expires_at)")
+        _local.conn = conn
+    return conn
+
+@contextmanager
+def transaction():
+    """
+    Run a block under SQLite's write lock so read-modify-write sequences are atomic
+
+    Yields:
+        sqlite3.Connection: The thread's connection
+    """
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def _read(conn, key, now):
+    row = conn.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+    if row is None or (row[1] is not None and row[1] <= now):
+        return None
+    return json.loads(row[0])
+
+def _purge(conn, now):
+    conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+
+def _write(conn, key, value, ttl, now):
+    global _next_purge
+    if now >= _next_purge:
+        _next_purge = now + PURGE_INTERVAL
+        _purge(conn, now)
+    expires_at = now + ttl if ttl else None
+    conn.execute(
+        "INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+        (key, json.dumps(value), expires_at)
+    )
+
+def get(key):
+    """
+    Get a value
+
+    Args:
+        key (str): The key
+
+    Returns:
+        The stored value, or None if missing or expired
+    """
+    return _read(_connect(), key, time.time())
+
+def set(key, value, ttl=None):
+    """
+    Store a value, replacing any existing one
+
+    Args:
+        key (str): The key
+        value: JSON-serializable value
+        ttl (float, optional): Seconds until the value expires
+    """
+    with transaction() as conn:
+        _write(conn, key, value, ttl, time.time())
+
+def add(key, value, ttl=None):
+    """
+    Store a value only if the key is missing or expired
+
+    Args:
+        key (str): The key
+        value: JSON-serializable value
+        ttl (float, optional): Seconds until the value expires
+
+    Returns:
+        bool: True if the value was stored
+    """
+    now = time.time()
+    with transaction() as conn:
+        if _read(conn, key, now) is not None:
+            return False
+        _write(conn, key, value, ttl, now)
+        return True
+
+def update(key, fn, ttl=None):
+    """
+    Atomically replace a value with fn(current_value)
+
+    Args:
+        key (str): The key
+        fn (callable): Receives the current value (or None) and returns (new_value, result)
+        ttl (float, optional): Seconds until the new value expires
+
+    Returns:
+        The result returned by fn
+    """
+    now = time.time()
+    with transaction() as conn:
+        new_value, result = fn(_read(conn, key, now))
+        _write(conn, key, new_value, ttl, now)
+        return result
+
+def update_many(keys, fn, ttl=None):
+    """
+    Atomically replace several values at once
+
+    Args:
+        keys (list): The keys to read and write together
+        fn (callable): Receives {key: current value or None} and returns ({key: new value}, result)
+        ttl (float, optional): Seconds until the new values expire
+
+    Returns:
+        The result returned by fn
+    """
+    now = time.time()
+    with transaction() as conn:
+        new_values, result = fn({key: _read(conn, key, now) for key in keys})
+        for key, value in new_values.items():
+            _write(conn, key, value, ttl, now)
+        return result
+
+def delete(key):
+    """
+    Remove a key
+
+    Args:
+        key (str): The key
+    """
+    with transaction() as conn:
+        conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+def purge_expired():
+    """Delete every expired entry now instead of on a later write"""
+    with transaction() as conn:
+        _purge(conn, time.time())
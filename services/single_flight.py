@@ -0,0 +1,101 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When many requests need the same expensive result at the same moment (a cohort
+starting the same track), only the first caller does the work. Other threads in
+the process wait on it directly; other worker processes find the flight in the
+shared store and poll for its published result. Waiting is bounded: a caller
+that times out gets CoalesceTimeout and falls back like on any other failure.
+"""
+import logging
+import threading
+import time
+from app import app
+from services import shared_store
+
+logger = logging.getLogger(__name__)
+
+class CoalesceTimeout(Exception):
+    """Raised when a coalesced caller gives up waiting for the in-flight result"""
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def run(key, fn, timeout=None):
+    """
+    Run fn once for all concurrent callers that share a key
+
+    Args:
+        key (str): Identity of the work, e.g. a hash of the rendered prompt
+        fn (callable): Produces a JSON-serializable result
+        timeout (float, optional): Seconds to wait for another caller's result, defaults
+            to the largest LLM deadline plus LLM_COALESCE_MARGIN
+
+    Returns:
+        The result of fn, possibly computed by another caller
+    """
+    if timeout is None:
+        deadlines = app.config.get("LLM_DEADLINES", {}).values()
+        timeout = max(deadlines, default=app.config.get("LLM_TIMEOUT", 60)) + app.config.get("LLM_COALESCE_MARGIN", 10)
+
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _Call()
+            _inflight[key] = call
+
+    if not leader:
+        if not call.event.wait(timeout):
+            raise CoalesceTimeout(f"Timed out after {timeout}s waiting for in-flight call")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = _run_across_workers(key, fn, timeout)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        call.event.set()
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+def _run_across_workers(key, fn, timeout):
+    store_key = f"flight:{key}"
+    lease = app.config.get("LLM_COALESCE_LEASE", 120)
+    result_ttl = app.config.get("LLM_COALESCE_RESULT_TTL", 10)
+    poll_interval = 0.1
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            entry = shared_store.get(store_key)
+            if entry is not None and entry.get("state") == "done":
+                return entry["result"]
+            acquired = entry is None and shared_store.add(store_key, {"state": "running"}, ttl=lease)
+        except Exception as e:
+            # The shared store is an optimization; never fail the call because of it
+            logger.warning(f"Single-flight store unavailable, running call directly: {e}")
+            return fn()
+
+        if acquired:
+            try:
+                result = fn()
+            except Exception:
+                shared_store.delete(store_key)
+                raise
+            shared_store.set(store_key, {"state": "done", "result": result}, ttl=result_ttl)
+            return result
+
+        if time.monotonic() >= deadline:
+            raise CoalesceTimeout(f"Timed out after {timeout}s waiting for another worker's call")
+        time.sleep(poll_interval)
@@ -0,0 +1,212 @@
+"""
+Row totals for the admin dashboard, kept in the stat_counter table.
+
+Counting a large table on every dashboard view is a full scan on Postgres, so
+the totals are stored instead. Every ORM flush that adds or deletes rows of a
+counted table bumps its counter in the same transaction, so the totals move
+with the data and roll back with it. Bulk writers that know their row counts
+call adjust_counters. Each counter is split over COUNTER_SHARDS rows and a
+write bumps a random one, so concurrent inserts rarely wait on each other's
+row lock; readers sum the shards. Other writes that bypass the ORM (bulk inserts, raw SQL)
+are reconciled by a background recount that runs every STATS_REFRESH_INTERVAL:
+each recount job queues the next one, and every worker queues one on startup
+unless a recount is already pending. Rows written while a recount runs can be
+missed by it; the next recount picks them up. The counter rows themselves are
+created by a migration, so reading the totals never counts or writes.
+
+With STATS_APPROXIMATE_COUNTS on Postgres the recount reads the planner's row
+estimate from pg_class instead of running COUNT(*).
+"""
+import logging
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import case, event, func, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import app, db
+from models.user import User
+from models.internship import InternshipTrack, Submission, Certificate
+from models.stats import StatCounter
+from services import job_queue
+
+logger = logging.getLogger(__name__)
+
+# Counted tables, keyed by the counter name
+COUNTED_MODELS = {
+    "user": User,
+    "internship_track": InternshipTrack,
+    "submission": Submission,
+    "certificate": Certificate,
+}
+_counter_names = {model: name for name, model in COUNTED_MODELS.items()}
+
+# Rows per counter; the recount creates any that are missing
+COUNTER_SHARDS = 8
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_rows(session, flush_context):
+    """Apply the rows added and deleted by a flush to their counters"""
+    deltas = {}
+    for instance in session.new:
+        name = _counter_names.get(type(instance))
+        if name:
+            deltas[name] = deltas.get(name, 0) + 1
+    for instance in session.deleted:
+        name = _counter_names.get(type(instance))
+        if name:
+            deltas[name] = deltas.get(name, 0) - 1
+    if deltas:
+        adjust_counters(session.connection(), deltas)
+
+def adjust_counters(connection, deltas):
+    """
+    Add deltas to counters in the caller's transaction
+
+    For writes that bypass the ORM flush, such as bulk deletes.
+
+    Args:
+        connection (Connection): Connection of the transaction making the change
+        deltas (dict): {counter name: rows added, negative for rows removed}
+    """
+    # A missing counter row is a no-op here; the first recount creates it
+    counters = StatCounter.__table__
+    shard = random.randrange(COUNTER_SHARDS)
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        connection.execute(
+            update(counters)
+            .where(counters.c.name == name, counters.c.shard == shard)
+            .values(value=counters.c.value + delta)
+        )
+
+def seed_counters(connection):
+    """
+    Create the counters that do not exist yet, counting their tables
+
+    The total goes to shard 0; the other shards start at zero.
+
+    Args:
+        connection (Connection): Connection of the caller's transaction
+
+    Returns:
+        list: Names of the counters created
+    """
+    counters = StatCounter.__table__
+    existing = set(connection.execute(select(counters.c.name).where(counters.c.shard == 0)).scalars())
+    now = datetime.utcnow()
+    created = []
+    for name, model in COUNTED_MODELS.items():
+        if name in existing:
+            continue
+        total = connection.execute(select(func.count()).select_from(model)).scalar()
+        connection.execute(counters.insert(), [
+            {"name": name, "shard": shard, "value": total if shard == 0 else 0, "refreshed_at": now}
+            for shard in range(COUNTER_SHARDS)
+        ])
+        created.append(name)
+    return created
+
+def _count_rows(model):
+    """Count a table's rows, from the planner's estimate when approximate counts are enabled"""
+    if app.config.get("STATS_APPROXIMATE_COUNTS") and db.engine.dialect.name == "postgresql":
+        estimate = db.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+            {"table": model.__tablename__}
+        ).scalar()
+        # -1 means the table has never been analyzed
+        if estimate is not None and estimate >= 0:
+            return estimate
+    return db.session.execute(select(func.count()).select_from(model)).scalar()
+
+def refresh_counters(names=None):
+    """
+    Recount tables and store the totals
+
+    The total is written to shard 0 and the other shards are zeroed in the
+    same transaction.
+
+    Args:
+        names (list, optional): Counter names to refresh; all when omitted
+
+    Returns:
+        dict: {counter name: total}
+    """
+    counters = StatCounter.__table__
+    totals = {}
+    now = datetime.utcnow()
+    for name in names or COUNTED_MODELS:
+        totals[name] = _count_rows(COUNTED_MODELS[name])
+        existing = set(db.session.execute(select(counters.c.shard).where(counters.c.name == name)).scalars())
+        for shard in range(COUNTER_SHARDS):
+            if shard not in existing:
+                db.session.add(StatCounter(name=name, shard=shard, value=0))
+        try:
+            db.session.flush()
+            db.session.execute(
+                update(counters)
+                .where(counters.c.name == name)
+                .values(value=case((counters.c.shard == 0, totals[name]), else_=0), refreshed_at=now)
+            )
+            db.session.commit()
+        except IntegrityError:
+            # Another process created the counter at the same time; its total stands
+            db.session.rollback()
+    return totals
+
+def _claim_refresh(delay, pending_before):
+    """
+    Queue a recount in `delay` seconds unless one is due after `pending_before`
+
+    refresh_requested_at holds the time the pending recount is due; claiming
+    it with a conditional UPDATE keeps workers from queueing duplicates.
+    """
+    due = datetime.utcnow() + timedelta(seconds=delay)
+    updated = StatCounter.query.filter(
+        StatCounter.shard == 0,
+        or_(StatCounter.refresh_requested_at.is_(None), StatCounter.refresh_requested_at <= pending_before)
+    ).update({"refresh_requested_at": due}, synchronize_session=False)
+    if updated:
+        job_queue.enqueue_job('refresh_stat_counters', delay=delay)
+    db.session.commit()
+    return bool(updated)
+
+def queue_refresh():
+    """
+    Queue a recount now unless one is already pending
+
+    Called by every worker on startup. A recount overdue by a whole interval
+    (e.g. its job died) counts as lost and is queued again.
+
+    Returns:
+        bool: Whether a recount was queued
+    """
+    interval = app.config.get("STATS_REFRESH_INTERVAL", 3600)
+    return _claim_refresh(0, datetime.utcnow() - timedelta(seconds=interval))
+
+def get_counts():
+    """
+    Get the stored row totals for the admin dashboard
+
+    Sums the shards with one query and never writes; the periodic recount
+    keeps them current.
+
+    Returns:
+        dict: {counter name: total} for every name in COUNTED_MODELS, 0 for a
+            counter the migration has not created yet
+    """
+    totals = {name: 0 for name in COUNTED_MODELS}
+    # SUM of a BIGINT is NUMERIC on Postgres
+    totals.update((name, int(total)) for name, total in db.session.execute(
+        select(StatCounter.name, func.sum(StatCounter.value)).group_by(StatCounter.name)
+    ))
+    return totals
+
+def _run_refresh_job(job):
+    """Job handler: recount every counted table and queue the next recount"""
+    totals = refresh_counters()
+    logger.info(f"Refreshed stat counters: {totals}")
+    # Only the recount that was due queues the next one; a duplicate finds it pending
+    _claim_refresh(app.config.get("STATS_REFRESH_INTERVAL", 3600), datetime.utcnow())
+
+job_queue.register_handler('refresh_stat_counters', _run_refresh_job)
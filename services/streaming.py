@@ -0,0 +1,75 @@
+"""
+Server-Sent Events helpers for streaming LLM output to the browser.
+"""
+import json
+from flask import Response, request, stream_with_context
+from services.rate_limiter import RATE_LIMIT_MESSAGE, get_retry_after
+
+def wants_event_stream(data=None):
+    """
+    Check whether the client asked for a streamed response
+
+    Args:
+        data (dict, optional): Parsed form or JSON body that may carry a stream flag
+
+    Returns:
+        bool: True for an explicit stream flag or an Accept: text/event-stream header
+    """
+    if data is not None and str(data.get('stream', '')).lower() in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best == 'text/event-stream'
+
+def sse_event(data, event=None):
+    """
+    Format a single Server-Sent Event
+
+    Args:
+        data (dict): JSON-serializable event payload
+        event (str, optional): Event name, defaults to the "message" event
+
+    Returns:
+        str: The encoded event
+    """
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+def sse_response(chunks):
+    """
+    Stream text chunks to the client as Server-Sent Events
+
+    Each chunk is sent as {"token": ...}, followed by a final "done" event. A
+    rate-limited LLM call is reported as an "error" event with retry_after. If
+    the client disconnects the server closes this generator, which in turn
+    closes the chunk source and cancels the upstream completion.
+
+    Args:
+        chunks (iterator): Text fragments to forward
+
+    Returns:
+        Response: A text/event-stream response
+    """
+    def stream():
+        try:
+            # Comment line so proxies and the browser see the stream open immediately
+            yield ": stream open\n\n"
+            for chunk in chunks:
+                # A rate-limited call yields fallback text; report the limit instead
+                retry_after = get_retry_after()
+                if retry_after:
+                    yield sse_event({"error": RATE_LIMIT_MESSAGE, "retry_after": retry_after}, event="error")
+                    break
+                yield sse_event({"token": chunk})
+            yield sse_event({}, event="done")
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable proxy buffering so each token is flushed
+        }
+    )
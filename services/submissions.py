@@ -0,0 +1,33 @@
+"""
+Submission queries shared by the web routes, the JSON API and the supervisor.
+"""
+from sqlalchemy import func, select
+from models.internship import Task, Submission
+
+def latest_submissions_by_task(internship_id, user_id=None):
+    """
+    Get the most recent submission for every task of an internship in one query
+
+    Submissions are ranked per task with ROW_NUMBER() over submitted_at (id
+    breaks ties), which SQLite 3.25+ and Postgres both support.
+
+    Args:
+        internship_id (int): The internship
+        user_id (int, optional): Only consider this user's submissions
+
+    Returns:
+        dict: {task_id: Submission}; tasks without submissions are absent
+    """
+    ranked = select(
+        Submission.id,
+        func.row_number().over(
+            partition_by=Submission.task_id,
+            order_by=(Submission.submitted_at.desc(), Submission.id.desc())
+        ).label("position")
+    ).join(Task, Task.id == Submission.task_id).where(Task.internship_id == internship_id)
+    if user_id is not None:
+        ranked = ranked.where(Submission.user_id == user_id)
+    ranked = ranked.subquery()
+
+    latest = Submission.query.join(ranked, Submission.id == ranked.c.id).filter(ranked.c.position == 1).all()
+    return {submission.task_id: submission for submission in latest}
@@ -1,40 +1,15 @@
 import logging
 import os
 import json
-from openai import OpenAI, AzureOpenAI
 from app import app
+from services.llm_gateway import chat_completion, stream_chat_completion
 
 logger = logging.getLogger(__name__)
 
-# Configure OpenAI client
-if app.config.get("AZURE_OPENAI_KEY"):
-    logger.info("AI Supervisor: Azure OpenAI client configured")
-    client = AzureOpenAI(
-        api_key=app.config.get("AZURE_OPENAI_KEY"),
-        api_version=app.config.get("AZURE_OPENAI_API_VERSION", "2023-12-01-preview"),
-        azure_endpoint=app.config.get("AZURE_OPENAI_ENDPOINT"),
-    )
-    deployment_name = app.config.get("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
-else:
-    # Fallback to standard OpenAI if Azure credentials aren't available
-    logger.info("AI Supervisor: Standard OpenAI client configured")
-    client = OpenAI(api_key=app.config.get("OPENAI_API_KEY"))
-    deployment_name = "gpt-4o"  # The newest OpenAI model is "gpt-4o" which was released May 13, 2024
+SUPERVISOR_ERROR_MESSAGE = "I apologize, but I'm having trouble processing your question at the moment. Please try again later or contact support if the issue persists."
 
-def ask_question(question, user_profile, internship=None, task=None):
-    """
-    Generate a response to a user's question using the AI supervisor bot
-    
-    Args:
-        question (str): The user's question
-        user_profile (UserProfile): The user's profile
-        internship (InternshipTrack, optional): The current internship
-        task (Task, optional): The current task
-        
-    Returns:
-        str: The AI supervisor's response
-    """
-    # Create context from user profile and internship details
+def _build_supervisor_context(user_profile, internship=None, task=None):
+    """Build the system message describing the student, internship and task"""
     context = f"You are an AI supervisor for a virtual internship program. "
     context += f"You are helping a student named {user_profile.full_name or 'a student'} "
     
@@ -51,29 +26,82 @@ def ask_question(question, user_profile, internship=None, task=None):
         context += f"Task description: {task.description}. "
         context += f"Task instructions: {task.instructions}. "
     
-    prompt = context + f"\n\nStudent question: {question}\n\nYour response (be helpful, encouraging, and professional):"
+    return context
+
+def ask_question(question, user_profile, internship=None, task=None):
+    """
+    Generate a response to a user's question using the AI supervisor bot
+    
+    Args:
+        question (str): The user's question
+        user_profile (UserProfile): The user's profile
+        internship (InternshipTrack, optional): The current internship
+        task (Task, optional): The current task
+        
+    Returns:
+        str: The AI supervisor's response
+    """
+    # Create context from user profile and internship details
+    context = _build_supervisor_context(user_profile, internship, task)
     
     try:
         logger.info(f"Sending request to AI with question: {question[:50]}...")
         
         # Use the same code path regardless of Azure or OpenAI
-        response = client.chat.completions.create(
-            model=deployment_name,
+        answer = chat_completion(
             messages=[
                 {"role": "system", "content": context},
                 {"role": "user", "content": question}
             ],
             max_tokens=800,
-            temperature=0.7
+            temperature=0.7,
+            call_type="chat"
         )
-        
-        answer = response.choices[0].message.content
         logger.info(f"Received AI response: {answer[:50]}...")
         return answer
     except Exception as e:
         logger.error(f"Error generating supervisor response: {str(e)}")
-        return "I apologize, but I'm having trouble processing your question at the moment. Please try again later or contact support if the issue persists."
+        return SUPERVISOR_ERROR_MESSAGE
 
+def stream_question(question, user_profile, internship=None, task=None):
+    """
+    Stream the AI supervisor's response to a user's question token by token
+    
+    The context is built before the first token is requested, so the caller can
+    release database objects once iteration starts.
+    
+    Args:
+        question (str): The user's question
+        user_profile (UserProfile): The user's profile
+        internship (InternshipTrack, optional): The current internship
+        task (Task, optional): The current task
+        
+    Returns:
+        generator: Yields response text fragments
+    """
+    context = _build_supervisor_context(user_profile, internship, task)
+    messages = [
+        {"role": "system", "content": context},
+        {"role": "user", "content": question}
+    ]
+    
+    def generate():
+        received = False
+        deltas = stream_chat_completion(messages=messages, max_tokens=800, temperature=0.7)
+        try:
+            logger.info(f"Streaming AI response for question: {question[:50]}...")
+            for delta in deltas:
+                received = True
+                yield delta
+        except Exception as e:
+            logger.error(f"Error streaming supervisor response: {str(e)}")
+            if not received:
+                yield SUPERVISOR_ERROR_MESSAGE
+        finally:
+            # Runs on client disconnect too, closing the upstream completion
+            deltas.close()
+    
+    return generate()
 
 def generate_feedback(submission_content, task_title, task_description, task_difficulty, industry="professional"):
     """
@@ -101,18 +129,16 @@ def generate_feedback(submission_content, task_title, task_description, task_dif
     )
     
     try:
-        response = client.chat.completions.create(
-            model=deployment_name,
+        feedback_text = chat_completion(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": submission_content}
             ],
             max_tokens=1000,
             temperature=0.5,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            call_type="feedback"
         )
-        
-        feedback_text = response.choices[0].message.content
         feedback = json.loads(feedback_text)
         
         # Ensure all expected fields are present
@@ -137,9 +163,12 @@ def generate_feedback(submission_content, task_title, task_description, task_dif
         }
 
 
-def suggest_resources(task_title, task_description, industry):
+def generate_resources(task_title, task_description, industry):
     """
-    Suggest learning resources for a specific task
+    Ask the model for learning resources for a specific task
+    
+    Unlike suggest_resources this raises on failure, so callers that persist
+    the result (the background refresh job) never store the fallback list.
     
     Args:
         task_title (str): The title of the task
@@ -157,28 +186,42 @@ def suggest_resources(task_title, task_description, industry):
         f"Respond with a JSON array where each object has title, description, and type fields."
     )
     
-    try:
-        response = client.chat.completions.create(
-            model=deployment_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Suggest resources for: {task_title}"}
-            ],
-            max_tokens=800,
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
-        
-        resources_text = response.choices[0].message.content
-        resources = json.loads(resources_text)
-        
-        # Ensure we have a list of resources
-        if isinstance(resources, dict) and "resources" in resources:
-            resources = resources["resources"]
-        elif not isinstance(resources, list):
-            resources = []
+    resources_text = chat_completion(
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Suggest resources for: {task_title}"}
+        ],
+        max_tokens=800,
+        temperature=0.7,
+        response_format={"type": "json_object"},
+        coalesce=True,
+        call_type="resources"
+    )
+    resources = json.loads(resources_text)
+    
+    # Ensure we have a list of resources
+    if isinstance(resources, dict) and "resources" in resources:
+        resources = resources["resources"]
+    elif not isinstance(resources, list):
+        resources = []
+    
+    return resources
+
+
+def suggest_resources(task_title, task_description, industry):
+    """
+    Suggest learning resources for a specific task
+    
+    Args:
+        task_title (str): The title of the task
+        task_description (str): The description of the task
+        industry (str): The industry of the internship
         
-        return resources
+    Returns:
+        list: List of suggested resources with titles and brief descriptions
+    """
+    try:
+        return generate_resources(task_title, task_description, industry)
     except Exception as e:
         logger.error(f"Error suggesting resources: {str(e)}")
         return [
@@ -213,18 +256,16 @@ def generate_certificate_for_internship(user_name, internship_title, industry, t
     )
     
     try:
-        response = client.chat.completions.create(
-            model=deployment_name,
+        certificate_text = chat_completion(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": "Generate certificate content"}
             ],
             max_tokens=800,
             temperature=0.7,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            call_type="certificate"
         )
-        
-        certificate_text = response.choices[0].message.content
         certificate = json.loads(certificate_text)
         
         # Ensure expected fields are present
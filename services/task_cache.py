@@ -0,0 +1,152 @@
+"""
+Persistent cache of generated task lists.
+
+Task generation prompts depend only on a handful of inputs (industry, major,
+week, ...), and most students share the same combination. Generated lists are
+stored under a hash of the normalized inputs. Each key keeps a small "variety
+pool" of variants: until the pool is full a lookup misses so the caller
+generates another variant, after that lookups pick a random variant.
+
+Cache reads and writes use their own connection so they never commit or roll
+back the caller's pending session.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select, update
+from app import app, db
+from models.cache import GeneratedTaskSet
+
+logger = logging.getLogger(__name__)
+
+_table = GeneratedTaskSet.__table__
+
+def _normalize(value):
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if value is None:
+        return ""
+    return value
+
+def make_key(namespace, **inputs):
+    """
+    Build the cache key for a set of generator inputs
+
+    Args:
+        namespace (str): Name of the generator
+        **inputs: The inputs that shape the generated tasks
+
+    Returns:
+        str: Hex sha256 digest of the normalized inputs
+    """
+    material = json.dumps({"namespace": namespace, "inputs": _normalize(inputs)}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def get_cached_tasks(cache_key):
+    """
+    Get a cached task list for the key once its variety pool is full
+
+    Args:
+        cache_key (str): Key from make_key
+
+    Returns:
+        list: A copy of one cached task list, or None on a miss
+    """
+    if not app.config.get("TASK_CACHE_ENABLED", True):
+        return None
+
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config.get("TASK_CACHE_TTL", 604800))
+    pool_size = max(1, app.config.get("TASK_CACHE_VARIANTS", 3))
+
+    try:
+        with db.engine.begin() as conn:
+            rows = conn.execute(
+                select(_table.c.id, _table.c.payload)
+                .where(_table.c.cache_key == cache_key, _table.c.created_at >= cutoff)
+            ).all()
+
+            if len(rows) < pool_size:
+                return None
+
+            row = random.choice(rows)
+            conn.execute(
+                update(_table)
+                .where(_table.c.id == row.id)
+                .values(hit_count=_table.c.hit_count + 1, last_used_at=datetime.utcnow())
+            )
+
+        logger.info(f"Task cache hit for {cache_key[:12]} ({len(rows)} variants)")
+        return json.loads(row.payload)
+    except Exception as e:
+        logger.error(f"Task cache lookup failed: {e}")
+        return None
+
+def store_tasks(cache_key, namespace, tasks):
+    """
+    Store a freshly generated task list as a new variant and apply eviction
+
+    Args:
+        cache_key (str): Key from make_key
+        namespace (str): Name of the generator
+        tasks (list): The generated task dictionaries
+    """
+    if not app.config.get("TASK_CACHE_ENABLED", True) or not tasks:
+        return
+
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=app.config.get("TASK_CACHE_TTL", 604800))
+    pool_size = max(1, app.config.get("TASK_CACHE_VARIANTS", 3))
+    max_entries = app.config.get("TASK_CACHE_MAX_ENTRIES", 5000)
+
+    try:
+        payload = json.dumps(tasks)
+        with db.engine.begin() as conn:
+            # Coalesced callers all receive the same list; store it only once
+            duplicate = conn.execute(
+                select(_table.c.id)
+                .where(_table.c.cache_key == cache_key, _table.c.payload == payload)
+                .limit(1)
+            ).first()
+            if duplicate is not None:
+                return
+
+            conn.execute(_table.insert().values(
+                cache_key=cache_key,
+                namespace=namespace,
+                payload=payload,
+                hit_count=0,
+                created_at=now,
+                last_used_at=now
+            ))
+
+            # Expired variants are never served again
+            conn.execute(delete(_table).where(_table.c.created_at < cutoff))
+
+            # Keep at most pool_size variants per key, dropping the oldest
+            surplus = conn.execute(
+                select(_table.c.id)
+                .where(_table.c.cache_key == cache_key)
+                .order_by(_table.c.created_at.desc())
+                .offset(pool_size)
+            ).scalars().all()
+            if surplus:
+                conn.execute(delete(_table).where(_table.c.id.in_(surplus)))
+
+            # Bound the table size, evicting the least recently used variants
+            total = conn.execute(select(func.count()).select_from(_table)).scalar()
+            if total > max_entries:
+                stale = conn.execute(
+                    select(_table.c.id)
+                    .order_by(_table.c.last_used_at)
+                    .limit(total - max_entries)
+                ).scalars().all()
+                conn.execute(delete(_table).where(_table.c.id.in_(stale)))
+    except Exception as e:
+        logger.error(f"Task cache store failed: {e}")
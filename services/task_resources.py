@@ -0,0 +1,104 @@
+"""
+Stored learning resources for tasks.
+
+Resources are generated once per task by a background job and served from the
+task_resource_set table, so rendering a task page never waits on the model.
+Stored sets older than TASK_RESOURCES_MAX_AGE are refreshed in the background
+the next time they are read; the old set keeps being served meanwhile.
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from app import app, db
+from models.internship import Task, TaskResourceSet
+from services import job_queue
+from services.supervisor_service import generate_resources
+
+logger = logging.getLogger(__name__)
+
+def get_task_resources(task):
+    """
+    Get the stored resources for a task, queuing generation if missing or stale
+
+    Args:
+        task (Task): The task
+
+    Returns:
+        tuple: (resources list, True if a refresh is pending)
+    """
+    entry = TaskResourceSet.query.filter_by(task_id=task.id).first()
+
+    max_age = timedelta(seconds=app.config.get("TASK_RESOURCES_MAX_AGE", 30 * 24 * 3600))
+    if entry is None or entry.generated_at is None or entry.generated_at < datetime.utcnow() - max_age:
+        try:
+            queue_resource_refresh(task.id)
+        except Exception as e:
+            logger.error(f"Failed to queue resource refresh for task {task.id}: {e}")
+        entry = TaskResourceSet.query.filter_by(task_id=task.id).first()
+
+    if entry is None:
+        return [], True
+
+    resources = json.loads(entry.payload) if entry.payload else []
+    return resources, entry.status == 'pending'
+
+def queue_resource_refresh(task_id):
+    """
+    Queue a background regeneration of a task's resources
+
+    Only one refresh per task is queued at a time; a refresh that has been
+    pending for longer than TASK_RESOURCES_RETRY_AFTER (e.g. its job died) can
+    be queued again.
+
+    Args:
+        task_id (int): The task ID
+
+    Returns:
+        bool: True if a job was queued, False if one is already pending
+    """
+    now = datetime.utcnow()
+    retry_cutoff = now - timedelta(seconds=app.config.get("TASK_RESOURCES_RETRY_AFTER", 600))
+
+    if TaskResourceSet.query.filter_by(task_id=task_id).first() is None:
+        db.session.add(TaskResourceSet(task_id=task_id, status='pending', requested_at=now))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request created the row and queued the job
+            db.session.rollback()
+            return False
+    else:
+        # Conditional update so concurrent page views queue a single job
+        updated = TaskResourceSet.query.filter(
+            TaskResourceSet.task_id == task_id,
+            or_(TaskResourceSet.status != 'pending', TaskResourceSet.requested_at < retry_cutoff)
+        ).update({"status": 'pending', "requested_at": now}, synchronize_session=False)
+        db.session.commit()
+        if not updated:
+            return False
+
+    job_queue.enqueue_job('refresh_task_resources', ref_id=task_id)
+    return True
+
+def _run_resource_job(job):
+    """Job handler: generate and store resources for job.ref_id"""
+    task = Task.query.get(job.ref_id)
+    if task is None:
+        logger.warning(f"Task {job.ref_id} no longer exists, skipping resource refresh")
+        return
+
+    industry = task.internship.industry.name if task.internship.industry else "general"
+    resources = generate_resources(task.title, task.description, industry)
+
+    entry = TaskResourceSet.query.filter_by(task_id=task.id).first()
+    if entry is None:
+        entry = TaskResourceSet(task_id=task.id)
+        db.session.add(entry)
+    entry.payload = json.dumps(resources)
+    entry.status = 'ready'
+    entry.generated_at = datetime.utcnow()
+    db.session.commit()
+
+job_queue.register_handler('refresh_task_resources', _run_resource_job)
@@ -0,0 +1,154 @@
+"""
+Turning generated task lists into Task rows and Cosmos documents.
+
+Every flow that starts or refills an internship hands the generator's task
+dictionaries to create_tasks, which validates them, inserts all rows with one
+executemany INSERT and counts them towards the internship's progress. The
+legacy generator mirrors the same tasks to Cosmos DB with
+upsert_task_documents, one transactional batch per partition key value.
+"""
+import logging
+from sqlalchemy import insert
+from app import db
+from models.internship import Task
+from services.internship_progress import record_tasks_added
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ("easy", "medium", "hard")
+DEFAULT_DESCRIPTION = "Complete this task as part of your virtual internship."
+DEFAULT_INSTRUCTIONS = "Follow the instructions carefully and submit your work."
+DEFAULT_POINTS = 100
+
+# Operations per Cosmos transactional batch, the service limit
+COSMOS_BATCH_LIMIT = 100
+
+_partition_key_paths = {}
+
+def _text(value, default, max_length=None):
+    text = str(value).strip() if value is not None else ""
+    if not text:
+        return default
+    return text[:max_length] if max_length else text
+
+def _points(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return DEFAULT_POINTS
+
+def build_task_rows(internship_id, task_list, week=1, deadline=None, default_title=None):
+    """
+    Validate generated tasks and build the rows to insert
+
+    Entries that are not dictionaries are dropped; missing or malformed
+    fields fall back to defaults and titles are cut to the column length.
+
+    Args:
+        internship_id (int): The internship the tasks belong to
+        task_list (list): Task dictionaries from a generator
+        week (int): Week number used in default titles
+        deadline (datetime, optional): Deadline for every task
+        default_title (str, optional): Title for tasks without one, "Week {week} Task" by default
+
+    Returns:
+        list: Column dictionaries for Task
+    """
+    default_title = default_title or f"Week {week} Task"
+    rows = []
+    for task_data in task_list or []:
+        if not isinstance(task_data, dict):
+            continue
+        difficulty = str(task_data.get("difficulty") or "").strip().lower()
+        rows.append({
+            "internship_id": internship_id,
+            "title": _text(task_data.get("title"), default_title, Task.title.type.length),
+            "description": _text(task_data.get("description"), DEFAULT_DESCRIPTION),
+            "instructions": _text(task_data.get("instructions"), DEFAULT_INSTRUCTIONS),
+            "difficulty": difficulty if difficulty in DIFFICULTIES else "medium",
+            "points": _points(task_data.get("points", DEFAULT_POINTS)),
+            "deadline": deadline,
+        })
+    return rows
+
+def create_tasks(internship_id, task_list, week=1, deadline=None, default_title=None):
+    """
+    Insert generated tasks for an internship in one statement
+
+    Runs in the caller's transaction; the caller commits.
+
+    Args:
+        internship_id (int): The internship the tasks belong to
+        task_list (list): Task dictionaries from a generator
+        week (int): Week number used in default titles
+        deadline (datetime, optional): Deadline for every task
+        default_title (str, optional): Title for tasks without one, "Week {week} Task" by default
+
+    Returns:
+        int: Number of tasks created
+    """
+    rows = build_task_rows(internship_id, task_list, week, deadline, default_title)
+    if not rows:
+        return 0
+    db.session.execute(insert(Task), rows)
+    record_tasks_added(internship_id, len(rows))
+    logger.info(f"Added {len(rows)} tasks to internship {internship_id}")
+    return len(rows)
+
+def _partition_key_path(container):
+    """Partition key path of a Cosmos container, read once per container"""
+    if container.id not in _partition_key_paths:
+        _partition_key_paths[container.id] = container.read()["partitionKey"]["paths"][0]
+    return _partition_key_paths[container.id]
+
+def _partition_key_value(document, path):
+    value = document
+    for part in path.strip("/").split("/"):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+def upsert_task_documents(container, internship_title, industry, week, task_list):
+    """
+    Mirror generated tasks to Cosmos DB
+
+    Documents sharing a partition key value are upserted together in
+    transactional batches instead of one request per task.
+
+    Args:
+        container (ContainerProxy): Cosmos container client
+        internship_title (str): The title of the internship
+        industry (str): The industry for the internship
+        week (int): The week number of the internship
+        task_list (list): Task dictionaries from a generator
+    """
+    # Keyed by id, so a repeated title is written once
+    documents = {
+        f"{internship_title}-{row['title']}": {
+            "id": f"{internship_title}-{row['title']}",
+            "type": "task",
+            "internship_title": internship_title,
+            "industry": industry,
+            "week": week,
+            "title": row["title"],
+            "description": row["description"],
+            "instructions": row["instructions"],
+            "difficulty": row["difficulty"],
+            "points": row["points"]
+        }
+        for row in build_task_rows(None, task_list, week)
+    }
+    if not documents:
+        return
+
+    path = _partition_key_path(container)
+    batches = {}
+    for document in documents.values():
+        batches.setdefault(_partition_key_value(document, path), []).append(("upsert", (document,)))
+    for partition_key, operations in batches.items():
+        if partition_key is None:
+            # A batch needs a partition key value; documents without one are upserted one by one
+            for _, (document,) in operations:
+                container.upsert_item(document)
+            continue
+        for i in range(0, len(operations), COSMOS_BATCH_LIMIT):
+            container.execute_item_batch(operations[i:i + COSMOS_BATCH_LIMIT], partition_key=partition_key)
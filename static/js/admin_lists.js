@@ -0,0 +1,111 @@
+/**
+ * Admin list pages: rows are fetched page by page from a JSON endpoint
+ * that answers {items: [...], next_cursor: string|null}.
+ */
+
+/**
+ * Build a table cell holding plain text
+ * @param {*} value - Cell content; null and empty values show a dash
+ * @returns {HTMLTableCellElement}
+ */
+function textCell(value) {
+    const cell = document.createElement('td');
+    cell.textContent = value === null || value === undefined || value === '' ? '-' : value;
+    return cell;
+}
+
+/**
+ * Build a table cell holding a Bootstrap badge
+ * @param {string} text - Badge label
+ * @param {string} color - Bootstrap background color name, e.g. success
+ * @returns {HTMLTableCellElement}
+ */
+function badgeCell(text, color) {
+    const cell = document.createElement('td');
+    const badge = document.createElement('span');
+    badge.className = `badge bg-${color}`;
+    badge.textContent = text;
+    cell.appendChild(badge);
+    return cell;
+}
+
+/**
+ * Wire a filter form, a table body and a "Load more" button to a paginated endpoint
+ * @param {Object} options
+ * @param {string} options.url - JSON endpoint
+ * @param {HTMLFormElement} options.form - Filters; every named field becomes a query parameter
+ * @param {HTMLElement} options.tbody - Table body the rows are appended to
+ * @param {HTMLButtonElement} options.loadMore - Fetches the next page
+ * @param {HTMLElement} options.status - Shows loading, empty and error messages
+ * @param {function(Object): HTMLTableRowElement} options.renderRow - Builds the row for one item
+ */
+function initializeAdminList(options) {
+    let cursor = null;
+    let generation = 0;
+
+    function load(reset) {
+        if (reset) {
+            cursor = null;
+            generation += 1;
+            options.tbody.replaceChildren();
+        }
+        const requestGeneration = generation;
+
+        const params = new URLSearchParams();
+        new FormData(options.form).forEach((value, key) => {
+            if (value) {
+                params.append(key, value);
+            }
+        });
+        if (cursor) {
+            params.append('cursor', cursor);
+        }
+
+        options.loadMore.disabled = true;
+        options.status.textContent = 'Loading...';
+
+        fetch(`${options.url}?${params.toString()}`, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json().then(data => {
+                if (!response.ok) {
+                    throw new Error(data.error || `Request failed with status ${response.status}`);
+                }
+                return data;
+            }))
+            .then(data => {
+                // Filters changed while this page was loading
+                if (requestGeneration !== generation) {
+                    return;
+                }
+                data.items.forEach(item => options.tbody.appendChild(options.renderRow(item)));
+                cursor = data.next_cursor;
+                options.loadMore.classList.toggle('d-none', !cursor);
+                options.loadMore.disabled = false;
+                options.status.textContent = options.tbody.children.length ? '' : 'No matching records.';
+            })
+            .catch(error => {
+                options.loadMore.disabled = false;
+                options.status.textContent = error.message;
+            });
+    }
+
+    let searchTimer = null;
+    options.form.addEventListener('submit', function(e) {
+        e.preventDefault();
+        load(true);
+    });
+    options.form.addEventListener('change', function(e) {
+        // Text fields reload as the user types
+        if (e.target.tagName === 'SELECT') {
+            load(true);
+        }
+    });
+    options.form.addEventListener('input', function(e) {
+        if (e.target.type === 'search' || e.target.type === 'text') {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => load(true), 300);
+        }
+    });
+    options.loadMore.addEventListener('click', () => load(false));
+
+    load(true);
+}
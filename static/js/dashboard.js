@@ -241,34 +241,39 @@ function initializeTasksFilter() {
 }
 
 /**
- * Update real-time stats for admin dashboard
+ * Keep stat cards up to date from an analytics endpoint
+ *
+ * The #real-time-stats container names the endpoint in data-url and the
+ * polling interval in data-refresh (seconds). Every element inside it with a
+ * data-stat attribute shows that key of the response's totals.
+ * @param {function(Object)} [onData] - Also called with every response, e.g. to redraw charts
+ * @returns {function|null} Reloads immediately; null when the page has no stats container
  */
-function updateRealTimeStats() {
+function updateRealTimeStats(onData) {
     const statsContainer = document.getElementById('real-time-stats');
-    if (!statsContainer) return;
+    if (!statsContainer || !statsContainer.dataset.url) return null;
     
-    // In a real implementation, this would call an API endpoint
-    // For demo purposes, we'll just simulate updates with random data
-    setInterval(() => {
-        const activeUsers = document.getElementById('active-users-count');
-        if (activeUsers) {
-            const currentCount = parseInt(activeUsers.textContent);
-            // Random fluctuation between -2 and +2
-            const newCount = Math.max(0, currentCount + Math.floor(Math.random() * 5) - 2);
-            activeUsers.textContent = newCount;
-        }
-        
-        const taskSubmissions = document.getElementById('task-submissions-count');
-        if (taskSubmissions) {
-            const currentCount = parseInt(taskSubmissions.textContent);
-            // Add between 0 and 3 new submissions
-            const newCount = currentCount + Math.floor(Math.random() * 4);
-            taskSubmissions.textContent = newCount;
-        }
-    }, 5000); // Update every 5 seconds
-}
-
-// Start real-time stats updates if on admin dashboard
-if (document.getElementById('real-time-stats')) {
-    updateRealTimeStats();
+    function refresh() {
+        return fetch(statsContainer.dataset.url, { headers: { 'Accept': 'application/json' } })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Analytics request failed with status ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                statsContainer.querySelectorAll('[data-stat]').forEach(el => {
+                    const value = data.totals[el.dataset.stat];
+                    el.textContent = value === null || value === undefined ? '-' : value.toLocaleString();
+                });
+                if (onData) {
+                    onData(data);
+                }
+            })
+            .catch(error => console.error(error));
+    }
+    
+    refresh();
+    setInterval(refresh, (parseInt(statsContainer.dataset.refresh, 10) || 30) * 1000);
+    return refresh;
 }
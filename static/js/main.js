@@ -54,33 +54,38 @@ function initializeAISupervisor() {
         chatMessages.appendChild(typingIndicator);
         chatMessages.scrollTop = chatMessages.scrollHeight;
         
-        // Send message to AI supervisor API
-        fetch('/api/supervisor/ask', {
+        // Stream the AI supervisor's answer token by token
+        let botText = null;
+        const formData = new FormData();
+        formData.append('question', message);
+        formData.append('internship_id', internshipId);
+        formData.append('task_id', taskId);
+        streamSupervisorResponse('/ask-supervisor', {
             method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                question: message,
-                internship_id: internshipId,
-                task_id: taskId
-            })
+            body: formData
+        }, function(token) {
+            if (!botText) {
+                // Replace the typing indicator with the message on the first token
+                chatMessages.removeChild(typingIndicator);
+                botText = addMessage('', 'bot');
+            }
+            botText.textContent += token;
+            chatMessages.scrollTop = chatMessages.scrollHeight;
         })
-        .then(response => response.json())
-        .then(data => {
-            // Remove typing indicator
-            chatMessages.removeChild(typingIndicator);
-            
-            // Add bot response
-            addMessage(data.response, 'bot');
+        .then(() => {
+            if (!botText) {
+                chatMessages.removeChild(typingIndicator);
+            }
         })
         .catch(error => {
             console.error('Error:', error);
-            // Remove typing indicator
-            chatMessages.removeChild(typingIndicator);
-            
-            // Add error message
-            addMessage('Sorry, I\'m having trouble processing your request. Please try again later.', 'bot');
+            if (!botText) {
+                // Remove typing indicator
+                chatMessages.removeChild(typingIndicator);
+                
+                // Add error message
+                addMessage('Sorry, I\'m having trouble processing your request. Please try again later.', 'bot');
+            }
         });
     });
 
@@ -88,6 +93,7 @@ function initializeAISupervisor() {
      * Add a message to the chat container
      * @param {string} text - Message text
      * @param {string} sender - Message sender ('user' or 'bot')
+     * @returns {HTMLElement} The paragraph holding the message text
      */
     function addMessage(text, sender) {
         const messageEl = document.createElement('div');
@@ -107,9 +113,97 @@ function initializeAISupervisor() {
         messageEl.appendChild(messageP);
         chatMessages.appendChild(messageEl);
         chatMessages.scrollTop = chatMessages.scrollHeight;
+        return messageP;
     }
 }
 
+/**
+ * Ask the AI supervisor and receive the answer as Server-Sent Events
+ * @param {string} url - Supervisor endpoint
+ * @param {Object} options - fetch options (method, headers, body)
+ * @param {function(string)} onToken - Called with each text fragment as it arrives
+ * @returns {Promise<string>} Resolves with the complete answer
+ */
+function streamSupervisorResponse(url, options, onToken) {
+    const headers = Object.assign({}, options.headers || {}, { 'Accept': 'text/event-stream' });
+
+    return fetch(url, Object.assign({}, options, { headers: headers }))
+        .then(response => {
+            if (response.status === 429) {
+                // Rate limited: the server explains when to retry
+                return response.json().then(data => {
+                    throw new Error(data.error);
+                });
+            }
+            if (!response.ok) {
+                throw new Error(`Supervisor request failed with status ${response.status}`);
+            }
+
+            const contentType = response.headers.get('Content-Type') || '';
+            if (!contentType.includes('text/event-stream') || !response.body) {
+                // Server answered with a plain JSON response
+                return response.json().then(data => {
+                    if (data.error) {
+                        throw new Error(data.error);
+                    }
+                    onToken(data.response);
+                    return data.response;
+                });
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let fullText = '';
+
+            function read() {
+                return reader.read().then(({ done, value }) => {
+                    if (done) {
+                        return fullText;
+                    }
+
+                    buffer += decoder.decode(value, { stream: true });
+                    const events = buffer.split('\n\n');
+                    buffer = events.pop();
+
+                    for (const rawEvent of events) {
+                        let eventName = 'message';
+                        let data = '';
+                        rawEvent.split('\n').forEach(line => {
+                            if (line.startsWith('event:')) {
+                                eventName = line.slice(6).trim();
+                            } else if (line.startsWith('data:')) {
+                                data += line.slice(5).trim();
+                            }
+                        });
+
+                        if (eventName === 'done') {
+                            reader.cancel();
+                            return fullText;
+                        }
+                        if (!data) {
+                            continue;
+                        }
+
+                        const payload = JSON.parse(data);
+                        if (eventName === 'error') {
+                            reader.cancel();
+                            throw new Error(payload.error);
+                        }
+                        if (payload.token) {
+                            fullText += payload.token;
+                            onToken(payload.token);
+                        }
+                    }
+
+                    return read();
+                });
+            }
+
+            return read();
+        });
+}
+
 /**
  * Initialize task submission form validation
  */
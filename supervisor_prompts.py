@@ -1,100 +1,273 @@
 """
 Dynamic system prompts for the internship supervisor AI.
 These prompts will guide the behavior of the AI based on context.
+
+The static parts of every prompt are compiled once at import into immutable
+templates, and the per-(industry, company) preamble is memoized, so building a
+prompt only formats the request-specific fields.
 """
 
 import logging
+from functools import lru_cache
+from string import Formatter
+from types import MappingProxyType
 
-def generate_base_supervisor_context(industry, company_name=None):
+# Maximum number of memoized preambles and system messages
+PROMPT_CACHE_SIZE = 256
+
+@lru_cache(maxsize=None)
+def compile_template(text):
     """
-    Generate the base context for the AI supervisor based on industry and company.
+    Compile a str.format-style template into a render function.
+    
+    The placeholders are checked once, and the render function is the
+    template's bound str.format, so rendering does no further work in Python.
+    Templates are cached, so compiling the same text again is free.
     
     Args:
-        industry (str): The industry for the internship
-        company_name (str, optional): The name of the company
+        text (str): Template with {field} or {field:spec} placeholders
         
     Returns:
-        str: Base context for the supervisor
+        callable: Function taking the fields as keyword arguments and returning the rendered string
     """
-    company_detail = f"at {company_name}" if company_name else "in a leading organization"
-    
-    industry_contexts = {
-        "Fintech": {
-            "areas": "financial technology, digital banking, payment systems, blockchain, or investment technologies",
-            "skills": "financial analysis, data interpretation, regulatory compliance, digital payment systems, blockchain technologies",
-            "roles": "financial analyst, payment systems specialist, compliance officer, digital banking consultant"
-        },
-        "Healthcare": {
-            "areas": "healthcare administration, medical informatics, patient care technologies, telehealth, or health analytics",
-            "skills": "healthcare data analysis, patient information management, medical terminology, healthcare compliance, telehealth systems",
-            "roles": "healthcare data analyst, medical records specialist, telehealth coordinator, healthcare compliance officer"
-        },
-        "Marketing": {
-            "areas": "digital marketing, brand strategy, consumer analytics, social media management, or content creation",
-            "skills": "market research, campaign analysis, social media strategy, content creation, SEO/SEM, consumer behavior analysis",
-            "roles": "marketing analyst, social media specialist, brand strategist, content marketer"
-        },
-        "Technology & IT": {
-            "areas": "software development, network administration, cybersecurity, data engineering, or cloud computing",
-            "skills": "programming, system administration, security analysis, database management, cloud architecture",
-            "roles": "software developer, network administrator, cybersecurity analyst, data engineer"
-        },
-        "Business & Finance": {
-            "areas": "corporate finance, business analysis, management consulting, risk assessment, or financial planning",
-            "skills": "financial modeling, business strategy, risk analysis, investment analysis, corporate governance",
-            "roles": "business analyst, financial consultant, risk manager, investment analyst"
-        },
-        "Education": {
-            "areas": "instructional design, educational technology, curriculum development, student assessment, or e-learning",
-            "skills": "curriculum design, educational assessment, learning management systems, instructional methods, student engagement",
-            "roles": "instructional designer, educational technologist, curriculum developer, assessment specialist"
-        },
-        "Environmental Science & Sustainability": {
-            "areas": "environmental impact assessment, sustainability planning, conservation, renewable energy, or waste management",
-            "skills": "environmental analysis, sustainability metrics, conservation planning, renewable energy assessment, waste reduction strategies",
-            "roles": "environmental analyst, sustainability consultant, conservation specialist, renewable energy analyst"
-        },
-        "Media & Communications": {
-            "areas": "journalism, public relations, broadcasting, social media management, or content production",
-            "skills": "media writing, public relations strategy, broadcasting techniques, social media analytics, content production",
-            "roles": "media relations specialist, public relations coordinator, content producer, social media manager"
-        },
-        "Law & Government": {
-            "areas": "legal research, policy analysis, compliance, public administration, or government relations",
-            "skills": "legal research, policy analysis, regulatory compliance, administrative procedures, stakeholder engagement",
-            "roles": "legal researcher, policy analyst, compliance specialist, administrative coordinator"
-        },
-        "Arts & Design": {
-            "areas": "graphic design, user interface design, product design, creative direction, or multimedia production",
-            "skills": "design principles, user experience, creative software tools, visual communication, product aesthetics",
-            "roles": "graphic designer, UI/UX designer, product designer, creative director"
-        }
-    }
-    
-    # Default context if industry not in the list
-    context = industry_contexts.get(industry, {
-        "areas": "professional environment relevant to your field",
-        "skills": "professional skills appropriate for your industry",
-        "roles": "relevant professional roles in your chosen field"
+    for _, field, _, _ in Formatter().parse(text):
+        if field is not None and not field.isidentifier():
+            raise ValueError(f"Template placeholder must be a plain field name: {{{field}}}")
+    return text.format
+
+# Areas, skills and roles the supervisor specializes in, per industry
+INDUSTRY_CONTEXTS = MappingProxyType({
+    "Fintech": MappingProxyType({
+        "areas": "financial technology, digital banking, payment systems, blockchain, or investment technologies",
+        "skills": "financial analysis, data interpretation, regulatory compliance, digital payment systems, blockchain technologies",
+        "roles": "financial analyst, payment systems specialist, compliance officer, digital banking consultant"
+    }),
+    "Healthcare": MappingProxyType({
+        "areas": "healthcare administration, medical informatics, patient care technologies, telehealth, or health analytics",
+        "skills": "healthcare data analysis, patient information management, medical terminology, healthcare compliance, telehealth systems",
+        "roles": "healthcare data analyst, medical records specialist, telehealth coordinator, healthcare compliance officer"
+    }),
+    "Marketing": MappingProxyType({
+        "areas": "digital marketing, brand strategy, consumer analytics, social media management, or content creation",
+        "skills": "market research, campaign analysis, social media strategy, content creation, SEO/SEM, consumer behavior analysis",
+        "roles": "marketing analyst, social media specialist, brand strategist, content marketer"
+    }),
+    "Technology & IT": MappingProxyType({
+        "areas": "software development, network administration, cybersecurity, data engineering, or cloud computing",
+        "skills": "programming, system administration, security analysis, database management, cloud architecture",
+        "roles": "software developer, network administrator, cybersecurity analyst, data engineer"
+    }),
+    "Business & Finance": MappingProxyType({
+        "areas": "corporate finance, business analysis, management consulting, risk assessment, or financial planning",
+        "skills": "financial modeling, business strategy, risk analysis, investment analysis, corporate governance",
+        "roles": "business analyst, financial consultant, risk manager, investment analyst"
+    }),
+    "Education": MappingProxyType({
+        "areas": "instructional design, educational technology, curriculum development, student assessment, or e-learning",
+        "skills": "curriculum design, educational assessment, learning management systems, instructional methods, student engagement",
+        "roles": "instructional designer, educational technologist, curriculum developer, assessment specialist"
+    }),
+    "Environmental Science & Sustainability": MappingProxyType({
+        "areas": "environmental impact assessment, sustainability planning, conservation, renewable energy, or waste management",
+        "skills": "environmental analysis, sustainability metrics, conservation planning, renewable energy assessment, waste reduction strategies",
+        "roles": "environmental analyst, sustainability consultant, conservation specialist, renewable energy analyst"
+    }),
+    "Media & Communications": MappingProxyType({
+        "areas": "journalism, public relations, broadcasting, social media management, or content production",
+        "skills": "media writing, public relations strategy, broadcasting techniques, social media analytics, content production",
+        "roles": "media relations specialist, public relations coordinator, content producer, social media manager"
+    }),
+    "Law & Government": MappingProxyType({
+        "areas": "legal research, policy analysis, compliance, public administration, or government relations",
+        "skills": "legal research, policy analysis, regulatory compliance, administrative procedures, stakeholder engagement",
+        "roles": "legal researcher, policy analyst, compliance specialist, administrative coordinator"
+    }),
+    "Arts & Design": MappingProxyType({
+        "areas": "graphic design, user interface design, product design, creative direction, or multimedia production",
+        "skills": "design principles, user experience, creative software tools, visual communication, product aesthetics",
+        "roles": "graphic designer, UI/UX designer, product designer, creative director"
     })
-    
-    base_context = f"""You are an experienced professional mentor and internship supervisor in the {industry} industry {company_detail}. 
-You specialize in {context['areas']} and have extensive expertise in mentoring interns and new professionals.
+})
+
+# Default context if industry not in the list
+DEFAULT_INDUSTRY_CONTEXT = MappingProxyType({
+    "areas": "professional environment relevant to your field",
+    "skills": "professional skills appropriate for your industry",
+    "roles": "relevant professional roles in your chosen field"
+})
+
+# Static prompt templates, compiled once at import
+BASE_CONTEXT_TEMPLATE = compile_template("""You are an experienced professional mentor and internship supervisor in the {industry} industry {company_detail}. 
+You specialize in {areas} and have extensive expertise in mentoring interns and new professionals.
 
 Your responsibilities include:
-1. Creating realistic, challenging internship tasks that develop practical skills in {context['skills']}
+1. Creating realistic, challenging internship tasks that develop practical skills in {skills}
 2. Providing guidance and feedback on intern submissions
 3. Answering questions related to the industry, tasks, and professional development
 4. Recommending appropriate learning resources
 5. Evaluating intern performance and progress
 
 Maintain a formal but friendly tone, encourage problem-solving, and give constructive advice.
-Adapt your tasks and examples to fit the field of {industry} and the environment of {company_name if company_name else 'a professional organization'}.
+Adapt your tasks and examples to fit the field of {industry} and the environment of {organization}.
 
-You prepare interns for real-world roles such as {context['roles']}. You have a professional, supportive communication style that balances encouragement with honest feedback. 
+You prepare interns for real-world roles such as {roles}. You have a professional, supportive communication style that balances encouragement with honest feedback. 
 You maintain high professional standards and expect quality work from your interns.
-"""
-    return base_context
+""")
+
+TASK_SYSTEM_TEMPLATE = compile_template("""{base_context}
+
+Your task now is to design realistic, professional internship tasks for Week {week_number} that would be assigned in a real {industry} workplace. 
+The tasks should be {difficulty} level and build skills that are valuable in the industry.
+""")
+
+TASK_USER_TEMPLATE = compile_template("""Please create {task_count} tasks for Week {week_number} of the {industry} internship.
+{intern_context}
+
+For each task, provide:
+1. A clear, professional title
+2. A brief description explaining the purpose and importance of the task
+3. Detailed instructions for completing the task
+4. The difficulty level (easy, medium, or hard)
+5. Estimated points value (between 50-200, with harder tasks worth more points)
+
+Format your response as a valid JSON array of task objects with the fields: title, description, instructions, difficulty, and points.
+""")
+
+FEEDBACK_SYSTEM_TEMPLATE = compile_template("""{base_context}
+
+Your task now is to evaluate an intern's submission for an assigned task. Provide constructive, specific feedback that would help the intern improve their professional skills.
+Evaluate based on quality, thoroughness, critical thinking, industry relevance, and professional communication.
+""")
+
+FEEDBACK_USER_TEMPLATE = compile_template("""Please evaluate the following submission for a {task_difficulty} level task:
+
+TASK: {task_title}
+TASK DESCRIPTION: {task_description}
+
+SUBMISSION:
+{submission_content}
+
+Provide your evaluation as a valid JSON object with the following fields:
+1. score: A numerical score between 0-100
+2. feedback: Detailed professional feedback (200-300 words) including strengths, areas for improvement, and specific advice
+3. next_steps: An array of 2-3 suggested actions or resources to improve skills in this area
+""")
+
+BATCH_FEEDBACK_SYSTEM_TEMPLATE = compile_template("""{base_context}
+
+Your task now is to evaluate several intern submissions for their assigned tasks. Evaluate each submission independently, on its own merits, without comparing it to the others. Provide constructive, specific feedback that would help each intern improve their professional skills.
+Evaluate based on quality, thoroughness, critical thinking, industry relevance, and professional communication.
+""")
+
+BATCH_FEEDBACK_USER_TEMPLATE = compile_template("""Please evaluate the following {item_count} submissions. Each one answers one of the tasks listed below.
+
+TASKS:
+{tasks_text}
+
+SUBMISSIONS:
+{submissions_text}
+
+Provide your evaluation as a valid JSON object with a single field "evaluations": an array containing exactly one object per submission, each with the following fields:
+1. id: The submission id exactly as given above
+2. score: A numerical score between 0-100
+3. feedback: Detailed professional feedback (200-300 words) including strengths, areas for improvement, and specific advice
+4. next_steps: An array of 2-3 suggested actions or resources to improve skills in this area
+""")
+
+CHAT_SYSTEM_TEMPLATE = compile_template("""{base_context}
+
+Your task now is to respond to an intern's question in a helpful, professional manner. Provide guidance that would be valuable in a real workplace setting.
+Keep responses concise but thorough, professional, and actionable.
+""")
+
+CHAT_USER_TEMPLATE = compile_template("""The intern has asked the following question:
+
+QUESTION: {question}
+
+{context_details}
+
+Respond as a professional mentor would in a workplace setting. Be helpful but maintain professional standards and expectations.
+""")
+
+RESOURCES_SYSTEM_TEMPLATE = compile_template("""{base_context}
+
+Your task now is to recommend high-quality, specific learning resources that would help an intern complete their assigned task and develop relevant professional skills.
+Focus on professional-grade resources that would be valuable in a real workplace setting.
+""")
+
+RESOURCES_USER_TEMPLATE = compile_template("""Please suggest 3-4 specific learning resources relevant to the following {industry} task:
+
+TASK: {task_title}
+TASK DESCRIPTION: {task_description}
+
+For each resource, provide a valid JSON object with:
+1. title: A specific, professional title
+2. type: The format (article, video, course, tool, etc.)
+3. description: A brief description of what the resource covers and why it's valuable (20-30 words)
+4. url: A fictional but realistic URL where this resource might be found
+
+Format your response as a valid JSON array of resource objects.
+""")
+
+CERTIFICATE_SYSTEM_TEMPLATE = compile_template("""{base_context}
+
+Your task now is to create a professional certificate of completion for an intern who has successfully completed their virtual internship program.
+The certificate should reflect real-world professional standards and highlight the skills developed.
+""")
+
+CERTIFICATE_USER_TEMPLATE = compile_template("""Please create a certificate of completion for:
+
+- Student Name: {user_name}
+- Internship: {internship_title}
+- Industry: {industry}
+- Tasks Completed: {tasks_completed}
+- Average Score: {avg_score:.2f}/100
+
+Format your response as a valid JSON object with:
+1. title: A professional certificate title
+2. description: A formal description of the achievement (100-150 words)
+3. skills_acquired: A comma-separated list of 5-7 specific professional skills developed during the internship
+""")
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def generate_base_supervisor_context(industry, company_name=None):
+    """
+    Generate the base context for the AI supervisor based on industry and company.
+    
+    Results are memoized per (industry, company_name) in a bounded LRU cache.
+    
+    Args:
+        industry (str): The industry for the internship
+        company_name (str, optional): The name of the company
+        
+    Returns:
+        str: Base context for the supervisor
+    """
+    context = INDUSTRY_CONTEXTS.get(industry, DEFAULT_INDUSTRY_CONTEXT)
+    
+    return BASE_CONTEXT_TEMPLATE(
+        industry=industry,
+        company_detail=f"at {company_name}" if company_name else "in a leading organization",
+        organization=company_name if company_name else 'a professional organization',
+        areas=context['areas'],
+        skills=context['skills'],
+        roles=context['roles']
+    )
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _system_message(template, industry):
+    """System message for prompts whose system part depends only on the industry"""
+    return template(base_context=generate_base_supervisor_context(industry))
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _task_system_message(industry, company_name, week_number, difficulty):
+    """Task generation system message; weeks and difficulties take few values"""
+    return TASK_SYSTEM_TEMPLATE(
+        base_context=generate_base_supervisor_context(industry, company_name),
+        week_number=week_number,
+        industry=industry,
+        difficulty=difficulty
+    )
 
 def get_task_generation_prompt(industry, company_name=None, intern_details=None, week_number=1, difficulty=None):
     """
@@ -110,8 +283,6 @@ def get_task_generation_prompt(industry, company_name=None, intern_details=None,
     Returns:
         dict: System message and user message for task generation
     """
-    base_context = generate_base_supervisor_context(industry, company_name)
-    
     # Additional context based on intern details
     intern_context = ""
     if intern_details:
@@ -128,24 +299,14 @@ def get_task_generation_prompt(industry, company_name=None, intern_details=None,
         else:
             difficulty = "challenging"
     
-    system_message = f"""{base_context}
-
-Your task now is to design realistic, professional internship tasks for Week {week_number} that would be assigned in a real {industry} workplace. 
-The tasks should be {difficulty} level and build skills that are valuable in the industry.
-"""
-
-    user_message = f"""Please create {3 if week_number == 1 else 2} tasks for Week {week_number} of the {industry} internship.
-{intern_context}
-
-For each task, provide:
-1. A clear, professional title
-2. A brief description explaining the purpose and importance of the task
-3. Detailed instructions for completing the task
-4. The difficulty level (easy, medium, or hard)
-5. Estimated points value (between 50-200, with harder tasks worth more points)
-
-Format your response as a valid JSON array of task objects with the fields: title, description, instructions, difficulty, and points.
-"""
+    system_message = _task_system_message(industry, company_name, week_number, difficulty)
+
+    user_message = TASK_USER_TEMPLATE(
+        task_count=3 if week_number == 1 else 2,
+        week_number=week_number,
+        industry=industry,
+        intern_context=intern_context
+    )
     
     return {
         "system_message": system_message,
@@ -166,28 +327,63 @@ def get_feedback_prompt(industry, task_title, task_description, submission_conte
     Returns:
         dict: System message and user message for feedback generation
     """
-    base_context = generate_base_supervisor_context(industry)
+    system_message = _system_message(FEEDBACK_SYSTEM_TEMPLATE, industry)
+
+    user_message = FEEDBACK_USER_TEMPLATE(
+        task_difficulty=task_difficulty,
+        task_title=task_title,
+        task_description=task_description,
+        submission_content=submission_content
+    )
     
-    system_message = f"""{base_context}
+    return {
+        "system_message": system_message,
+        "user_message": user_message
+    }
 
-Your task now is to evaluate an intern's submission for an assigned task. Provide constructive, specific feedback that would help the intern improve their professional skills.
-Evaluate based on quality, thoroughness, critical thinking, industry relevance, and professional communication.
-"""
+def get_batch_feedback_prompt(industry, items):
+    """
+    Generate a prompt for evaluating several submissions in one request.
 
-    user_message = f"""Please evaluate the following submission for a {task_difficulty} level task:
+    The supervisor preamble is sent once for the whole batch and each distinct
+    task is listed once, with submissions referring to it by label.
 
-TASK: {task_title}
-TASK DESCRIPTION: {task_description}
+    Args:
+        industry (str): The industry shared by all submissions in the batch
+        items (list): Dicts with id, task_title, task_description, task_difficulty and submission_content
 
-SUBMISSION:
-{submission_content}
+    Returns:
+        dict: System message and user message for batch feedback generation
+    """
+    system_message = _system_message(BATCH_FEEDBACK_SYSTEM_TEMPLATE, industry)
+
+    # List each distinct task once
+    task_labels = {}
+    task_sections = []
+    for item in items:
+        task_key = (item["task_title"], item["task_description"], item["task_difficulty"])
+        if task_key not in task_labels:
+            task_labels[task_key] = f"T{len(task_labels) + 1}"
+            task_sections.append(
+                f"[{task_labels[task_key]}] {item['task_title']} ({item['task_difficulty']} level)\n"
+                f"TASK DESCRIPTION: {item['task_description']}"
+            )
+
+    submission_sections = []
+    for item in items:
+        task_label = task_labels[(item["task_title"], item["task_description"], item["task_difficulty"])]
+        submission_sections.append(
+            f"=== SUBMISSION {item['id']} (task {task_label}) ===\n"
+            f"{item['submission_content']}\n"
+            f"=== END SUBMISSION {item['id']} ==="
+        )
+
+    user_message = BATCH_FEEDBACK_USER_TEMPLATE(
+        item_count=len(items),
+        tasks_text="\n\n".join(task_sections),
+        submissions_text="\n\n".join(submission_sections)
+    )
 
-Provide your evaluation as a valid JSON object with the following fields:
-1. score: A numerical score between 0-100
-2. feedback: Detailed professional feedback (200-300 words) including strengths, areas for improvement, and specific advice
-3. next_steps: An array of 2-3 suggested actions or resources to improve skills in this area
-"""
-    
     return {
         "system_message": system_message,
         "user_message": user_message
@@ -207,8 +403,6 @@ def get_chat_prompt(industry, question, user_profile=None, current_task=None, in
     Returns:
         dict: System message and user message for the chat
     """
-    base_context = generate_base_supervisor_context(industry)
-    
     # Build additional context
     context_details = "Here is some context to inform your response:\n\n"
     
@@ -242,20 +436,9 @@ def get_chat_prompt(industry, question, user_profile=None, current_task=None, in
             context_details += f"- Average score: {internship_progress.get('avg_score')}/100\n"
         context_details += "\n"
     
-    system_message = f"""{base_context}
-
-Your task now is to respond to an intern's question in a helpful, professional manner. Provide guidance that would be valuable in a real workplace setting.
-Keep responses concise but thorough, professional, and actionable.
-"""
+    system_message = _system_message(CHAT_SYSTEM_TEMPLATE, industry)
 
-    user_message = f"""The intern has asked the following question:
-
-QUESTION: {question}
-
-{context_details}
-
-Respond as a professional mentor would in a workplace setting. Be helpful but maintain professional standards and expectations.
-"""
+    user_message = CHAT_USER_TEMPLATE(question=question, context_details=context_details)
     
     return {
         "system_message": system_message,
@@ -274,27 +457,13 @@ def get_resources_prompt(industry, task_title, task_description):
     Returns:
         dict: System message and user message for resource suggestions
     """
-    base_context = generate_base_supervisor_context(industry)
-    
-    system_message = f"""{base_context}
-
-Your task now is to recommend high-quality, specific learning resources that would help an intern complete their assigned task and develop relevant professional skills.
-Focus on professional-grade resources that would be valuable in a real workplace setting.
-"""
-
-    user_message = f"""Please suggest 3-4 specific learning resources relevant to the following {industry} task:
-
-TASK: {task_title}
-TASK DESCRIPTION: {task_description}
-
-For each resource, provide a valid JSON object with:
-1. title: A specific, professional title
-2. type: The format (article, video, course, tool, etc.)
-3. description: A brief description of what the resource covers and why it's valuable (20-30 words)
-4. url: A fictional but realistic URL where this resource might be found
+    system_message = _system_message(RESOURCES_SYSTEM_TEMPLATE, industry)
 
-Format your response as a valid JSON array of resource objects.
-"""
+    user_message = RESOURCES_USER_TEMPLATE(
+        industry=industry,
+        task_title=task_title,
+        task_description=task_description
+    )
     
     return {
         "system_message": system_message,
@@ -315,27 +484,15 @@ def get_certificate_prompt(industry, user_name, internship_title, tasks_complete
     Returns:
         dict: System message and user message for certificate generation
     """
-    base_context = generate_base_supervisor_context(industry)
-    
-    system_message = f"""{base_context}
-
-Your task now is to create a professional certificate of completion for an intern who has successfully completed their virtual internship program.
-The certificate should reflect real-world professional standards and highlight the skills developed.
-"""
-
-    user_message = f"""Please create a certificate of completion for:
-
-- Student Name: {user_name}
-- Internship: {internship_title}
-- Industry: {industry}
-- Tasks Completed: {tasks_completed}
-- Average Score: {avg_score:.2f}/100
-
-Format your response as a valid JSON object with:
-1. title: A professional certificate title
-2. description: A formal description of the achievement (100-150 words)
-3. skills_acquired: A comma-separated list of 5-7 specific professional skills developed during the internship
-"""
+    system_message = _system_message(CERTIFICATE_SYSTEM_TEMPLATE, industry)
+
+    user_message = CERTIFICATE_USER_TEMPLATE(
+        user_name=user_name,
+        internship_title=internship_title,
+        industry=industry,
+        tasks_completed=tasks_completed,
+        avg_score=avg_score
+    )
     
     return {
         "system_message": system_message,
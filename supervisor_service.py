@@ -6,106 +6,68 @@ This file handles all communications with the OpenAI API.
 import json
 import logging
 from app import app
-# from openai import OpenAI
-from openai import AzureOpenAI
+from services.llm_gateway import chat_completion, stream_chat_completion, get_client, is_fake_mode
+from services import task_cache
 from supervisor_prompts import (
     get_task_generation_prompt,
     get_feedback_prompt,
+    get_batch_feedback_prompt,
     get_chat_prompt,
     get_resources_prompt,
     get_certificate_prompt
 )
 
-# Initialize OpenAI client with Azure or standard OpenAI
 def init_openai_client():
-    """Initialize the appropriate OpenAI client (Azure or Standard) based on available credentials."""
-    # First try Azure OpenAI
-    if app.config.get("AZURE_OPENAI_ENDPOINT") and app.config.get("AZURE_OPENAI_KEY"):
-        try:
-            # Create Azure OpenAI client
-            client = AzureOpenAI(
-                api_key=app.config["AZURE_OPENAI_KEY"],
-                azure_endpoint=app.config["AZURE_OPENAI_ENDPOINT"],
-                api_version=app.config.get("AZURE_OPENAI_API_VERSION", "2023-05-15")
-            )
-            logging.info("AI Supervisor: Azure OpenAI client configured")
-            return client, "azure"
-        except Exception as e:
-            logging.error(f"AI Supervisor: Error configuring Azure OpenAI client: {str(e)}")
-            # Fall back to standard OpenAI below
-    
-    # Try standard OpenAI API if Azure failed or not configured
-    # if app.config.get("OPENAI_API_KEY"):
-        #try:
-            # Create standard OpenAI client
-          #  client = OpenAI(api_key=app.config["OPENAI_API_KEY"])
-           # logging.info("AI Supervisor: Standard OpenAI client configured")
-           # return client, "standard"
-       # except Exception as e:
-           # logging.error(f"AI Supervisor: Error configuring standard OpenAI client: {str(e)}")
-           # return None, None
-   # else:
-      #  logging.warning("AI Supervisor: No OpenAI credentials found. Using fallback responses.")
-       # return None, None
+    """
+    Get the shared client from the LLM gateway and report which API it targets.
+    
+    The gateway owns the only client in the process; this accessor is kept so
+    callers that need the client object do not construct their own.
+    
+    Returns:
+        tuple: (client, "fake", "azure" or "standard")
+    """
+    if is_fake_mode():
+        client_type = "fake"
+    elif app.config.get("AZURE_OPENAI_ENDPOINT") and app.config.get("AZURE_OPENAI_KEY"):
+        client_type = "azure"
+    else:
+        client_type = "standard"
+    return get_client(), client_type
 
-# Call this at application startup
-openai_client, openai_type = init_openai_client()
+# Sampling parameters shared by every supervisor completion
+COMPLETION_PARAMS = {
+    "temperature": 0.7,
+    "max_tokens": 1500,
+    "top_p": 0.95,
+    "frequency_penalty": 0.2,
+    "presence_penalty": 0.1
+}
 
-def call_openai_api(system_message, user_message):
+def call_openai_api(system_message, user_message, coalesce=False, call_type="default"):
     """
     Make a call to the OpenAI API with the given messages.
     
     Args:
         system_message (str): The system message to guide the AI's behavior
         user_message (str): The user message containing the specific request
+        coalesce (bool): Share one call between identical concurrent requests
+        call_type (str): Selects the deadline and latency stats in the resilience layer
         
     Returns:
         str: The AI's response text
     """
     try:
-        if not openai_client:
-            raise Exception("No OpenAI client available")
-            
-        # Check which OpenAI API we're using
-        if openai_type == "azure":
-            # Using Azure OpenAI
-            if not app.config.get("AZURE_OPENAI_DEPLOYMENT"):
-                raise Exception("Azure OpenAI deployment not configured")
-                
-            completion = openai_client.chat.completions.create(
-                deployment_id=app.config["AZURE_OPENAI_DEPLOYMENT"],
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.7,
-                max_tokens=1500,
-                top_p=0.95,
-                frequency_penalty=0.2,
-                presence_penalty=0.1
-            )
-        elif openai_type == "standard":
-            # Using standard OpenAI API
-            model = app.config.get("OPENAI_MODEL", "gpt-4o")
-            
-            completion = openai_client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.7,
-                max_tokens=1500,
-                top_p=0.95,
-                frequency_penalty=0.2,
-                presence_penalty=0.1
-            )
-        else:
-            raise Exception("Unknown OpenAI client type")
-            
-        # Extract response from the client response format
-        response_text = completion.choices[0].message.content.strip()
-        return response_text
+        response_text = chat_completion(
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": user_message}
+            ],
+            coalesce=coalesce,
+            call_type=call_type,
+            **COMPLETION_PARAMS
+        )
+        return response_text.strip()
         
     except Exception as e:
         logging.error(f"Error in OpenAI API call: {str(e)}")
@@ -126,6 +88,18 @@ def generate_tasks(industry, company_name=None, intern_details=None, week_number
         list: List of task dictionaries
     """
     try:
+        cache_key = task_cache.make_key(
+            "supervisor_service.generate_tasks",
+            industry=industry,
+            company_name=company_name,
+            intern_details=intern_details,
+            week_number=week_number,
+            difficulty=difficulty
+        )
+        cached_tasks = task_cache.get_cached_tasks(cache_key)
+        if cached_tasks:
+            return cached_tasks
+        
         prompt = get_task_generation_prompt(
             industry, 
             company_name, 
@@ -135,8 +109,10 @@ def generate_tasks(industry, company_name=None, intern_details=None, week_number
         )
         
         try:
-            response_text = call_openai_api(prompt["system_message"], prompt["user_message"])
+            response_text = call_openai_api(prompt["system_message"], prompt["user_message"], coalesce=True, call_type="tasks")
             tasks = json.loads(response_text)
+            if isinstance(tasks, list):
+                task_cache.store_tasks(cache_key, "supervisor_service.generate_tasks", tasks)
             return tasks
         except Exception as e:
             logging.error(f"Error generating tasks with OpenAI: {str(e)}")
@@ -212,7 +188,7 @@ def generate_feedback(submission_content, task_title, task_description, industry
         )
         
         try:
-            response_text = call_openai_api(prompt["system_message"], prompt["user_message"])
+            response_text = call_openai_api(prompt["system_message"], prompt["user_message"], call_type="feedback")
             feedback_data = json.loads(response_text)
             return feedback_data
         except Exception as e:
@@ -226,6 +202,92 @@ def generate_feedback(submission_content, task_title, task_description, industry
         logging.error(f"Error in feedback generation: {str(e)}")
         return generate_fallback_feedback(task_title, task_difficulty)
 
+# Output budget per submission in a batch grading request
+BATCH_FEEDBACK_TOKENS_PER_ITEM = 500
+
+def _validate_feedback(feedback):
+    """
+    Check that a model evaluation has a usable score, feedback text and next steps.
+    
+    Args:
+        feedback (dict): One evaluation from the model
+        
+    Returns:
+        dict: The normalized evaluation, or None if it is invalid
+    """
+    if not isinstance(feedback, dict):
+        return None
+    try:
+        score = float(feedback.get("score"))
+    except (TypeError, ValueError):
+        return None
+    text = feedback.get("feedback")
+    next_steps = feedback.get("next_steps")
+    if not 0 <= score <= 100 or not isinstance(text, str) or not text.strip():
+        return None
+    if not isinstance(next_steps, list):
+        next_steps = [next_steps] if isinstance(next_steps, str) and next_steps else []
+    return {"score": score, "feedback": text.strip(), "next_steps": next_steps}
+
+def generate_feedback_batch(industry, items, max_retries=1):
+    """
+    Grade several submissions with a single completion per round.
+    
+    Each round sends the items still missing a valid evaluation; items whose
+    evaluation is missing or malformed are retried up to max_retries times,
+    so a bad entry never costs a regrade of the whole batch. Unlike
+    generate_feedback this does not substitute fallback feedback: items that
+    still fail are left out of the result for the caller to handle.
+    
+    Args:
+        industry (str): The industry shared by all submissions in the batch
+        items (list): Dicts with id, task_title, task_description, task_difficulty and submission_content
+        max_retries (int): Extra rounds for items that failed validation
+        
+    Returns:
+        dict: Validated feedback dictionaries keyed by item id
+    """
+    results = {}
+    pending = {str(item["id"]): item for item in items}
+    
+    for attempt in range(max_retries + 1):
+        if not pending:
+            break
+        
+        batch = [dict(item, id=item_id) for item_id, item in pending.items()]
+        prompt = get_batch_feedback_prompt(industry, batch)
+        params = dict(COMPLETION_PARAMS, max_tokens=BATCH_FEEDBACK_TOKENS_PER_ITEM * len(batch))
+        
+        try:
+            response_text = chat_completion(
+                messages=[
+                    {"role": "system", "content": prompt["system_message"]},
+                    {"role": "user", "content": prompt["user_message"]}
+                ],
+                response_format={"type": "json_object"},
+                call_type="feedback",
+                **params
+            )
+            evaluations = json.loads(response_text)
+            if isinstance(evaluations, dict):
+                evaluations = evaluations.get("evaluations", [])
+        except Exception as e:
+            logging.error(f"Error in batch feedback generation (attempt {attempt + 1}): {str(e)}")
+            continue
+        
+        for evaluation in evaluations if isinstance(evaluations, list) else []:
+            item_id = str(evaluation.get("id")) if isinstance(evaluation, dict) else None
+            if item_id not in pending:
+                continue
+            feedback = _validate_feedback(evaluation)
+            if feedback is not None:
+                results[pending.pop(item_id)["id"]] = feedback
+        
+        if pending:
+            logging.warning(f"Batch feedback missing or invalid for {len(pending)} of {len(batch)} submissions")
+    
+    return results
+
 def generate_fallback_feedback(task_title, task_difficulty):
     """
     Generate fallback feedback when OpenAI is unavailable.
@@ -258,6 +320,29 @@ def generate_fallback_feedback(task_title, task_difficulty):
         ]
     }
 
+def _get_chat_prompt_for(question, user_profile=None, current_task=None, internship=None):
+    """Resolve the industry and build the chat prompt for a supervisor question"""
+    # Get industry from internship or default to general
+    industry = internship.get("industry", "professional") if internship else "professional"
+    
+    # Build internship progress if available
+    internship_progress = None
+    if internship:
+        internship_progress = {
+            "week": internship.get("current_week", 1),
+            "completed_tasks": internship.get("completed_tasks", 0),
+            "avg_score": internship.get("avg_score", 0)
+        }
+    
+    prompt = get_chat_prompt(
+        industry,
+        question,
+        user_profile,
+        current_task,
+        internship_progress
+    )
+    return industry, prompt
+
 def ask_supervisor(question, user_profile=None, current_task=None, internship=None):
     """
     Get a response from the AI supervisor for a student's question.
@@ -272,28 +357,10 @@ def ask_supervisor(question, user_profile=None, current_task=None, internship=No
         str: The AI supervisor's response
     """
     try:
-        # Get industry from internship or default to general
-        industry = internship.get("industry", "professional") if internship else "professional"
-        
-        # Build internship progress if available
-        internship_progress = None
-        if internship:
-            internship_progress = {
-                "week": internship.get("current_week", 1),
-                "completed_tasks": internship.get("completed_tasks", 0),
-                "avg_score": internship.get("avg_score", 0)
-            }
-        
-        prompt = get_chat_prompt(
-            industry,
-            question,
-            user_profile,
-            current_task,
-            internship_progress
-        )
+        industry, prompt = _get_chat_prompt_for(question, user_profile, current_task, internship)
         
         try:
-            response_text = call_openai_api(prompt["system_message"], prompt["user_message"])
+            response_text = call_openai_api(prompt["system_message"], prompt["user_message"], call_type="chat")
             return response_text
         except Exception as e:
             logging.error(f"Error generating chat response with OpenAI: {str(e)}")
@@ -305,6 +372,39 @@ def ask_supervisor(question, user_profile=None, current_task=None, internship=No
         logging.error(f"Error in chat response generation: {str(e)}")
         return "I apologize, but I'm experiencing technical difficulties at the moment. Please try again later or contact support if the issue persists."
 
+def stream_supervisor(question, user_profile=None, current_task=None, internship=None):
+    """
+    Stream the AI supervisor's response to a student's question.
+    
+    Args:
+        question (str): The student's question
+        user_profile (dict, optional): Information about the student
+        current_task (dict, optional): The current task being worked on
+        internship (dict, optional): Information about the internship
+        
+    Yields:
+        str: Response text fragments; the fallback response if the stream fails before any text
+    """
+    industry, prompt = _get_chat_prompt_for(question, user_profile, current_task, internship)
+    messages = [
+        {"role": "system", "content": prompt["system_message"]},
+        {"role": "user", "content": prompt["user_message"]}
+    ]
+    
+    received = False
+    deltas = stream_chat_completion(messages=messages, **COMPLETION_PARAMS)
+    try:
+        for delta in deltas:
+            received = True
+            yield delta
+    except Exception as e:
+        logging.error(f"Error streaming chat response with OpenAI: {str(e)}")
+        if not received:
+            yield generate_fallback_response(question, industry)
+    finally:
+        # Runs on client disconnect too, closing the upstream completion
+        deltas.close()
+
 def generate_fallback_response(question, industry="professional"):
     """
     Generate a fallback response when OpenAI is unavailable.
@@ -360,7 +460,7 @@ def suggest_resources(task_title, task_description, industry):
         )
         
         try:
-            response_text = call_openai_api(prompt["system_message"], prompt["user_message"])
+            response_text = call_openai_api(prompt["system_message"], prompt["user_message"], coalesce=True, call_type="resources")
             resources = json.loads(response_text)
             return resources
         except Exception as e:
@@ -578,7 +678,7 @@ def generate_certificate(user_name, internship_title, industry, tasks_completed,
         )
         
         try:
-            response_text = call_openai_api(prompt["system_message"], prompt["user_message"])
+            response_text = call_openai_api(prompt["system_message"], prompt["user_message"], call_type="certificate")
             certificate_data = json.loads(response_text)
             return certificate_data
         except Exception as e:
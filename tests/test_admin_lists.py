@@ -0,0 +1,82 @@
+"""
+Paging through the admin internships list visits every row once, in order.
+
+Runs against the app on a throwaway SQLite database:
+
+    python -m unittest discover tests
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# The first test module to import the app picks its database
+if "app" not in sys.modules:
+    _workdir = tempfile.mkdtemp(prefix="internverse_tests_")
+    atexit.register(shutil.rmtree, _workdir, True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+    os.environ["SHARED_STORE_PATH"] = os.path.join(_workdir, "shared_state.db")
+    os.environ["JOB_QUEUE_WORKERS"] = "0"
+    for name in ("AZURE_OPENAI_KEY", "OPENAI_API_KEY", "AZURE_FUNCTION_ENDPOINT", "COSMOS_ENDPOINT"):
+        os.environ.pop(name, None)
+
+from app import app, db
+from models.user import User
+from models.internship import Industry, InternshipTrack
+from services.admin_lists import INTERNSHIP_SORTS, list_internships
+
+class InternshipListPagingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            user = User(username="lister", email="lister@example.com", password_hash="x")
+            db.session.add(user)
+            db.session.flush()
+            # Industry ids and names sort differently
+            industries = Industry.query.order_by(Industry.id).all()[:3]
+            started = datetime(2026, 1, 1)
+            cls.ids = []
+            for n in range(9):
+                internship = InternshipTrack(
+                    industry_id=industries[n % 3].id, user_id=user.id, title=f"Listed {n}",
+                    description="Listed", status=("active", "completed")[n % 2],
+                    started_at=started + timedelta(days=n // 2)
+                )
+                db.session.add(internship)
+                db.session.flush()
+                cls.ids.append(internship.id)
+            # Rows written outside the ORM can leave started_at empty
+            InternshipTrack.query.filter(InternshipTrack.id.in_(cls.ids[:3])).update(
+                {"started_at": None}, synchronize_session=False
+            )
+            db.session.commit()
+
+    def _walk(self, sort):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = list_internships(search="lister", sort=sort, cursor=cursor, limit=2)
+            seen.extend(rows)
+            if not cursor:
+                return seen
+
+    def test_every_sort_pages_through_all_rows(self):
+        with app.app_context():
+            for sort, (columns, descending) in INTERNSHIP_SORTS.items():
+                with self.subTest(sort=sort):
+                    expected, _ = list_internships(search="lister", sort=sort, limit=100)
+                    self.assertEqual([row.id for row in self._walk(sort)], [row.id for row in expected])
+                    self.assertEqual(sorted(row.id for row in expected), sorted(self.ids))
+
+    def test_industry_sort_orders_by_name(self):
+        with app.app_context():
+            rows = self._walk("industry_asc")
+            names = [row.industry.name for row in rows if row.started_at]
+            self.assertEqual(names, sorted(names))
+            # Rows without a start date come last
+            self.assertEqual([row.id for row in rows[-3:]], self.ids[:3])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Queued submission evaluations are graded in batches by the job worker.
+
+Runs the whole flow through the app on a throwaway SQLite database:
+
+    python -m unittest discover tests
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# The first test module to import the app picks its database
+if "app" not in sys.modules:
+    _workdir = tempfile.mkdtemp(prefix="internverse_tests_")
+    atexit.register(shutil.rmtree, _workdir, True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+    os.environ["SHARED_STORE_PATH"] = os.path.join(_workdir, "shared_state.db")
+    os.environ["JOB_QUEUE_WORKERS"] = "0"
+    for name in ("AZURE_OPENAI_KEY", "OPENAI_API_KEY", "AZURE_FUNCTION_ENDPOINT", "COSMOS_ENDPOINT"):
+        os.environ.pop(name, None)
+
+from app import app, db
+from models.internship import Industry, Task, Submission
+from models.job import BackgroundJob
+from services import job_queue
+
+class BatchEvaluationTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def _submit_tasks(self, count):
+        client = self.client
+        client.post("/register", data={"username": "batcher", "email": "batcher@example.com", "password": "secret123"})
+        client.post("/profile", data={"full_name": "Batcher", "major": "CS", "university": "Test",
+                                      "career_interests": "Testing", "graduation_year": "2027", "bio": "Hi"})
+        with app.app_context():
+            industry_id = Industry.query.filter_by(name="Technology").first().id
+        client.post(f"/internship/start/{industry_id}", data={})
+
+        with app.app_context():
+            task_ids = [task.id for task in Task.query.filter(
+                ~Task.id.in_(db.session.query(Submission.task_id))
+            ).order_by(Task.id).limit(count)]
+        for task_id in task_ids:
+            client.post(f"/task/{task_id}", data={"content": f"Answer for task {task_id}"})
+
+        with app.app_context():
+            return [Submission.query.filter_by(task_id=task_id).one().id for task_id in task_ids]
+
+    def test_pending_evaluations_share_one_batch(self):
+        submission_ids = self._submit_tasks(2)  # A new internship starts with two tasks
+        calls = []
+
+        def grade_all_but_last(industry, items):
+            calls.append([item["id"] for item in items])
+            return {item["id"]: {"score": 80, "feedback": "Good"} for item in items[:-1]}
+
+        with app.app_context():
+            with mock.patch("supervisor_service.generate_feedback_batch", side_effect=grade_all_but_last):
+                job = job_queue.claim_job("test-worker", kinds=["evaluate_submission"])
+                self.assertEqual(job.ref_id, submission_ids[0])
+                self.assertTrue(job_queue.run_job(job))
+
+            self.assertEqual(calls, [submission_ids])
+            graded = {s.id for s in Submission.query.filter(Submission.evaluated_at.isnot(None))}
+            self.assertEqual(graded, {submission_ids[0]})
+
+            # The submission the batch could not grade goes back for a single evaluation
+            retry = BackgroundJob.query.filter_by(ref_id=submission_ids[1], kind="evaluate_submission").one()
+            self.assertEqual(retry.status, "queued")
+            with mock.patch("supervisor_service.generate_feedback_batch") as batch:
+                job = job_queue.claim_job("test-worker", kinds=["evaluate_submission"])
+                self.assertEqual(job.id, retry.id)
+                self.assertTrue(job_queue.run_job(job))
+                batch.assert_not_called()
+            self.assertIsNotNone(db.session.get(Submission, submission_ids[1]).evaluated_at)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+A timed-out Azure Function call fails the evaluation job so it is retried.
+
+Runs the whole flow through the app on a throwaway SQLite database:
+
+    python -m unittest discover tests
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# The first test module to import the app picks its database
+if "app" not in sys.modules:
+    _workdir = tempfile.mkdtemp(prefix="internverse_tests_")
+    atexit.register(shutil.rmtree, _workdir, True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+    os.environ["SHARED_STORE_PATH"] = os.path.join(_workdir, "shared_state.db")
+    os.environ["JOB_QUEUE_WORKERS"] = "0"
+    for name in ("AZURE_OPENAI_KEY", "OPENAI_API_KEY", "AZURE_FUNCTION_ENDPOINT", "COSMOS_ENDPOINT"):
+        os.environ.pop(name, None)
+
+import requests
+from app import app, db
+from models.internship import Industry, Task, Submission
+from models.job import BackgroundJob
+from services import job_queue
+
+class FunctionTimeoutTest(unittest.TestCase):
+    def test_timeout_is_retried_not_graded_locally(self):
+        client = app.test_client()
+        client.post("/register", data={"username": "slowfn", "email": "slowfn@example.com", "password": "secret123"})
+        client.post("/profile", data={"full_name": "Slow Function", "major": "CS", "university": "Test",
+                                      "career_interests": "Testing", "graduation_year": "2027", "bio": "Hi"})
+        with app.app_context():
+            industry_id = Industry.query.filter_by(name="Technology").first().id
+        client.post(f"/internship/start/{industry_id}", data={})
+
+        with app.app_context():
+            task_id = Task.query.filter(
+                ~Task.id.in_(db.session.query(Submission.task_id))
+            ).order_by(Task.id.desc()).first().id
+        client.post(f"/task/{task_id}", data={"content": "My answer"})
+
+        config = {"AZURE_FUNCTION_ENDPOINT": "https://function.invalid", "AZURE_FUNCTION_KEY": "key",
+                  "AZURE_FUNCTION_TIMEOUT": 600, "JOB_QUEUE_VISIBILITY_TIMEOUT": 300}
+        with app.app_context(), mock.patch.dict(app.config, config):
+            submission_id = Submission.query.filter_by(task_id=task_id).one().id
+            with mock.patch("requests.post", side_effect=requests.Timeout("slow")) as post:
+                job = job_queue.claim_job("test-worker", kinds=["evaluate_submission"])
+                self.assertEqual(job.ref_id, submission_id)
+                self.assertFalse(job_queue.run_job(job))
+
+            # The timeout is capped below the visibility timeout
+            self.assertEqual(post.call_args.kwargs["timeout"], 150)
+            self.assertEqual(db.session.get(BackgroundJob, job.id).status, "queued")
+            self.assertIsNone(db.session.get(Submission, submission_id).evaluated_at)
+
+if __name__ == "__main__":
+    unittest.main()
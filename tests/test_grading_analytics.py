@@ -0,0 +1,70 @@
+"""
+Grading a submission counts it into the analytics rollups.
+
+Runs the whole flow through the app on a throwaway SQLite database:
+
+    python -m unittest discover tests
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# The first test module to import the app picks its database
+if "app" not in sys.modules:
+    _workdir = tempfile.mkdtemp(prefix="internverse_tests_")
+    atexit.register(shutil.rmtree, _workdir, True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+    os.environ["SHARED_STORE_PATH"] = os.path.join(_workdir, "shared_state.db")
+    os.environ["JOB_QUEUE_WORKERS"] = "0"
+    for name in ("AZURE_OPENAI_KEY", "OPENAI_API_KEY", "AZURE_FUNCTION_ENDPOINT", "COSMOS_ENDPOINT"):
+        os.environ.pop(name, None)
+
+from app import app, db
+from models.analytics import AnalyticsBucket
+from models.internship import Industry, Task, Submission
+from services.azure_services import evaluate_submission
+
+class GradingAnalyticsTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def _metrics(self):
+        with app.app_context():
+            return {metric for (metric,) in db.session.query(AnalyticsBucket.metric).distinct()}
+
+    def test_grading_fills_evaluation_and_score_buckets(self):
+        client = self.client
+        client.post("/register", data={"username": "grader", "email": "grader@example.com", "password": "secret123"})
+        client.post("/profile", data={"full_name": "Grader", "major": "CS", "university": "Test",
+                                      "career_interests": "Testing", "graduation_year": "2027", "bio": "Hi"})
+        with app.app_context():
+            industry_id = Industry.query.filter_by(name="Technology").first().id
+        client.post(f"/internship/start/{industry_id}", data={})
+
+        with app.app_context():
+            task_id = Task.query.order_by(Task.id).first().id
+        client.post(f"/task/{task_id}", data={"content": "My answer"})
+
+        with app.app_context():
+            submission = Submission.query.filter_by(task_id=task_id).one()
+            evaluate_submission(submission.id)
+            graded = db.session.get(Submission, submission.id)
+            self.assertIsNotNone(graded.evaluated_at)
+
+        self.assertTrue({"submission", "evaluation", "score", "score_band"} <= self._metrics())
+
+        # Grading again does not count the submission twice
+        with app.app_context():
+            evaluation_count = db.session.query(db.func.sum(AnalyticsBucket.count)).filter_by(
+                metric="evaluation", granularity="day"
+            ).scalar()
+            evaluate_submission(submission.id)
+            self.assertEqual(evaluation_count, db.session.query(db.func.sum(AnalyticsBucket.count)).filter_by(
+                metric="evaluation", granularity="day"
+            ).scalar())
+
+if __name__ == "__main__":
+    unittest.main()